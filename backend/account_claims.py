@@ -0,0 +1,142 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+from metrics import Counter
+from outreach import TransientDeliveryError
+
+ACCOUNT_CLAIM_EVENTS = Counter("auth_account_claims_total", "Account claim token outcomes", ["result"])
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AccountClaims:
+    """One-time tokens proving a bulk-imported alumnus owns their address.
+
+    Imported users have no password. Each is mailed a claim token, stored
+    only as a SHA-256 digest; presenting it is the only way to set the
+    password, so knowing someone's email is not enough to take the account.
+    """
+
+    def __init__(self, ttl_days=14):
+        self.ttl = timedelta(days=ttl_days)
+
+    async def issue(self, db, user_ids):
+        """``{user_id: token}``, replacing any token the users were sent before."""
+        now = datetime.now(timezone.utc)
+        tokens = {user_id: secrets.token_urlsafe(32) for user_id in user_ids}
+        await db.account_claims.delete_many({"user_id": {"$in": list(tokens)}})
+        if tokens:
+            await db.account_claims.insert_many([
+                {"token_hash": _digest(token), "user_id": user_id, "created_at": now, "expires_at": now + self.ttl}
+                for user_id, token in tokens.items()
+            ])
+        return tokens
+
+    async def lookup(self, db, token):
+        return await db.account_claims.find_one(
+            {"token_hash": _digest(token), "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"_id": 0, "user_id": 1},
+        )
+
+    async def consume(self, db, token):
+        """Delete ``token`` and return its record; None if it was invalid, expired or already used."""
+        record = await db.account_claims.find_one_and_delete(
+            {"token_hash": _digest(token), "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            projection={"_id": 0, "user_id": 1},
+        )
+        ACCOUNT_CLAIM_EVENTS.inc(result="claimed" if record else "invalid")
+        return record
+
+
+def render_claim_invitation(email, claim_link, sender):
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = email
+    message["Subject"] = "Your alumni account is ready"
+    message.set_content(
+        f"Hi,\n\n"
+        f"An alumni account has been created for {email}.\n\n"
+        f"Choose a password to start using it:\n{claim_link}\n\n"
+        f"If you were not expecting this email, you can ignore it.\n"
+    )
+    return message
+
+
+class ClaimInvitations:
+    """Job handler mailing a claim link to every user one import created.
+
+    Users are walked in ``id`` order with ``last_id`` checkpoints. A user is
+    marked ``claim_invited_at`` once the transport took their message, so a
+    retried or resumed attempt only mails those it has not reached.
+    """
+
+    def __init__(self, db, claims, transport, bucket, claim_url, batch_size=100):
+        self.db = db
+        self.claims = claims
+        self.transport = transport
+        self.bucket = bucket
+        # Format string with a {token} placeholder, e.g. https://host/claim?token={token}
+        self.claim_url = claim_url
+        self.batch_size = batch_size
+
+    async def __call__(self, job, progress):
+        if "sent" not in progress.state:
+            await progress.update(sent=0, failed=0, skipped=0)
+        query = {
+            "import_id": job["payload"]["import_id"],
+            "password": {"$exists": False},
+            "claim_invited_at": {"$exists": False},
+        }
+        last_id = progress.state.get("last_id")
+        if last_id:
+            query["id"] = {"$gt": last_id}
+        cursor = (
+            self.db.users.find(query, {"_id": 0, "id": 1, "email": 1})
+            .sort("id", 1)
+            .batch_size(self.batch_size)
+        )
+        batch = []
+        async for user in cursor:
+            batch.append(user)
+            if len(batch) >= self.batch_size:
+                await self._invite(batch, progress)
+                batch = []
+        if batch:
+            await self._invite(batch, progress)
+
+    async def _invite(self, users, progress):
+        tokens = await self.claims.issue(self.db, [user["id"] for user in users])
+        messages = [
+            render_claim_invitation(
+                user["email"], self.claim_url.format(token=tokens[user["id"]]), self.transport.sender
+            )
+            for user in users
+        ]
+        await self.bucket.acquire(len(messages))
+        try:
+            rejected = await self.transport.send(messages)
+        except TransientDeliveryError as exc:
+            # The job is retried; those already mailed are not mailed again
+            await self._mark_invited(exc.delivered)
+            raise
+        # Rejected addresses are marked too: a retry would only be refused again
+        await self._mark_invited([user["email"] for user in users])
+        sent = len(users) - len(rejected)
+        state = progress.state
+        await progress.update(
+            # A transport that only keeps messages in memory mailed nobody
+            sent=state["sent"] + (sent if self.transport.delivers else 0),
+            failed=state["failed"] + len(rejected),
+            skipped=state["skipped"] + (0 if self.transport.delivers else sent),
+            last_id=users[-1]["id"],
+        )
+
+    async def _mark_invited(self, emails):
+        if emails:
+            await self.db.users.update_many(
+                {"email": {"$in": list(emails)}}, {"$set": {"claim_invited_at": datetime.now(timezone.utc)}}
+            )
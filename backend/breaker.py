@@ -0,0 +1,67 @@
+import math
+import time
+
+from metrics import Counter, Gauge
+
+CIRCUIT_STATE = Gauge("circuit_breaker_open", "1 while the circuit is open or half-open", ["name"])
+CIRCUIT_EVENTS = Counter("circuit_breaker_events_total", "Circuit breaker transitions and rejections", ["name", "event"])
+
+
+class CircuitBreaker:
+    """Fails fast while a dependency keeps failing.
+
+    ``failure_threshold`` consecutive failures open the circuit. While open,
+    :meth:`allow` refuses work until ``reset_seconds`` have passed; then one
+    probe is let through (half-open). A successful probe closes the circuit
+    and a failed one opens it for another ``reset_seconds``. Single-threaded:
+    only ever used from the event loop.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_seconds=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    @property
+    def retry_after(self):
+        """Whole seconds until the next probe is allowed."""
+        if self._opened_at is None:
+            return 0
+        return max(1, math.ceil(self._opened_at + self.reset_seconds - time.monotonic()))
+
+    def allow(self):
+        if self._opened_at is None:
+            return True
+        if not self._probing and time.monotonic() >= self._opened_at + self.reset_seconds:
+            self._probing = True
+            CIRCUIT_EVENTS.inc(name=self.name, event="probe")
+            return True
+        CIRCUIT_EVENTS.inc(name=self.name, event="rejected")
+        return False
+
+    def release_probe(self):
+        """Let another request probe after the probe ended without a verdict."""
+        self._probing = False
+
+    def record_success(self):
+        self._failures = 0
+        if self._opened_at is not None and self._probing:
+            self._opened_at = None
+            self._probing = False
+            CIRCUIT_STATE.set(0, name=self.name)
+            CIRCUIT_EVENTS.inc(name=self.name, event="closed")
+
+    def record_failure(self):
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self._probing = False
+            CIRCUIT_STATE.set(1, name=self.name)
+            CIRCUIT_EVENTS.inc(name=self.name, event="opened")
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBus:
+    """Publish/subscribe between components of a single worker process."""
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+
+    def subscribe(self, topic, handler):
+        self._handlers[topic].append(handler)
+
+    def _dispatch(self, topic, payload):
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Bus handler for %s failed", topic)
+
+    async def publish(self, topic, payload):
+        self._dispatch(topic, payload)
+
+    async def start(self, db):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class MongoBus(LocalBus):
+    """Fans messages out to every uvicorn worker through a capped collection.
+
+    Each worker tails the collection with a tailable-await cursor, so this works
+    on a standalone mongod as well as on replica sets. Messages are dispatched
+    locally on publish and skipped when they come back through the tail.
+    """
+
+    def __init__(self, collection_name="bus_messages", size_bytes=16 * 1024 * 1024):
+        super().__init__()
+        self.collection_name = collection_name
+        self.size_bytes = size_bytes
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._collection = None
+        self._task = None
+
+    async def start(self, db):
+        try:
+            await db.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass
+        self._collection = db[self.collection_name]
+        # A tailable cursor on an empty capped collection dies immediately.
+        marker = await self._collection.insert_one(
+            {"topic": "bus.start", "origin": self.origin, "ts": datetime.now(timezone.utc)}
+        )
+        self._task = asyncio.create_task(self._tail(marker.inserted_id))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, topic, payload):
+        self._dispatch(topic, payload)
+        if self._collection is not None:
+            await self._collection.insert_one(
+                {"topic": topic, "payload": payload, "origin": self.origin, "ts": datetime.now(timezone.utc)}
+            )
+
+    async def _tail(self, last_id):
+        while True:
+            try:
+                cursor = self._collection.find(
+                    {"_id": {"$gt": last_id}}, cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                while cursor.alive:
+                    async for message in cursor:
+                        last_id = message["_id"]
+                        if message.get("origin") != self.origin:
+                            self._dispatch(message["topic"], message.get("payload"))
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError:
+                logger.exception("Bus tail failed, reconnecting")
+            await asyncio.sleep(1)
+
+
+def create_bus(backend):
+    if backend == "mongo":
+        return MongoBus()
+    return LocalBus()
@@ -0,0 +1,150 @@
+import hashlib
+import secrets
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING
+
+CALENDAR_MEDIA_TYPE = "text/calendar; charset=utf-8"
+CALENDAR_PROJECTION = {"_id": 0, "id": 1, "title": 1, "description": 1, "date": 1, "location": 1, "created_at": 1}
+# Covered by the date_id index, so fingerprinting never fetches documents.
+FINGERPRINT_PROJECTION = {"_id": 0, "id": 1, "date": 1}
+
+# Flush to the client once this much output has been buffered.
+CHUNK_BYTES = 32 * 1024
+
+_HEADER = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//AlumniConnect//Events//EN\r\n"
+    "CALSCALE:GREGORIAN\r\n"
+    "METHOD:PUBLISH\r\n"
+    "X-WR-CALNAME:AlumniConnect Events\r\n"
+)
+_FOOTER = "END:VCALENDAR\r\n"
+
+
+def new_feed_token():
+    """``(token, digest)`` for a subscription URL; only the digest is stored.
+
+    Calendar apps cannot send an Authorization header, so the feed URL
+    carries this per-user token instead. Replacing or clearing the stored
+    digest revokes every URL issued before.
+    """
+    token = secrets.token_urlsafe(32)
+    return token, feed_token_digest(token)
+
+
+def feed_token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def event_window(when=None, start=None, end=None, now=None):
+    """Mongo filter and sort direction for an events listing.
+
+    ``when`` is ``"upcoming"`` (soonest first) or ``"past"`` (most recent
+    first); ``start``/``end`` bound ``date`` to the half-open range
+    ``[start, end)``. Both can be combined. Raises ValueError for an empty
+    ``start``/``end`` range.
+    """
+    now = now or datetime.now(timezone.utc)
+    # Naive query parameters are taken as UTC, like the stored dates.
+    start, end = (
+        value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+        for value in (start, end)
+    )
+    if start is not None and end is not None and start >= end:
+        raise ValueError("start must be before end")
+    bounds = {}
+    if when == "upcoming":
+        bounds["$gte"] = now
+    elif when == "past":
+        bounds["$lt"] = now
+    if start is not None:
+        bounds["$gte"] = max(start, bounds["$gte"]) if "$gte" in bounds else start
+    if end is not None:
+        bounds["$lt"] = min(end, bounds["$lt"]) if "$lt" in bounds else end
+    direction = DESCENDING if when == "past" else ASCENDING
+    return ({"date": bounds} if bounds else {}), direction
+
+
+def _utc(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _escape(text):
+    return (
+        str(text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    # RFC 5545 lines are at most 75 octets; continuations start with a space.
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, limit = [], 75
+    while data:
+        cut = min(limit, len(data))
+        # Never split a multi-byte UTF-8 sequence.
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _vevent(doc):
+    created = doc.get("created_at") or doc["date"]
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{doc['id']}@alumniconnect",
+        f"DTSTAMP:{_utc(created)}",
+        f"DTSTART:{_utc(doc['date'])}",
+        f"SUMMARY:{_escape(doc.get('title'))}",
+        f"DESCRIPTION:{_escape(doc.get('description'))}",
+        f"LOCATION:{_escape(doc.get('location'))}",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+async def calendar_fingerprint(collection, query, direction=ASCENDING):
+    """Hash of the ``(id, date)`` pairs a feed would contain, read from the index.
+
+    Events are not edited after creation, so this changes exactly when the
+    feed body would.
+    """
+    digest = hashlib.sha256()
+    cursor = collection.find(query, FINGERPRINT_PROJECTION).sort([("date", direction), ("id", direction)])
+    async for doc in cursor:
+        digest.update(f"{doc['id']}|{_utc(doc['date'])}\n".encode())
+    return digest.hexdigest()
+
+
+async def stream_calendar(collection, query, direction=ASCENDING, batch_size=500):
+    """Yield an iCalendar feed chunk by chunk straight off a Motor cursor."""
+    pending = [_HEADER]
+    size = len(_HEADER)
+    cursor = (
+        collection.find(query, CALENDAR_PROJECTION)
+        .sort([("date", direction), ("id", direction)])
+        .batch_size(batch_size)
+    )
+    async for doc in cursor:
+        event = _vevent(doc)
+        pending.append(event)
+        size += len(event)
+        if size >= CHUNK_BYTES:
+            yield "".join(pending).encode()
+            pending.clear()
+            size = 0
+    pending.append(_FOOTER)
+    yield "".join(pending).encode()
@@ -0,0 +1,189 @@
+import zlib
+
+from metrics import Counter
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered.
+    brotli = None
+
+COMPRESSION_BYTES = Counter(
+    "http_response_compression_bytes_total",
+    "Response bytes before and after compression",
+    ["encoding", "stage"],
+)
+COMPRESSION_SKIPPED = Counter("http_response_compression_skipped_total", "Responses sent uncompressed", ["reason"])
+
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"application/javascript",
+    b"text/",
+)
+
+
+def parse_accept_encoding(header):
+    """``{coding: q}`` from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        # A sync flush hands every chunk of a streamed body to the client now.
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def create_compressor(encoding, level):
+    """Streaming compressor for ``encoding`` ("gzip" or "br") at ``level``."""
+    return _Brotli(level) if encoding == "br" else _Gzip(level)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression of response bodies.
+
+    Bodies smaller than ``minimum_size``, already-encoded responses, event
+    streams and types that do not compress (images, gzip exports) are sent
+    as they are. Streamed bodies are compressed chunk by chunk and flushed
+    as they go, so exports and feeds keep streaming. Compressed responses
+    get a weak ETag, which revalidation treats like the strong one.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope):
+        header = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get("*", 0.0)
+        options = []
+        if brotli is not None:
+            options.append((accepted.get("br", wildcard), 1, "br"))
+        options.append((accepted.get("gzip", wildcard), 0, "gzip"))
+        # Highest q wins; brotli on ties.
+        q, _, name = max(options)
+        return name if q > 0 else None
+
+    def _compressor(self, name):
+        return create_compressor(name, self.brotli_quality if name == "br" else self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                reason = "no_body" if message["status"] in (204, 304) else self._skip_reason(message.get("headers", ()))
+                if reason is not None:
+                    COMPRESSION_SKIPPED.inc(reason=reason)
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it is worth compressing.
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = list(start.get("headers", ()))
+                if not more_body and len(body) < self.minimum_size:
+                    if body:
+                        COMPRESSION_SKIPPED.inc(reason="small")
+                    passthrough = True
+                    start["headers"] = headers + [(b"vary", b"Accept-Encoding")]
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = self._compressor(encoding)
+                start["headers"] = self._compressed_headers(headers, encoding)
+                await send(start)
+
+            COMPRESSION_BYTES.inc(len(body), encoding=encoding, stage="in")
+            data = compressor.compress(body)
+            data += compressor.flush() if more_body else compressor.finish()
+            COMPRESSION_BYTES.inc(len(data), encoding=encoding, stage="out")
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _skip_reason(headers):
+        content_type = b""
+        for name, value in headers:
+            name = name.lower()
+            if name == b"content-encoding":
+                return "encoded"
+            if name == b"content-type":
+                content_type = value.lower()
+        if content_type.startswith(b"text/event-stream"):
+            return "event_stream"
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return "type"
+        return None
+
+    @staticmethod
+    def _compressed_headers(headers, encoding):
+        compressed = []
+        for name, value in headers:
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            compressed.append((name, value))
+        compressed.append((b"content-encoding", encoding.encode()))
+        compressed.append((b"vary", b"Accept-Encoding"))
+        return compressed
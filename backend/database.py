@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, monitoring
+
+from instrumentation import CommandTimingListener
+from metrics import Counter, Gauge, Histogram
+
+POOL_WAIT_SECONDS = Histogram(
+    "mongo_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["address"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total", "Connection checkouts that failed or timed out", ["address", "reason"]
+)
+POOL_CHECKED_OUT = Gauge("mongo_pool_checked_out", "Connections currently checked out", ["address"])
+POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Open pooled connections", ["address"])
+
+# Env var -> (client option, type). Unset variables keep the driver default.
+CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_MAX_CONNECTING": ("maxConnecting", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    # Client-side operation timeout; the driver also sends it as maxTimeMS.
+    "MONGO_TIMEOUT_MS": ("timeoutMS", int),
+    "MONGO_COMPRESSORS": ("compressors", str),
+    "MONGO_ZLIB_COMPRESSION_LEVEL": ("zlibCompressionLevel", int),
+}
+
+
+def _address(event):
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolWaitListener(monitoring.ConnectionPoolListener):
+    """Measures pool checkout waits; checkout start and end happen on the same thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _waited(self, event):
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        if started is not None:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started, address=_address(event))
+
+    def connection_checked_out(self, event):
+        self._waited(event)
+        POOL_CHECKED_OUT.inc(address=_address(event))
+
+    def connection_check_out_failed(self, event):
+        self._waited(event)
+        POOL_CHECKOUT_FAILURES.inc(address=_address(event), reason=event.reason)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec(address=_address(event))
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.inc(address=_address(event))
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.dec(address=_address(event))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+def client_options(env=os.environ):
+    options = {}
+    for var, (option, cast) in CLIENT_OPTIONS.items():
+        value = env.get(var)
+        if value not in (None, ""):
+            options[option] = cast(value)
+    return options
+
+
+def create_client(env=os.environ):
+    # The driver connects lazily, on the first operation.
+    return AsyncIOMotorClient(
+        env["MONGO_URL"],
+        event_listeners=[CommandTimingListener(), PoolWaitListener()],
+        **client_options(env),
+    )
+
+
+def read_database(client, name, env=os.environ):
+    """Database handle for read-heavy admin routes, secondaries allowed by default."""
+    mode = env.get("MONGO_ADMIN_READ_PREFERENCE", "secondaryPreferred")
+    preferences = {
+        "primary": ReadPreference.PRIMARY,
+        "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+        "secondary": ReadPreference.SECONDARY,
+        "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+        "nearest": ReadPreference.NEAREST,
+    }
+    return client.get_database(name, read_preference=preferences[mode])
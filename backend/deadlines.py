@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+
+import pymongo
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError
+
+from instrumentation import match_route, request_commands
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DEADLINES_EXCEEDED = Counter(
+    "http_request_deadline_exceeded_total", "Requests answered 504 at their deadline", ["route"]
+)
+DATABASE_UNAVAILABLE = Counter(
+    "http_database_unavailable_total", "Requests answered 503 for database availability", ["route", "reason"]
+)
+
+
+def is_database_failure(exc):
+    """Whether ``exc`` says the database is unavailable or slow, rather than a bug."""
+    if isinstance(exc, (ConnectionFailure, ExecutionTimeout)):
+        return True
+    return isinstance(exc, PyMongoError) and exc.timeout
+
+
+def parse_route_deadlines(value):
+    """``{route: seconds}`` from "route=seconds,..."; 0 means no deadline."""
+    deadlines = {}
+    for item in value.split(","):
+        route, _, seconds = item.strip().rpartition("=")
+        if route:
+            deadlines[route] = float(seconds) or None
+    return deadlines
+
+
+class DeadlineMiddleware:
+    """Per-request deadlines for /api routes, and the database circuit breaker.
+
+    Each request runs under ``asyncio.timeout`` and ``pymongo.timeout`` for
+    its route's deadline. The pymongo timeout is what bounds the driver: it
+    caps server selection, the wait for a pooled connection and every
+    command (sent as ``maxTimeMS``), so an abandoned request cannot keep
+    holding a connection. Missing the deadline is a 504.
+
+    Deadline misses and connection failures count against ``breaker``, and
+    only a request Mongo actually answered counts as a success. While it is
+    open, requests fail fast with 503 and Retry-After, except
+    ``fallback_routes``, which answer from cached data themselves.
+    ``exempt_routes`` (streams, exports) stay out of the breaker entirely,
+    so a long-lived connection can never hold its half-open probe.
+    """
+
+    def __init__(
+        self, app, routes=(), breaker=None, default_seconds=10.0, route_seconds=None, fallback_routes=(),
+        exempt_routes=(),
+    ):
+        self.app = app
+        # The router's live route list, used to look up each request's route template.
+        self.routes = routes
+        self.breaker = breaker
+        self.default_seconds = default_seconds
+        self.route_seconds = route_seconds or {}
+        self.fallback_routes = frozenset(fallback_routes)
+        self.exempt_routes = frozenset(exempt_routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        route = match_route(self.routes, scope)
+        seconds = self.route_seconds.get(route, self.default_seconds)
+        tracked = route not in self.exempt_routes
+        gated = tracked and route not in self.fallback_routes
+        probe = False
+        if gated:
+            probe = self.breaker.is_open
+            if not self.breaker.allow():
+                DATABASE_UNAVAILABLE.inc(route=route, reason="circuit_open")
+                await self._respond(send, 503, "Database unavailable, please retry shortly", self.breaker.retry_after)
+                return
+        # A fallback route served while the circuit is open says nothing about the database.
+        counted = tracked and (gated or not self.breaker.is_open)
+
+        started = False
+        failed = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            if seconds:
+                async with asyncio.timeout(seconds):
+                    with pymongo.timeout(seconds):
+                        await self.app(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        except TimeoutError:
+            failed = True
+            self._record_failure(counted)
+            REQUEST_DEADLINES_EXCEEDED.inc(route=route)
+            logger.warning("%s %s missed its %.1fs deadline", scope["method"], route, seconds)
+            if started:
+                raise
+            await self._respond(send, 504, "Request timed out")
+        except Exception as exc:
+            if not is_database_failure(exc):
+                raise
+            failed = True
+            self._record_failure(counted)
+            logger.warning("%s %s failed on the database: %r", scope["method"], route, exc)
+            if started:
+                raise
+            if isinstance(exc, PyMongoError) and exc.timeout:
+                REQUEST_DEADLINES_EXCEEDED.inc(route=route)
+                await self._respond(send, 504, "Request timed out")
+            else:
+                DATABASE_UNAVAILABLE.inc(route=route, reason="error")
+                await self._respond(send, 503, "Database unavailable, please retry shortly", self.breaker.retry_after)
+        finally:
+            # Cache hits never reached Mongo and say nothing about it.
+            if counted and not failed and any(not command_failed for *_, command_failed in request_commands()):
+                self.breaker.record_success()
+            if probe:
+                # Cancelled, or never reached Mongo: the next request probes instead.
+                self.breaker.release_probe()
+
+    def _record_failure(self, counted):
+        # Before answering, so the 503 carries the Retry-After of a circuit it opened.
+        if counted:
+            self.breaker.record_failure()
+
+    @staticmethod
+    async def _respond(send, status_code, detail, retry_after=None):
+        headers = [(b"content-type", b"application/json")]
+        if retry_after:
+            headers.append((b"retry-after", str(retry_after).encode()))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
@@ -0,0 +1,255 @@
+import logging
+import re
+import unicodedata
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+DEDUPE_CANDIDATES = Counter("dedupe_candidates_total", "Possible duplicate profile pairs recorded", ["source"])
+
+# Profile fields the blocking keys are built from.
+DEDUPE_FIELDS = ("full_name", "phone", "graduation_year", "department")
+COMPARE_PROJECTION = {"_id": 0, "id": 1, **{field: 1 for field in DEDUPE_FIELDS}}
+
+# A block this large is too common a key to say anything about duplicates.
+MAX_BLOCK_SIZE = 100
+# Pairs scoring below this are not reported.
+MIN_SCORE = 0.5
+NAME_SIMILARITY = 0.85
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NAME_NOISE = frozenset("dr mr mrs ms miss prof jr sr ii iii".split())
+
+
+def _fold(value):
+    # Case- and accent-insensitive: "José" and "jose" fold the same.
+    text = unicodedata.normalize("NFKD", str(value)).encode("ascii", "ignore").decode().lower()
+    return _NON_ALNUM.sub(" ", text).split()
+
+
+def name_tokens(full_name):
+    """Name tokens in given-name-first order, without titles and suffixes."""
+    if not full_name:
+        return []
+    # "Doe, John" is "John Doe".
+    if "," in full_name:
+        last, _, first = full_name.partition(",")
+        full_name = f"{first} {last}"
+    return [token for token in _fold(full_name) if token not in _NAME_NOISE]
+
+
+def normalize_phone(phone):
+    digits = re.sub(r"\D", "", str(phone or ""))
+    # The last ten digits: "+1 (555) 010-0000" and "5550100000" match.
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def normalize_department(department):
+    return " ".join(_fold(department)) if department else None
+
+
+def blocking_keys(profile):
+    """Keys under which a profile and its likely duplicates collide."""
+    tokens = name_tokens(profile.get("full_name"))
+    name = " ".join(sorted(tokens))
+    phone = normalize_phone(profile.get("phone"))
+    year = profile.get("graduation_year")
+    department = normalize_department(profile.get("department"))
+    keys = []
+    if phone:
+        keys.append(f"phone:{phone}")
+    if name and year:
+        keys.append(f"name_year:{name}:{year}")
+    if name and department:
+        keys.append(f"name_dept:{name}:{department}")
+    if len(tokens) > 1 and year:
+        # Spelling variants and initials: "Jon Smith", "J. Smith", "John Smith".
+        keys.append(f"surname_year:{tokens[-1]}:{tokens[0][0]}:{year}")
+    return keys
+
+
+def dedupe_fields(profile):
+    """The indexed ``dedupe_keys`` stored on every profile."""
+    return {"dedupe_keys": blocking_keys(profile)}
+
+
+def compare(a, b):
+    """``(score, reasons)`` for how likely two profiles are the same person."""
+    score, reasons = 0.0, []
+    phone = normalize_phone(a.get("phone"))
+    if phone and phone == normalize_phone(b.get("phone")):
+        score += 0.4
+        reasons.append("Same phone number")
+    name_a = " ".join(sorted(name_tokens(a.get("full_name"))))
+    name_b = " ".join(sorted(name_tokens(b.get("full_name"))))
+    if name_a and name_b:
+        similarity = 1.0 if name_a == name_b else SequenceMatcher(None, name_a, name_b).ratio()
+        if similarity >= NAME_SIMILARITY:
+            score += 0.4 * similarity
+            reasons.append("Same name" if similarity == 1.0 else "Similar name")
+    if a.get("graduation_year") and a.get("graduation_year") == b.get("graduation_year"):
+        score += 0.1
+        reasons.append("Same graduation year")
+    department = normalize_department(a.get("department"))
+    if department and department == normalize_department(b.get("department")):
+        score += 0.1
+        reasons.append("Same department")
+    return round(score, 3), reasons
+
+
+def _pair_id(a, b):
+    return ":".join(sorted((a, b)))
+
+
+def _candidate_ops(pairs, source):
+    now = datetime.now(timezone.utc)
+    ops = []
+    for a, b in pairs:
+        score, reasons = compare(a, b)
+        if score < MIN_SCORE:
+            continue
+        ops.append(UpdateOne(
+            {"id": _pair_id(a["id"], b["id"])},
+            {
+                "$set": {"score": score, "reasons": reasons, "updated_at": now},
+                # A pair an admin already dismissed stays dismissed.
+                "$setOnInsert": {
+                    "profile_ids": sorted((a["id"], b["id"])),
+                    "status": "open",
+                    "detected_by": source,
+                    "created_at": now,
+                },
+            },
+            upsert=True,
+        ))
+    return ops
+
+
+async def _record(db, ops, source):
+    if ops:
+        await db.dedupe_candidates.bulk_write(ops, ordered=False)
+        DEDUPE_CANDIDATES.inc(len(ops), source=source)
+
+
+async def check_profile(db, profile):
+    """Record possible duplicates of a just-written profile.
+
+    One indexed query over the profile's blocks finds everything it could be
+    a duplicate of. Best effort, like the dashboard counters: the profile is
+    already written, and a full scan picks up anything missed here.
+    """
+    keys = profile.get("dedupe_keys")
+    if not keys:
+        return
+    try:
+        block = await db.alumni_profiles.find(
+            {"dedupe_keys": {"$in": keys}, "id": {"$ne": profile["id"]}}, COMPARE_PROJECTION
+        ).limit(MAX_BLOCK_SIZE).to_list(MAX_BLOCK_SIZE)
+        await _record(db, _candidate_ops([(profile, other) for other in block], "write"), "write")
+    except PyMongoError:
+        logger.exception("Duplicate check failed for profile %s", profile["id"])
+
+
+async def forget_profile(db, profile_id):
+    await db.dedupe_candidates.delete_many({"profile_ids": profile_id})
+
+
+class DedupeScan:
+    """Job handler building the merge-candidate report over every profile.
+
+    First streams the collection in ``id`` order, refreshing ``dedupe_keys``
+    where they are missing or stale. Then lets Mongo group profiles by key
+    and compares pairs only inside each block, skipping blocks larger than
+    ``MAX_BLOCK_SIZE``. The work is linear in the number of profiles plus
+    the pairs inside blocks, never all pairs. Both phases checkpoint, so a
+    resumed job carries on where it stopped.
+    """
+
+    def __init__(self, db, batch_size=1000):
+        self.db = db
+        self.batch_size = batch_size
+
+    async def __call__(self, job, progress):
+        if "phase" not in progress.state:
+            await progress.update(phase="keys", keyed=0, blocks=0, pairs=0, candidates=0)
+        if progress.state["phase"] == "keys":
+            await self._refresh_keys(progress)
+            await progress.update(phase="blocks")
+        await self._scan_blocks(progress)
+
+    async def _refresh_keys(self, progress):
+        last_id = progress.state.get("last_id")
+        cursor = (
+            self.db.alumni_profiles.find(
+                {"id": {"$gt": last_id}} if last_id else {}, {**COMPARE_PROJECTION, "dedupe_keys": 1}
+            )
+            .sort("id", 1)
+            .batch_size(self.batch_size)
+        )
+        ops, seen = [], 0
+        async for profile in cursor:
+            seen += 1
+            keys = blocking_keys(profile)
+            if profile.get("dedupe_keys") != keys:
+                ops.append(UpdateOne({"id": profile["id"]}, {"$set": {"dedupe_keys": keys}}))
+            if seen >= self.batch_size:
+                await self._flush_keys(ops, seen, profile["id"], progress)
+                ops, seen = [], 0
+        if seen:
+            await self._flush_keys(ops, seen, profile["id"], progress)
+
+    async def _flush_keys(self, ops, seen, last_id, progress):
+        if ops:
+            await self.db.alumni_profiles.bulk_write(ops, ordered=False)
+        await progress.update(keyed=progress.state["keyed"] + seen, last_id=last_id)
+
+    async def _scan_blocks(self, progress):
+        last_key = progress.state.get("last_key")
+        pipeline = [
+            {"$match": {"dedupe_keys.0": {"$exists": True}}},
+            {"$project": {"_id": 0, "id": 1, "dedupe_keys": 1}},
+            {"$unwind": "$dedupe_keys"},
+            {"$group": {"_id": "$dedupe_keys", "ids": {"$push": "$id"}}},
+            {"$match": {"ids.1": {"$exists": True}, f"ids.{MAX_BLOCK_SIZE}": {"$exists": False}}},
+            {"$sort": {"_id": 1}},
+        ]
+        if last_key:
+            pipeline.append({"$match": {"_id": {"$gt": last_key}}})
+        blocks, size = [], 0
+        async for block in self.db.alumni_profiles.aggregate(pipeline, allowDiskUse=True):
+            blocks.append(block)
+            size += len(block["ids"])
+            if size >= self.batch_size:
+                await self._compare_blocks(blocks, progress)
+                blocks, size = [], 0
+        if blocks:
+            await self._compare_blocks(blocks, progress)
+
+    async def _compare_blocks(self, blocks, progress):
+        # One $in for every profile in this batch of blocks.
+        ids = list({profile_id for block in blocks for profile_id in block["ids"]})
+        profiles = {
+            profile["id"]: profile
+            async for profile in self.db.alumni_profiles.find({"id": {"$in": ids}}, COMPARE_PROJECTION)
+        }
+        pairs = {}
+        for block in blocks:
+            members = [profiles[profile_id] for profile_id in block["ids"] if profile_id in profiles]
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    pairs.setdefault(_pair_id(a["id"], b["id"]), (a, b))
+        ops = _candidate_ops(pairs.values(), "scan")
+        await _record(self.db, ops, "scan")
+        state = progress.state
+        await progress.update(
+            blocks=state["blocks"] + len(blocks),
+            pairs=state["pairs"] + len(pairs),
+            candidates=state["candidates"] + len(ops),
+            last_key=blocks[-1]["_id"],
+        )
@@ -0,0 +1,100 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+
+from fastjson import dumps
+
+EXPORT_FIELDS = [
+    "id",
+    "user_id",
+    "full_name",
+    "phone",
+    "graduation_year",
+    "degree",
+    "department",
+    "current_position",
+    "current_company",
+    "linkedin_url",
+    "bio",
+    "created_at",
+    "updated_at",
+]
+EXPORT_PROJECTION = {"_id": 0, **{field: 1 for field in EXPORT_FIELDS}}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Flush to the client once this much output has been buffered.
+CHUNK_BYTES = 64 * 1024
+
+# Leading characters a spreadsheet reads as the start of a formula.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    # Profiles are self-edited; a quote keeps "=HYPERLINK(...)" as text (CSV injection).
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _CsvEncoder:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def header(self):
+        return self.row(EXPORT_FIELDS)
+
+    def encode(self, doc):
+        return self.row([_csv_cell(doc.get(field)) for field in EXPORT_FIELDS])
+
+    def row(self, values):
+        self._writer.writerow(values)
+        out = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return out.encode()
+
+
+class _NdjsonEncoder:
+    def header(self):
+        return b""
+
+    def encode(self, doc):
+        return dumps(doc) + b"\n"
+
+
+async def stream_alumni(collection, query, fmt="ndjson", compress=False, batch_size=1000, compress_level=6):
+    """Yield an alumni export chunk by chunk straight off a Motor cursor.
+
+    Only one cursor batch and one output chunk are held in memory at a time,
+    so memory stays flat however many profiles are exported. The first row is
+    flushed immediately to keep time to first byte low.
+    """
+    encoder = _CsvEncoder() if fmt == "csv" else _NdjsonEncoder()
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, 31) if compress else None
+    pending = [encoder.header()]
+    size = len(pending[0])
+    first = True
+
+    def drain(final=False):
+        data = b"".join(pending)
+        if compressor:
+            data = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        pending.clear()
+        return data
+
+    cursor = collection.find(query, EXPORT_PROJECTION).batch_size(batch_size)
+    async for doc in cursor:
+        row = encoder.encode(doc)
+        pending.append(row)
+        size += len(row)
+        if first or size >= CHUNK_BYTES:
+            yield drain()
+            size, first = 0, False
+    data = drain(final=True)
+    if data:
+        yield data
@@ -0,0 +1,53 @@
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def projection(model, exclude=()):
+    """Mongo projection returning exactly the fields ``model`` serializes."""
+    return {"_id": 0, **{name: 1 for name in model.model_fields if name not in exclude}}
+
+
+def sparse_projection(model, fields):
+    """Projection for a comma-separated ``fields`` list; ``id`` is always included.
+
+    Raises ValueError naming any field ``model`` does not have.
+    """
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return {"_id": 0, "id": 1, **{name: 1 for name in names}}
+
+
+def select(docs, fields_projection):
+    # Trimmed responses are the documents themselves: constructing the model
+    # would fill every omitted field with its default.
+    return [{name: doc[name] for name in fields_projection if name in doc} for doc in docs]
+
+
+def construct(model, doc):
+    # Documents read back from our own collections were validated on write.
+    return model.model_construct(**doc)
+
+
+def construct_many(model, docs):
+    return [model.model_construct(**doc) for doc in docs]
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError
+
+
+def dumps(content):
+    # OPT_UTC_Z matches pydantic's rendering of UTC datetimes.
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
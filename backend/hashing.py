@@ -0,0 +1,125 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from passlib.context import CryptContext
+
+from metrics import Counter, Gauge, Histogram
+
+HASH_QUEUE_DEPTH = Gauge("auth_hash_queue_depth", "Password hash operations queued or running")
+HASH_LATENCY = Histogram(
+    "auth_hash_seconds",
+    "Wall time of password hash operations including queue wait",
+    ["operation"],
+)
+HASH_REJECTED = Counter(
+    "auth_hash_rejected_total",
+    "Password hash operations shed because the pool was saturated",
+    ["operation"],
+)
+
+
+@lru_cache(maxsize=None)
+def _crypt_context(rounds):
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Module-level so they can be pickled into a process pool.
+def _hash(password, rounds):
+    return _crypt_context(rounds).hash(password)
+
+
+def _verify(plain_password, hashed_password, rounds):
+    return _crypt_context(rounds).verify(plain_password, hashed_password)
+
+
+def _call_soon(loop, callback, *args):
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # The loop closed while the work ran; nothing is left to admit
+        pass
+
+
+class HashPoolSaturated(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class HashPool:
+    """Runs bcrypt on a dedicated executor so it never blocks the event loop.
+
+    At most ``workers + max_queue`` operations are admitted at once; anything
+    beyond that is rejected with :class:`HashPoolSaturated` instead of queueing.
+    """
+
+    def __init__(self, workers=4, max_queue=64, rounds=12, executor="thread"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self.executor_kind = executor
+        self._executor = None
+        self._pending = 0
+        self._avg_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def retry_after(self):
+        # Rough time for the current backlog to drain, in whole seconds.
+        backlog = self._avg_seconds * self._pending / max(self.workers, 1)
+        return max(1, math.ceil(backlog))
+
+    async def _submit(self, operation, fn, *args):
+        if self._pending >= self.workers + self.max_queue:
+            HASH_REJECTED.inc(operation=operation)
+            raise HashPoolSaturated(self.retry_after())
+
+        self._pending += 1
+        HASH_QUEUE_DEPTH.set(self._pending)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(operation, start, None)
+            raise
+        # Released when bcrypt finishes, not when the caller stops waiting: a
+        # cancelled request leaves the work running, and it must stay admitted.
+        future.add_done_callback(lambda done: _call_soon(loop, self._release, operation, start, done))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, operation, start, future):
+        self._pending -= 1
+        HASH_QUEUE_DEPTH.set(self._pending)
+        if future is None or future.cancelled():
+            # Never ran; says nothing about how long hashing takes
+            return
+        elapsed = time.perf_counter() - start
+        HASH_LATENCY.observe(elapsed, operation=operation)
+        self._avg_seconds = elapsed if not self._avg_seconds else 0.8 * self._avg_seconds + 0.2 * elapsed
+
+    async def hash(self, password):
+        return await self._submit("hash", _hash, password, self.rounds)
+
+    async def verify(self, plain_password, hashed_password):
+        return await self._submit("verify", _verify, plain_password, hashed_password, self.rounds)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,120 @@
+import asyncio
+import itertools
+import logging
+
+from metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+SSE_SUBSCRIBERS = Gauge("sse_subscribers", "Open server-sent event streams")
+SSE_MESSAGES = Counter("sse_messages_total", "Messages fanned out to SSE subscribers", ["event"])
+SSE_EVICTIONS = Counter("sse_evictions_total", "SSE subscribers dropped for falling behind")
+
+HEARTBEAT = b": ping\n\n"
+# Queued in place of the backlog when a subscriber is evicted.
+_EVICTED = object()
+
+
+class HubFull(Exception):
+    pass
+
+
+class Subscriber:
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(queue_size)
+
+
+class Hub:
+    """In-process fan-out of server-sent events to connected clients.
+
+    Every subscriber gets a bounded queue. A subscriber whose queue is full
+    when a message arrives is evicted rather than allowed to hold memory or
+    slow down everyone else; its stream ends with a ``reconnect`` event. One
+    heartbeat task pings every stream, so idle connections cost a queue and
+    nothing else. Cross-worker delivery is left to the caller (the bus).
+    """
+
+    def __init__(self, queue_size=64, heartbeat_seconds=15, max_subscribers=10000, retry_ms=5000):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_subscribers = max_subscribers
+        self.retry_ms = retry_ms
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self._heartbeat = None
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self, user_id):
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HubFull()
+        subscriber = Subscriber(user_id, self.queue_size)
+        self._subscribers.add(subscriber)
+        SSE_SUBSCRIBERS.set(len(self._subscribers))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+        SSE_SUBSCRIBERS.set(len(self._subscribers))
+
+    def _offer(self, subscriber, frame):
+        try:
+            subscriber.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._evict(subscriber)
+
+    def _close(self, subscriber):
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(_EVICTED)
+
+    def _evict(self, subscriber):
+        self._close(subscriber)
+        SSE_EVICTIONS.inc()
+        logger.info("Evicted slow SSE subscriber %s", subscriber.user_id)
+
+    def publish(self, event, data):
+        """Queue ``data`` (JSON text) for every local subscriber; never blocks."""
+        # Encoded once, shared by every queue.
+        frame = f"id: {next(self._ids)}\nevent: {event}\ndata: {data}\n\n".encode()
+        for subscriber in list(self._subscribers):
+            self._offer(subscriber, frame)
+        SSE_MESSAGES.inc(event=event)
+
+    async def stream(self, subscriber):
+        """Yield SSE frames for ``subscriber`` until it disconnects or is evicted."""
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+            while True:
+                frame = await subscriber.queue.get()
+                if frame is _EVICTED:
+                    yield b"event: reconnect\ndata: {}\n\n"
+                    return
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _beat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for subscriber in list(self._subscribers):
+                self._offer(subscriber, HEARTBEAT)
+
+    def start(self):
+        self._heartbeat = asyncio.create_task(self._beat())
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        for subscriber in list(self._subscribers):
+            self._close(subscriber)
@@ -0,0 +1,204 @@
+import asyncio
+import codecs
+import csv
+import json
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from dedupe import dedupe_fields
+from search import search_fields
+
+MAX_REPORTED_ERRORS = 1000
+
+
+async def iter_lines(chunks):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def iter_csv_records(lines):
+    # Quoted fields may contain newlines; keep joining until quotes balance.
+    header = None
+    pending = []
+    async for line in lines:
+        pending.append(line)
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        text = "\n".join(pending).rstrip("\r")
+        pending = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield dict(zip(header, values))
+
+
+async def iter_ndjson_records(lines):
+    async for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else line
+
+
+def validate_chunk(model, rows):
+    """Validate ``(row_number, raw)`` pairs; return ``(valid, errors)``."""
+    valid, errors = [], []
+    for row_number, raw in rows:
+        if not isinstance(raw, dict):
+            errors.append({"row": row_number, "errors": ["Row is not a JSON object"]})
+            continue
+        cleaned = {k: (None if v == "" else v) for k, v in raw.items() if k}
+        try:
+            valid.append((row_number, model(**cleaned)))
+        except ValidationError as exc:
+            errors.append({
+                "row": row_number,
+                "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()],
+            })
+    return valid, errors
+
+
+def _bulk_errors(exc, row_numbers):
+    return [
+        {"row": row_numbers[err["index"]], "errors": [err.get("errmsg", "Write failed")]}
+        for err in exc.details.get("writeErrors", [])
+    ]
+
+
+async def write_chunk(db, rows, import_id):
+    """Upsert users keyed on email, then their profiles keyed on user_id.
+
+    Users the chunk creates have no password and carry ``import_id``; they
+    set a password through the claim link mailed to them.
+    """
+    now = datetime.now(timezone.utc)
+    # Last row wins when an email repeats within a chunk.
+    by_email = {}
+    for row_number, row in rows:
+        by_email[row.email] = (row_number, row)
+    rows = list(by_email.values())
+    row_numbers = [row_number for row_number, _ in rows]
+    result = {"users_created": 0, "profiles_created": 0, "profiles_updated": 0, "errors": []}
+
+    user_ops = [
+        UpdateOne(
+            {"email": row.email},
+            {"$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "email": row.email,
+                "role": "alumni",
+                "is_active": True,
+                "import_id": import_id,
+                "created_at": now,
+            }},
+            upsert=True,
+        )
+        for _, row in rows
+    ]
+    try:
+        user_result = await db.users.bulk_write(user_ops, ordered=False)
+        result["users_created"] = user_result.upserted_count
+    except BulkWriteError as exc:
+        result["users_created"] = exc.details.get("nUpserted", 0)
+        result["errors"].extend(_bulk_errors(exc, row_numbers))
+
+    users = await db.users.find(
+        {"email": {"$in": list(by_email)}}, {"_id": 0, "id": 1, "email": 1}
+    ).to_list(None)
+    user_ids = {user["email"]: user["id"] for user in users}
+
+    profile_ops, profile_rows = [], []
+    for row_number, row in rows:
+        user_id = user_ids.get(row.email)
+        if user_id is None:
+            continue
+        fields = row.model_dump(exclude={"email"})
+        fields["updated_at"] = now
+        fields.update(search_fields(fields))
+        fields.update(dedupe_fields(fields))
+        profile_ops.append(UpdateOne(
+            {"user_id": user_id},
+            {"$set": fields, "$setOnInsert": {"id": str(uuid.uuid4()), "user_id": user_id, "created_at": now}},
+            upsert=True,
+        ))
+        profile_rows.append(row_number)
+    if profile_ops:
+        try:
+            profile_result = await db.alumni_profiles.bulk_write(profile_ops, ordered=False)
+            result["profiles_created"] = profile_result.upserted_count
+            result["profiles_updated"] = profile_result.matched_count
+        except BulkWriteError as exc:
+            result["profiles_created"] = exc.details.get("nUpserted", 0)
+            result["profiles_updated"] = exc.details.get("nMatched", 0)
+            result["errors"].extend(_bulk_errors(exc, profile_rows))
+    return result
+
+
+async def import_alumni(db, chunks, fmt, model, batch_size=1000):
+    """Stream-import alumni rows, validating one batch while the previous one is written."""
+    import_id = str(uuid.uuid4())
+    lines = iter_lines(chunks)
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+    loop = asyncio.get_running_loop()
+    report = {
+        "import_id": import_id,
+        "rows": 0,
+        "imported": 0,
+        "users_created": 0,
+        "profiles_created": 0,
+        "profiles_updated": 0,
+        "failed": 0,
+        "errors": [],
+    }
+
+    def record_errors(errors):
+        report["failed"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(report["errors"])
+        report["errors"].extend(errors[:max(room, 0)])
+
+    async def flush(batch, previous_write):
+        validation = loop.run_in_executor(None, validate_chunk, model, batch)
+        if previous_write is not None:
+            collect(await previous_write)
+        valid, errors = await validation
+        record_errors(errors)
+        return asyncio.ensure_future(write_chunk(db, valid, import_id)) if valid else None
+
+    def collect(result):
+        for key in ("users_created", "profiles_created", "profiles_updated"):
+            report[key] += result[key]
+        report["imported"] += result["profiles_created"] + result["profiles_updated"]
+        record_errors(result["errors"])
+
+    batch, write = [], None
+    async for record in records:
+        report["rows"] += 1
+        batch.append((report["rows"], record))
+        if len(batch) >= batch_size:
+            write = await flush(batch, write)
+            batch = []
+    if batch:
+        write = await flush(batch, write)
+    if write is not None:
+        collect(await write)
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
@@ -0,0 +1,162 @@
+import logging
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Users a bulk import created, walked by the claim invitation job.
+        IndexModel(
+            [("import_id", ASCENDING), ("id", ASCENDING)],
+            name="import_id_id",
+            partialFilterExpression={"import_id": {"$type": "string"}},
+        ),
+        IndexModel([("calendar_token_hash", ASCENDING)], name="calendar_token_hash_unique", unique=True, sparse=True),
+    ],
+    "alumni_profiles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel([("department", ASCENDING), ("graduation_year", ASCENDING)], name="department_year"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+        IndexModel([("search_terms", ASCENDING)], name="search_terms"),
+        IndexModel([("dedupe_keys", ASCENDING)], name="dedupe_keys"),
+        IndexModel(
+            [
+                ("full_name", TEXT),
+                ("current_company", TEXT),
+                ("current_position", TEXT),
+                ("department", TEXT),
+                ("degree", TEXT),
+                ("bio", TEXT),
+            ],
+            name="alumni_text",
+            weights={"full_name": 10, "current_company": 5, "current_position": 5, "department": 3, "degree": 2},
+        ),
+    ],
+    "events": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("date", ASCENDING), ("id", ASCENDING)], name="date_id"),
+    ],
+    "rsvps": [
+        IndexModel([("event_id", ASCENDING), ("user_id", ASCENDING)], name="event_user_unique", unique=True),
+        IndexModel([("event_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="event_created_at_id"),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)], name="status_run_after"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "dedupe_candidates": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("score", ASCENDING), ("id", ASCENDING)], name="status_score_id"),
+        IndexModel([("profile_ids", ASCENDING)], name="profile_ids"),
+    ],
+    "conversations": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # One direct conversation per pair; group conversations have no key.
+        IndexModel(
+            [("direct_key", ASCENDING)],
+            name="direct_key_unique",
+            unique=True,
+            partialFilterExpression={"direct_key": {"$type": "string"}},
+        ),
+    ],
+    "messages": [
+        IndexModel([("conversation_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="conversation_created_at_id"),
+    ],
+    "inbox": [
+        IndexModel([("conversation_id", ASCENDING), ("user_id", ASCENDING)], name="conversation_user_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("last_message_at", ASCENDING), ("id", ASCENDING)], name="user_last_message_at_id"),
+    ],
+    "outreach_deliveries": [
+        IndexModel([("job_id", ASCENDING), ("user_id", ASCENDING)], name="job_user_unique", unique=True),
+        # Campaigns delete their own; this clears those of cancelled jobs.
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=30 * 24 * 3600),
+    ],
+    "account_claims": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "refresh_tokens": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_unique", unique=True),
+        IndexModel([("family_id", ASCENDING)], name="family_id"),
+        # Mongo's TTL monitor deletes tokens once expires_at has passed.
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# (name, collection, filter, sort) for every hot lookup the routes issue.
+QUERY_SHAPES = [
+    ("get_current_user", "users", {"email": "someone@example.com"}, None),
+    ("update_user", "users", {"id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("get_my_profile", "alumni_profiles", {"user_id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("get_alumni_by_id", "alumni_profiles", {"id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("get_event", "events", {"id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("get_all_alumni", "alumni_profiles", {}, [("created_at", ASCENDING), ("id", ASCENDING)]),
+    ("get_events", "events", {}, [("date", ASCENDING), ("id", ASCENDING)]),
+    ("get_upcoming_events", "events", {"date": {"$gte": datetime(2000, 1, 1)}}, [("date", ASCENDING), ("id", ASCENDING)]),
+    ("get_past_events", "events", {"date": {"$lt": datetime(2000, 1, 1)}}, [("date", DESCENDING), ("id", DESCENDING)]),
+    ("search_alumni", "alumni_profiles", {"search_terms": {"$regex": "^smi"}}, None),
+    ("backfill_search_terms", "alumni_profiles", {"search_terms": {"$exists": False}}, None),
+    ("check_duplicates", "alumni_profiles", {"dedupe_keys": {"$in": ["phone:5550100000"]}}, None),
+    ("get_duplicate_candidates", "dedupe_candidates", {"status": "open"}, [("score", DESCENDING), ("id", DESCENDING)]),
+    ("rsvp_seat", "events", {"id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("get_event_attendees", "rsvps", {"event_id": "00000000-0000-0000-0000-000000000000"}, [("created_at", ASCENDING), ("id", ASCENDING)]),
+    ("claim_job", "jobs", {"status": "queued", "run_after": {"$lte": datetime(2000, 1, 1)}}, None),
+    ("get_messages", "messages", {"conversation_id": "00000000-0000-0000-0000-000000000000"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("get_inbox", "inbox", {"user_id": "00000000-0000-0000-0000-000000000000"}, [("last_message_at", DESCENDING), ("id", DESCENDING)]),
+    ("mark_read", "inbox", {"user_id": "00000000-0000-0000-0000-000000000000", "conversation_id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("claim_invitations", "users", {"import_id": "00000000-0000-0000-0000-000000000000"}, [("id", ASCENDING)]),
+    ("calendar_feed_user", "users", {"calendar_token_hash": "0" * 64}, None),
+    ("claim_account", "account_claims", {"token_hash": "0" * 64}, None),
+    ("refresh_token", "refresh_tokens", {"token_hash": "0" * 64, "used": False, "revoked": False}, None),
+]
+
+
+async def ensure_indexes(db):
+    # create_indexes is a no-op for indexes that already exist with the same spec.
+    for collection, models in INDEXES.items():
+        await db[collection].create_indexes(models)
+    logger.info("Indexes ensured for %s", ", ".join(INDEXES))
+
+
+def _plan_stages(plan):
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("inputStage", "queryPlan"):
+        stages.extend(_plan_stages(plan.get(key)))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_query_shapes(db):
+    report = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        stages = _plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "route": name,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
+
+
+async def verify_query_plans(db):
+    report = await explain_query_shapes(db)
+    scans = [entry["route"] for entry in report if entry["collscan"]]
+    if scans:
+        raise RuntimeError(f"Collection scan in query plan for: {', '.join(scans)}")
+    return report
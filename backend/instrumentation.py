@@ -0,0 +1,163 @@
+import contextvars
+import logging
+import threading
+import time
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+from metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served", ["route"])
+MONGO_ROUND_TRIPS = Histogram(
+    "http_request_mongo_round_trips",
+    "Mongo commands issued per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21),
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "Mongo command latency as seen by the driver",
+    ["collection", "command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+MONGO_COMMAND_DOCUMENTS = Counter(
+    "mongo_command_documents_total",
+    "Documents returned or affected by Mongo commands",
+    ["collection", "command"],
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total", "Failed Mongo commands", ["collection", "command"]
+)
+JWT_SECONDS = Histogram(
+    "auth_jwt_seconds",
+    "JWT encode/decode time",
+    ["operation"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+
+# Commands issued by the request currently running in this context. Motor
+# copies the context into its executor threads, so the pymongo listener sees it.
+_request_commands = contextvars.ContextVar("request_commands", default=None)
+
+# Commands whose first argument is not the collection name.
+_COLLECTION_FIELDS = {"getMore": "collection"}
+
+
+def request_commands():
+    """``(name, collection, ms, docs, failed)`` for each Mongo command the current request issued."""
+    return _request_commands.get() or ()
+
+
+def match_route(routes, scope):
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def _document_count(command_name, reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Times every Mongo command per collection and attributes it to the current request."""
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        field = _COLLECTION_FIELDS.get(event.command_name, event.command_name)
+        collection = event.command.get(field)
+        with self._lock:
+            self._collections[self._key(event)] = collection if isinstance(collection, str) else "-"
+
+    def _finish(self, event, docs, failed):
+        with self._lock:
+            collection = self._collections.pop(self._key(event), "-")
+        seconds = event.duration_micros / 1e6
+        labels = {"collection": collection, "command": event.command_name}
+        MONGO_COMMAND_SECONDS.observe(seconds, **labels)
+        if failed:
+            MONGO_COMMAND_FAILURES.inc(**labels)
+        elif docs:
+            MONGO_COMMAND_DOCUMENTS.inc(docs, **labels)
+        commands = _request_commands.get()
+        if commands is not None:
+            commands.append((event.command_name, collection, round(seconds * 1000, 2), docs, failed))
+
+    def succeeded(self, event):
+        self._finish(event, _document_count(event.command_name, event.reply), failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+
+class InstrumentationMiddleware:
+    """Per-route latency, in-flight requests, Mongo round trips and slow-request logging."""
+
+    def __init__(self, app, routes=(), slow_request_ms=0):
+        self.app = app
+        # The router's live route list, used to label requests by route template.
+        self.routes = routes
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        commands = []
+        token = _request_commands.set(commands)
+        status_code = 500
+        streaming = False
+        route = match_route(self.routes, scope)
+        HTTP_IN_FLIGHT.inc(route=route)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = dict(message.get("headers", ())).get(b"content-type", b"")
+                streaming = content_type.startswith(b"text/event-stream")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_commands.reset(token)
+            HTTP_IN_FLIGHT.dec(route=route)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route, status=status_code)
+            MONGO_ROUND_TRIPS.observe(len(commands), route=route)
+            # Event streams stay open by design
+            if self.slow_request_ms and not streaming and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning(
+                    "Slow request %s %s -> %s in %.1f ms; mongo commands: %s",
+                    scope["method"],
+                    route,
+                    status_code,
+                    elapsed * 1000,
+                    ", ".join(
+                        f"{name}({collection}) {ms}ms docs={docs}" + (" FAILED" if failed else "")
+                        for name, collection, ms, docs, failed in commands
+                    ) or "none",
+                )
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+JOBS_FINISHED = Counter("jobs_finished_total", "Background jobs that stopped running", ["kind", "status"])
+JOB_SECONDS = Histogram(
+    "job_duration_seconds",
+    "Time spent running one attempt of a background job",
+    ["kind"],
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def new_job(kind, payload, max_attempts=5):
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "status": "queued",
+        "payload": payload,
+        "progress": {},
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "error": None,
+        "run_after": now,
+        "lease_expires_at": None,
+        "locked_by": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+    }
+
+
+class Progress:
+    """Handle a running job uses to checkpoint progress and keep its lease.
+
+    Updates only apply while the job is still running under this worker, so a
+    cancelled or re-claimed job stops at its next checkpoint.
+    """
+
+    def __init__(self, collection, job, worker_id, lease):
+        self._collection = collection
+        self._job_id = job["id"]
+        self._worker_id = worker_id
+        self._lease = lease
+        self.state = dict(job.get("progress") or {})
+
+    async def update(self, **fields):
+        self.state.update(fields)
+        now = datetime.now(timezone.utc)
+        result = await self._collection.update_one(
+            {"id": self._job_id, "status": "running", "locked_by": self._worker_id},
+            {"$set": {"progress": self.state, "updated_at": now, "lease_expires_at": now + self._lease}},
+        )
+        if result.matched_count == 0:
+            raise JobCancelled()
+
+
+class JobRunner:
+    """Durable background jobs stored in Mongo and run by in-process workers.
+
+    Any worker process can claim a queued job with one atomic
+    ``find_one_and_update``. Running jobs hold a lease they renew at every
+    progress checkpoint; a job whose lease lapses (its process died) is
+    claimed again and resumes from its last checkpoint. Failed attempts are
+    retried with exponential backoff up to ``max_attempts``.
+    """
+
+    def __init__(self, workers=2, poll_seconds=5.0, lease_seconds=120, backoff_seconds=30):
+        self.collection = None
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease = timedelta(seconds=lease_seconds)
+        self.backoff_seconds = backoff_seconds
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers = {}
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def register(self, kind, handler):
+        """``handler(job, progress)`` runs one attempt of a ``kind`` job."""
+        self._handlers[kind] = handler
+
+    async def enqueue(self, kind, payload, max_attempts=5):
+        job = new_job(kind, payload, max_attempts)
+        await self.collection.insert_one(job)
+        job.pop("_id", None)
+        # Let a local worker pick it up without waiting for the next poll.
+        self._wakeup.set()
+        return job
+
+    async def cancel(self, job_id):
+        return await self.collection.find_one_and_update(
+            {"id": job_id, "status": {"$in": ["queued", "running"]}},
+            {"$set": {
+                "status": "cancelled",
+                "locked_by": None,
+                "updated_at": datetime.now(timezone.utc),
+                "finished_at": datetime.now(timezone.utc),
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _claim(self):
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {
+                "kind": {"$in": list(self._handlers)},
+                "$or": [
+                    {"status": "queued", "run_after": {"$lte": now}},
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "locked_by": self.worker_id,
+                    "lease_expires_at": now + self.lease,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _finish(self, job, fields):
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"id": job["id"], "status": "running", "locked_by": self.worker_id},
+            {"$set": {**fields, "locked_by": None, "lease_expires_at": None, "updated_at": now}},
+        )
+
+    async def _run(self, job):
+        progress = Progress(self.collection, job, self.worker_id, self.lease)
+        try:
+            with JOB_SECONDS.time(kind=job["kind"]):
+                await self._handlers[job["kind"]](job, progress)
+        except JobCancelled:
+            JOBS_FINISHED.inc(kind=job["kind"], status="cancelled")
+            logger.info("Job %s (%s) cancelled", job["id"], job["kind"])
+        except asyncio.CancelledError:
+            # Shutting down: leave the lease to lapse so another worker resumes it.
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) attempt %s failed", job["id"], job["kind"], job["attempts"])
+            if job["attempts"] >= job["max_attempts"]:
+                JOBS_FINISHED.inc(kind=job["kind"], status="failed")
+                await self._finish(job, {
+                    "status": "failed", "error": str(exc), "finished_at": datetime.now(timezone.utc),
+                })
+            else:
+                delay = self.backoff_seconds * 2 ** (job["attempts"] - 1)
+                await self._finish(job, {
+                    "status": "queued",
+                    "error": str(exc),
+                    "run_after": datetime.now(timezone.utc) + timedelta(seconds=delay),
+                })
+        else:
+            JOBS_FINISHED.inc(kind=job["kind"], status="done")
+            await self._finish(job, {"status": "done", "error": None, "finished_at": datetime.now(timezone.utc)})
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self._claim()
+            except PyMongoError:
+                logger.exception("Claiming a job failed")
+                job = None
+            if job is not None:
+                try:
+                    await self._run(job)
+                except PyMongoError:
+                    logger.exception("Recording the outcome of job %s failed", job["id"])
+                continue
+            await self._idle()
+
+    async def _idle(self):
+        # Until the next poll, or sooner when a job is enqueued in this process.
+        # asyncio.wait rather than wait_for: the latter can swallow a
+        # cancellation that races its timeout, hanging shutdown.
+        self._wakeup.clear()
+        waiters = [asyncio.ensure_future(self._wakeup.wait()), asyncio.ensure_future(asyncio.sleep(self.poll_seconds))]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    def start(self, collection):
+        self.collection = collection
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
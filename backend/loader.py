@@ -0,0 +1,80 @@
+import asyncio
+import contextvars
+
+from metrics import Counter
+
+LOADER_BATCHES = Counter("loader_batches_total", "Batched queries issued by request coalescing loaders", ["loader"])
+LOADER_KEYS = Counter("loader_keys_total", "Keys requested through request coalescing loaders", ["loader", "result"])
+
+
+async def find_by_ids(collection, ids, projection):
+    """``{id: document}`` for every ``id`` that exists, in one ``$in`` query."""
+    documents = await collection.find({"id": {"$in": list(ids)}}, projection).to_list(None)
+    return {document["id"]: document for document in documents}
+
+
+class BatchLoader:
+    """Coalesces concurrent single-key lookups into batched queries.
+
+    Keys requested during the same event-loop tick are collected and resolved
+    by one ``batch_fn(keys) -> {key: value}`` call, scheduled with
+    ``call_soon`` so every request already runnable gets to join. A key that
+    is already being fetched shares the in-flight result instead of being
+    queried again. Nothing is cached once a batch has resolved.
+
+    Batches run in a fresh context rather than the first caller's, so they
+    are not bound by that request's deadline and their commands are not
+    attributed to it.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=1000):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._queued = None
+        self._inflight = {}
+        self._tasks = set()
+
+    async def load(self, key):
+        """The value for ``key``, or None when it does not exist."""
+        future = self._inflight.get(key)
+        if future is None:
+            if self._queued is None:
+                self._queued = []
+                asyncio.get_running_loop().call_soon(self._dispatch, context=contextvars.Context())
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._queued.append(key)
+            LOADER_KEYS.inc(loader=self.name, result="queued")
+        else:
+            LOADER_KEYS.inc(loader=self.name, result="shared")
+        # Shielded: one caller going away must not cancel the lookup for the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        keys, self._queued = self._queued, None
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.create_task(self._resolve(keys[start:start + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys):
+        LOADER_BATCHES.inc(loader=self.name)
+        futures = [self._inflight[key] for key in keys]
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+                    # Retrieved here so a batch nobody waits on any more does not log.
+                    future.exception()
+        else:
+            for key, future in zip(keys, futures):
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key, future in zip(keys, futures):
+                del self._inflight[key]
+                # No-op once resolved; releases the waiters if cancelled mid-query.
+                future.cancel()
@@ -0,0 +1,126 @@
+import uuid
+from datetime import datetime, timezone
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from metrics import Counter
+
+MESSAGES_SENT = Counter("messages_sent_total", "Direct and group messages sent", ["kind"])
+
+# Characters of the latest message kept on the conversation for inbox previews.
+PREVIEW_LENGTH = 140
+
+
+def direct_key(user_a, user_b):
+    """The same key for both directions, so a pair only ever has one direct conversation."""
+    return ":".join(sorted((user_a, user_b)))
+
+
+def _inbox_entry(conversation, user_id):
+    return {
+        "id": conversation["id"],
+        "user_id": user_id,
+        "conversation_id": conversation["id"],
+        "unread": 0,
+        "last_message_at": conversation["last_message_at"],
+        "last_read_at": None,
+    }
+
+
+async def create_conversation(db, created_by, member_ids, title=None):
+    """Start a conversation between ``created_by`` and ``member_ids``.
+
+    Two people without a title make a direct conversation; asking for one
+    that already exists returns the existing one. Every member gets an inbox
+    entry, which is what their inbox lists and where their unread count for
+    this conversation lives.
+    """
+    members = list(dict.fromkeys([created_by, *member_ids]))
+    now = datetime.now(timezone.utc)
+    conversation = {
+        "id": str(uuid.uuid4()),
+        "kind": "direct" if len(members) == 2 and not title else "group",
+        "title": title,
+        "member_ids": members,
+        "created_by": created_by,
+        "created_at": now,
+        "last_message_at": now,
+        "last_message": None,
+    }
+    if conversation["kind"] == "direct":
+        conversation["direct_key"] = direct_key(*members)
+    try:
+        await db.conversations.insert_one(conversation)
+    except DuplicateKeyError:
+        return await db.conversations.find_one({"direct_key": conversation["direct_key"]}, {"_id": 0})
+    conversation.pop("_id", None)
+    await db.inbox.insert_many([_inbox_entry(conversation, member) for member in members])
+    return conversation
+
+
+async def send_message(db, conversation, sender_id, body):
+    """Store a message and bump every other member's unread counters.
+
+    Each step is an indexed single-conversation write, so sending costs the
+    same however long the history is.
+    """
+    now = datetime.now(timezone.utc)
+    message = {
+        "id": str(uuid.uuid4()),
+        "conversation_id": conversation["id"],
+        "sender_id": sender_id,
+        "body": body,
+        "created_at": now,
+    }
+    await db.messages.insert_one(message)
+    message.pop("_id", None)
+
+    preview = {"sender_id": sender_id, "body": body[:PREVIEW_LENGTH], "created_at": now}
+    # Conditional: a slower concurrent send must not replace a newer preview.
+    await db.conversations.update_one(
+        {"id": conversation["id"], "last_message_at": {"$lte": now}},
+        {"$set": {"last_message": preview, "last_message_at": now}},
+    )
+    await db.inbox.update_many(
+        {"conversation_id": conversation["id"], "user_id": {"$ne": sender_id}},
+        {"$inc": {"unread": 1}, "$max": {"last_message_at": now}},
+    )
+    await db.inbox.update_one(
+        {"conversation_id": conversation["id"], "user_id": sender_id},
+        {"$max": {"last_message_at": now}, "$set": {"last_read_at": now}},
+    )
+    recipients = [member for member in conversation["member_ids"] if member != sender_id]
+    if recipients:
+        await db.user_counters.bulk_write(
+            [UpdateOne({"_id": member}, {"$inc": {"unread": 1}}, upsert=True) for member in recipients],
+            ordered=False,
+        )
+    MESSAGES_SENT.inc(kind=conversation["kind"])
+    return message
+
+
+async def mark_read(db, user_id, conversation_id):
+    """Clear the user's unread count for a conversation and take it off their total."""
+    entry = await db.inbox.find_one_and_update(
+        {"user_id": user_id, "conversation_id": conversation_id, "unread": {"$gt": 0}},
+        {"$set": {"unread": 0, "last_read_at": datetime.now(timezone.utc)}},
+        projection={"_id": 0, "unread": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    # Only the request that reset the entry subtracts, so concurrent reads
+    # cannot take the same messages off twice.
+    if entry is not None:
+        await db.user_counters.update_one({"_id": user_id}, {"$inc": {"unread": -entry["unread"]}})
+
+
+async def unread_total(db, user_id):
+    counter = await db.user_counters.find_one({"_id": user_id})
+    # A read can land between a send's inbox and counter writes; never show
+    # the brief negative that leaves.
+    return max(0, counter["unread"]) if counter else 0
+
+
+async def forget_user(db, user_id):
+    await db.inbox.delete_many({"user_id": user_id})
+    await db.user_counters.delete_one({"_id": user_id})
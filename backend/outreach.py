@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+import smtplib
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.message import EmailMessage
+
+from pymongo import UpdateOne
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+OUTREACH_MESSAGES = Counter("outreach_messages_total", "Outreach messages by outcome", ["outcome"])
+
+RECIPIENT_PROJECTION = {"_id": 0, "id": 1, "user_id": 1, "full_name": 1}
+EVENT_PROJECTION = {"_id": 0, "id": 1, "title": 1, "description": 1, "date": 1, "location": 1}
+
+
+class TransientDeliveryError(Exception):
+    """A batch failed part way; ``delivered`` lists the addresses already sent."""
+
+    def __init__(self, message, delivered=()):
+        super().__init__(message)
+        self.delivered = list(delivered)
+
+
+class LocalTransport:
+    """Keeps the last ``keep`` messages in memory instead of sending them; for development and tests.
+
+    Nothing is delivered, so campaigns count its messages as skipped.
+    """
+
+    delivers = False
+
+    def __init__(self, sender="AlumniConnect <no-reply@localhost>", keep=100):
+        self.sender = sender
+        self.outbox = deque(maxlen=keep)
+
+    async def send(self, messages):
+        """Deliver ``messages``; returns the addresses that were permanently rejected."""
+        self.outbox.extend(messages)
+        return []
+
+
+class SmtpTransport:
+    """Sends each batch over one SMTP connection, in a worker thread."""
+
+    delivers = True
+
+    def __init__(self, host, port=587, username=None, password=None, starttls=True, sender=None, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.sender = sender
+        self.timeout = timeout
+
+    def _send_batch(self, messages, delivered):
+        rejected = []
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                try:
+                    smtp.send_message(message)
+                    delivered.append(message["To"])
+                except smtplib.SMTPRecipientsRefused:
+                    rejected.append(message["To"])
+        return rejected
+
+    async def send(self, messages):
+        delivered = []
+        try:
+            return await asyncio.to_thread(self._send_batch, messages, delivered)
+        except (smtplib.SMTPException, OSError) as exc:
+            # Connection, auth and server errors: what was not delivered yet is retried.
+            raise TransientDeliveryError(str(exc), delivered) from exc
+
+
+def create_transport(env=os.environ):
+    sender = env.get("OUTREACH_SENDER", "AlumniConnect <no-reply@localhost>")
+    if env.get("OUTREACH_TRANSPORT", "local") == "smtp":
+        return SmtpTransport(
+            env["SMTP_HOST"],
+            port=int(env.get("SMTP_PORT", "587")),
+            username=env.get("SMTP_USERNAME"),
+            password=env.get("SMTP_PASSWORD"),
+            starttls=env.get("SMTP_STARTTLS", "true").lower() in ("1", "true"),
+            sender=sender,
+        )
+    return LocalTransport(sender)
+
+
+class TokenBucket:
+    """Async rate limiter: ``rate`` tokens per second, bursting up to ``burst``."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        # A request larger than the bucket is let through once the bucket is
+        # full and leaves it in debt, so the average rate still holds.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= min(tokens, self.capacity):
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((min(tokens, self.capacity) - self._tokens) / self.rate)
+
+
+def render_event_notification(event, profile, email, sender):
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = email
+    message["Subject"] = f"New event: {event['title']}"
+    message.set_content(
+        f"Hi {profile.get('full_name') or 'there'},\n\n"
+        f"A new alumni event has been announced.\n\n"
+        f"{event['title']}\n"
+        f"When: {event['date']:%A %d %B %Y, %H:%M} UTC\n"
+        f"Where: {event['location']}\n\n"
+        f"{event['description']}\n"
+    )
+    return message
+
+
+class EventCampaign:
+    """Job handler notifying every alumni profile about one event.
+
+    Recipients are streamed off an ``id``-ordered cursor in batches; each
+    batch resolves emails with one ``$in`` query, waits on the rate limiter,
+    is sent with retries and backoff, then checkpoints ``last_id`` so a
+    resumed job carries on where the previous attempt stopped.
+
+    Every recipient a transport call delivered to is recorded in
+    ``outreach_deliveries`` as soon as the call returns, before the lease is
+    renewed. Retries and resumed attempts skip recorded recipients, so
+    neither a failed batch nor a lapsed lease sends anyone a second email.
+    """
+
+    def __init__(self, db, transport, bucket, batch_size=100, max_retries=4, retry_base_seconds=2.0):
+        self.db = db
+        self.transport = transport
+        self.bucket = bucket
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+
+    async def __call__(self, job, progress):
+        event = await self.db.events.find_one({"id": job["payload"]["event_id"]}, EVENT_PROJECTION)
+        if event is None:
+            await progress.update(note="event no longer exists")
+            return
+        if "total" not in progress.state:
+            await progress.update(
+                total=await self.db.alumni_profiles.estimated_document_count(), sent=0, failed=0, skipped=0
+            )
+
+        last_id = progress.state.get("last_id")
+        cursor = (
+            self.db.alumni_profiles.find({"id": {"$gt": last_id}} if last_id else {}, RECIPIENT_PROJECTION)
+            .sort("id", 1)
+            .batch_size(self.batch_size)
+        )
+        batch = []
+        async for profile in cursor:
+            batch.append(profile)
+            if len(batch) >= self.batch_size:
+                await self._deliver(job["id"], event, batch, progress)
+                batch = []
+        if batch:
+            await self._deliver(job["id"], event, batch, progress)
+        await self.db.outreach_deliveries.delete_many({"job_id": job["id"]})
+
+    async def _deliver(self, job_id, event, profiles, progress):
+        users = self.db.users.find(
+            {"id": {"$in": [profile["user_id"] for profile in profiles]}, "is_active": True},
+            {"_id": 0, "id": 1, "email": 1},
+        )
+        emails = {user["id"]: user["email"] async for user in users}
+        recipients = [profile for profile in profiles if profile["user_id"] in emails]
+        # Recipients an earlier attempt reached but did not checkpoint
+        recorded = {
+            delivery["user_id"]: delivery["status"]
+            async for delivery in self.db.outreach_deliveries.find(
+                {"job_id": job_id, "user_id": {"$in": [profile["user_id"] for profile in recipients]}},
+                {"_id": 0, "user_id": 1, "status": 1},
+            )
+        }
+        messages = [
+            render_event_notification(event, profile, emails[profile["user_id"]], self.transport.sender)
+            for profile in recipients
+            if profile["user_id"] not in recorded
+        ]
+        user_ids = {emails[profile["user_id"]]: profile["user_id"] for profile in recipients}
+        rejected = await self._send(job_id, messages, user_ids, progress) if messages else []
+
+        sent = len(messages) - len(rejected)
+        skipped = len(profiles) - len(recipients)
+        if not self.transport.delivers:
+            # Only kept in memory: nobody was emailed
+            skipped, sent = skipped + sent, 0
+        OUTREACH_MESSAGES.inc(sent, outcome="sent")
+        OUTREACH_MESSAGES.inc(len(rejected), outcome="failed")
+        OUTREACH_MESSAGES.inc(skipped, outcome="skipped")
+        resumed_failed = sum(1 for status in recorded.values() if status == "rejected")
+        state = progress.state
+        await progress.update(
+            sent=state["sent"] + sent + len(recorded) - resumed_failed,
+            failed=state["failed"] + len(rejected) + resumed_failed,
+            skipped=state["skipped"] + skipped,
+            last_id=profiles[-1]["id"],
+        )
+
+    async def _send(self, job_id, messages, user_ids, progress):
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire(len(messages))
+            try:
+                rejected = await self.transport.send(messages)
+            except TransientDeliveryError as exc:
+                await self._record(job_id, user_ids, exc.delivered, [])
+                delivered = set(exc.delivered)
+                messages = [message for message in messages if message["To"] not in delivered]
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_base_seconds * 2 ** attempt
+                logger.warning("Outreach batch failed, retrying in %.0fs", delay, exc_info=True)
+                await asyncio.sleep(delay)
+                # Renews the lease; stops here if another worker claimed the job meanwhile
+                await progress.update()
+                continue
+            refused = set(rejected)
+            await self._record(
+                job_id, user_ids, [message["To"] for message in messages if message["To"] not in refused], rejected
+            )
+            return rejected
+
+    async def _record(self, job_id, user_ids, delivered, rejected):
+        now = datetime.now(timezone.utc)
+        ops = [
+            UpdateOne(
+                {"job_id": job_id, "user_id": user_ids[address]},
+                {"$set": {"status": status}, "$setOnInsert": {"created_at": now}},
+                upsert=True,
+            )
+            for status, addresses in (("sent", delivered), ("rejected", rejected))
+            for address in addresses
+        ]
+        if ops:
+            await self.db.outreach_deliveries.bulk_write(ops, ordered=False)
@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+
+from pymongo import ASCENDING
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(doc, sort_field):
+    raw = json.dumps([_encode_value(doc.get(sort_field)), doc["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _decode_value(value), str(last_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def keyset_filter(sort_field, value, last_id, direction=ASCENDING):
+    op = "$gt" if direction == ASCENDING else "$lt"
+    return {"$or": [
+        {sort_field: {op: value}},
+        {sort_field: value, "id": {op: last_id}},
+    ]}
+
+
+async def fetch_page(collection, query, sort_field, limit, cursor=None, direction=ASCENDING, projection=None):
+    """Return ``(docs, next_cursor)`` for one page ordered by ``(sort_field, id)``.
+
+    The sort must be backed by a ``(sort_field, id)`` index so every page costs
+    the same regardless of how deep into the collection it starts.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        keyset = keyset_filter(sort_field, value, last_id, direction)
+        query = {"$and": [query, keyset]} if query else keyset
+    docs = await (
+        collection.find(query, projection)
+        .sort([(sort_field, direction), ("id", direction)])
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+    return docs, next_cursor
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from metrics import Counter, Gauge
+
+PRINCIPAL_CACHE_REQUESTS = Counter(
+    "principal_cache_requests_total", "Authenticated principal cache lookups", ["result"]
+)
+PRINCIPAL_CACHE_SIZE = Gauge("principal_cache_entries", "Tokens held in the principal cache")
+
+
+class PrincipalCache:
+    """TTL + LRU cache of bearer token -> resolved ``User``.
+
+    Entries never outlive the token's own ``exp`` claim and can be dropped for
+    every token of a user at once when that user's account changes.
+
+    A lookup reads :attr:`generation` before loading the user and passes it
+    to :meth:`put`; any invalidation since then bumps the generation, and
+    the possibly stale principal is not stored.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._tokens_by_email = defaultdict(set)
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, token):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] <= now:
+                self._remove(token)
+                entry = None
+            if entry is None:
+                PRINCIPAL_CACHE_REQUESTS.inc(result="miss")
+                return None
+            self._entries.move_to_end(token)
+        PRINCIPAL_CACHE_REQUESTS.inc(result="hit")
+        return entry[0]
+
+    def put(self, token, user, token_expires_at, generation=None):
+        if not self.enabled:
+            return
+        expires_at = min(time.time() + self.ttl_seconds, token_expires_at)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                # Invalidated while the user was being loaded
+                return
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (user, expires_at)
+            self._tokens_by_email[user.email].add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+            PRINCIPAL_CACHE_SIZE.set(len(self._entries))
+
+    def invalidate_email(self, email):
+        with self._lock:
+            self.generation += 1
+            for token in list(self._tokens_by_email.get(email, ())):
+                self._remove(token)
+            PRINCIPAL_CACHE_SIZE.set(len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tokens_by_email.clear()
+            PRINCIPAL_CACHE_SIZE.set(0)
+
+    def _remove(self, token):
+        user, _ = self._entries.pop(token)
+        tokens = self._tokens_by_email.get(user.email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[user.email]
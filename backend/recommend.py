@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Fields the index needs; also the payload of cross-worker updates.
+INDEX_FIELDS = ("id", "user_id", "department", "degree", "graduation_year", "current_company", "current_position", "bio")
+INDEX_PROJECTION = {"_id": 0, **{field: 1 for field in INDEX_FIELDS}}
+
+# Exact-match attributes and their weights.
+ATTRIBUTE_WEIGHTS = {
+    "department": 3.0,
+    "current_company": 2.0,
+    "current_position": 1.5,
+    "degree": 1.0,
+}
+YEAR_WEIGHT = 2.0
+# Classmates score the full year weight, fading to zero this many years apart.
+YEAR_WINDOW = 5
+BIO_WEIGHT = 3.0
+# Terms in more than this share of bios carry no signal and have huge postings.
+MAX_TERM_DF = 0.2
+
+REASONS = {
+    "department": "Same department",
+    "current_company": "Works at the same company",
+    "current_position": "Same role",
+    "degree": "Same degree",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its my of on or our that the their this to was "
+    "we were with you your am me".split()
+)
+_NO_YEAR = -10000
+
+
+def _normalize(value):
+    return " ".join(str(value).lower().split()) if value else None
+
+
+def bio_terms(text):
+    terms = Counter(t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS and len(t) > 1)
+    if not terms:
+        return {}
+    # Sublinear tf, L2-normalized so long bios do not dominate.
+    weights = {term: 1.0 + math.log(count) for term, count in terms.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return {term: w / norm for term, w in weights.items()}
+
+
+class RecommendationIndex:
+    """In-memory similarity index over alumni profiles.
+
+    Each profile is a row. Exact-match attributes keep inverted postings
+    (value -> rows) and bio terms keep weighted postings (term -> row ->
+    weight), so a query only touches the rows that share something with the
+    profile asked about; graduation-year proximity is one vectorized pass
+    over a NumPy column. Rows of removed profiles are tombstoned and reused
+    on the next full rebuild.
+    """
+
+    def __init__(self, capacity=1024):
+        self.ids = []
+        self.rows = {}
+        self.user_rows = {}
+        self.docs = []
+        self.years = np.full(capacity, _NO_YEAR, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.postings = {field: defaultdict(set) for field in ATTRIBUTE_WEIGHTS}
+        self.terms = defaultdict(dict)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _grow(self):
+        extra = len(self.alive)
+        self.years = np.concatenate([self.years, np.full(extra, _NO_YEAR, dtype=np.int32)])
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+
+    def _unlink(self, row):
+        doc = self.docs[row]
+        for field in ATTRIBUTE_WEIGHTS:
+            value = doc[field]
+            if value is not None:
+                rows = self.postings[field][value]
+                rows.discard(row)
+                if not rows:
+                    del self.postings[field][value]
+        for term in doc["terms"]:
+            postings = self.terms[term]
+            postings.pop(row, None)
+            if not postings:
+                del self.terms[term]
+        self.user_rows.pop(doc["user_id"], None)
+
+    def upsert(self, profile):
+        doc = {field: _normalize(profile.get(field)) for field in ATTRIBUTE_WEIGHTS}
+        doc["user_id"] = profile.get("user_id")
+        doc["terms"] = bio_terms(profile.get("bio"))
+        row = self.rows.get(profile["id"])
+        if row is None:
+            row = len(self.ids)
+            if row >= len(self.alive):
+                self._grow()
+            self.ids.append(profile["id"])
+            self.docs.append(doc)
+            self.rows[profile["id"]] = row
+        else:
+            self._unlink(row)
+            self.docs[row] = doc
+        for field in ATTRIBUTE_WEIGHTS:
+            if doc[field] is not None:
+                self.postings[field][doc[field]].add(row)
+        for term, weight in doc["terms"].items():
+            self.terms[term][row] = weight
+        self.user_rows[doc["user_id"]] = row
+        year = profile.get("graduation_year")
+        self.years[row] = year if isinstance(year, int) else _NO_YEAR
+        self.alive[row] = True
+
+    def remove(self, profile_id):
+        row = self.rows.pop(profile_id, None)
+        if row is not None:
+            self._unlink(row)
+            self.docs[row] = {field: None for field in ATTRIBUTE_WEIGHTS} | {"user_id": None, "terms": {}}
+            self.alive[row] = False
+
+    def recommend(self, user_id, limit=10, mentors=False):
+        """Top ``limit`` ``(profile_id, score, reasons)`` for the user's profile, or None."""
+        row = self.user_rows.get(user_id)
+        if row is None:
+            return None
+        size = len(self.ids)
+        doc = self.docs[row]
+        scores = np.zeros(size, dtype=np.float32)
+
+        for field, weight in ATTRIBUTE_WEIGHTS.items():
+            value = doc[field]
+            if value is not None:
+                rows = self.postings[field][value]
+                scores[np.fromiter(rows, dtype=np.int64, count=len(rows))] += weight
+
+        year = int(self.years[row])
+        years = self.years[:size]
+        if year != _NO_YEAR:
+            gap = np.abs(years - year).astype(np.float32)
+            scores += YEAR_WEIGHT * np.clip(1.0 - gap / YEAR_WINDOW, 0.0, None) * (years != _NO_YEAR)
+
+        max_df = max(2, MAX_TERM_DF * len(self.rows))
+        for term, query_weight in doc["terms"].items():
+            postings = self.terms.get(term)
+            if not postings or len(postings) > max_df:
+                continue
+            idf = math.log(len(self.rows) / len(postings))
+            rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            weights = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            scores[rows] += BIO_WEIGHT * query_weight * idf * weights
+
+        eligible = self.alive[:size].copy()
+        eligible[row] = False
+        if mentors:
+            # Mentors graduated earlier than the user.
+            if year == _NO_YEAR:
+                return []
+            eligible &= (years < year) & (years != _NO_YEAR)
+        scores[~eligible] = -np.inf
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[i], round(float(scores[i]), 3), self._reasons(doc, year, int(i))) for i in candidates]
+
+    def _reasons(self, doc, year, row):
+        other = self.docs[row]
+        reasons = [text for field, text in REASONS.items() if doc[field] is not None and doc[field] == other[field]]
+        other_year = int(self.years[row])
+        if year != _NO_YEAR and other_year != _NO_YEAR and abs(other_year - year) < YEAR_WINDOW:
+            reasons.append("Graduated the same year" if other_year == year else f"Class of {other_year}")
+        shared = sorted(set(doc["terms"]) & set(other["terms"]), key=lambda term: -doc["terms"][term])[:3]
+        if shared:
+            reasons.append("Shared interests: " + ", ".join(shared))
+        return reasons
+
+
+class Recommender:
+    """Owns the live index; rebuilt from Mongo and kept current by updates."""
+
+    def __init__(self):
+        self.index = None
+        self._pending = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self):
+        return self.index is not None
+
+    def upsert(self, profile):
+        if self._pending is not None:
+            self._pending.append(("upsert", profile))
+        if self.index is not None:
+            self.index.upsert(profile)
+
+    def remove(self, profile_id):
+        if self._pending is not None:
+            self._pending.append(("remove", profile_id))
+        if self.index is not None:
+            self.index.remove(profile_id)
+
+    async def rebuild(self, collection):
+        """Build a fresh index off the event loop, then swap it in.
+
+        Updates that arrive while building are replayed on the new index, so
+        none are lost to a cursor that read a profile before it changed.
+        """
+        async with self._lock:
+            self._pending = []
+            try:
+                profiles = await collection.find({}, INDEX_PROJECTION).to_list(None)
+                index = await asyncio.to_thread(self._build, profiles)
+                for action, value in self._pending:
+                    if action == "upsert":
+                        index.upsert(value)
+                    else:
+                        index.remove(value)
+                self.index = index
+            finally:
+                self._pending = None
+        logger.info("Recommendation index built over %d profiles", len(self.index))
+
+    @staticmethod
+    def _build(profiles):
+        index = RecommendationIndex(capacity=max(1024, len(profiles)))
+        for profile in profiles:
+            index.upsert(profile)
+        return index
@@ -0,0 +1,175 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from metrics import Counter
+
+REFRESH_TOKEN_EVENTS = Counter(
+    "auth_refresh_tokens_total", "Refresh token outcomes", ["result"]
+)
+
+
+class RefreshTokenError(Exception):
+    pass
+
+
+class RefreshTokenReused(RefreshTokenError):
+    def __init__(self, family_id, user_id):
+        super().__init__("Refresh token reused")
+        self.family_id = family_id
+        self.user_id = user_id
+
+
+class RevokedFamilies:
+    """In-memory deny-list of revoked refresh token families.
+
+    A family is every refresh token descended from one login, plus the access
+    tokens issued alongside them (their ``fid`` claim).
+    """
+
+    def __init__(self):
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def add(self, family_id, expires_at):
+        with self._lock:
+            self._expires[family_id] = expires_at
+            if len(self._expires) % 1024 == 0:
+                self._prune()
+
+    def __contains__(self, family_id):
+        expires_at = self._expires.get(family_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def _prune(self):
+        now = time.time()
+        for family_id in [f for f, exp in self._expires.items() if exp <= now]:
+            del self._expires[family_id]
+
+
+def family_of(token):
+    family_id, _, secret = token.partition(".")
+    if not family_id or not secret:
+        raise RefreshTokenError("Malformed refresh token")
+    return family_id
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenStore:
+    """Opaque, rotating refresh tokens stored as SHA-256 digests.
+
+    Tokens look like ``<family_id>.<secret>`` so a revoked family can be
+    rejected from memory before touching Mongo. Each token can be used once;
+    presenting an already-used token revokes its whole family.
+
+    Browser tabs share one stored token but cannot share an in-flight
+    refresh, so two tabs may present the same token together. Within
+    ``reuse_grace_seconds`` of its first use a token is therefore accepted
+    again, and rotating it yields the same successor: successors are derived
+    from their predecessor with an HMAC keyed by ``secret``, so every tab and
+    worker ends up holding the same token.
+    """
+
+    def __init__(self, ttl_days=30, revoked=None, secret=None, reuse_grace_seconds=30):
+        self.ttl = timedelta(days=ttl_days)
+        self.revoked = revoked if revoked is not None else RevokedFamilies()
+        self.secret = secret or secrets.token_bytes(32)
+        self.reuse_grace = timedelta(seconds=reuse_grace_seconds)
+
+    def successor_of(self, token):
+        mac = hmac.new(self.secret, token.encode(), hashlib.sha256).digest()
+        return f"{family_of(token)}.{base64.urlsafe_b64encode(mac).rstrip(b'=').decode()}"
+
+    async def issue(self, db, user_id, family_id=None, predecessor=None):
+        """A new token, or with ``predecessor`` the one token that replaces it."""
+        if predecessor is not None:
+            family_id = family_of(predecessor)
+            token = self.successor_of(predecessor)
+        else:
+            family_id = family_id or uuid.uuid4().hex
+            token = f"{family_id}.{secrets.token_urlsafe(32)}"
+        now = datetime.now(timezone.utc)
+        try:
+            await db.refresh_tokens.insert_one({
+                "token_hash": _digest(token),
+                "family_id": family_id,
+                "user_id": user_id,
+                "used": False,
+                "revoked": False,
+                "created_at": now,
+                "expires_at": now + self.ttl,
+            })
+        except DuplicateKeyError:
+            # A concurrent refresh with the same predecessor stored it already
+            if predecessor is None:
+                raise
+        return token, family_id
+
+    async def consume(self, db, token):
+        """Mark ``token`` used and return its record, or raise RefreshTokenError.
+
+        Rotate with ``issue(..., predecessor=token)``.
+        """
+        family_id = family_of(token)
+        if family_id in self.revoked:
+            REFRESH_TOKEN_EVENTS.inc(result="revoked")
+            raise RefreshTokenError("Refresh token revoked")
+
+        now = datetime.now(timezone.utc)
+        record = await db.refresh_tokens.find_one_and_update(
+            {"token_hash": _digest(token), "used": False, "revoked": False, "expires_at": {"$gt": now}},
+            {"$set": {"used": True, "used_at": now}},
+            projection={"_id": 0, "family_id": 1, "user_id": 1},
+        )
+        if record is not None:
+            REFRESH_TOKEN_EVENTS.inc(result="rotated")
+            return record
+
+        existing = await db.refresh_tokens.find_one(
+            {"token_hash": _digest(token)},
+            {"_id": 0, "used": 1, "used_at": 1, "revoked": 1, "family_id": 1, "user_id": 1},
+        )
+        if existing is not None and existing["used"] and not existing["revoked"]:
+            used_at = existing["used_at"].replace(tzinfo=timezone.utc)
+            if now - used_at <= self.reuse_grace:
+                # Another tab refreshed with it a moment ago; rotate to the same successor
+                REFRESH_TOKEN_EVENTS.inc(result="grace")
+                return {"family_id": existing["family_id"], "user_id": existing["user_id"]}
+        if existing is not None and existing["used"]:
+            # A rotated-out token came back: assume it was stolen.
+            REFRESH_TOKEN_EVENTS.inc(result="reused")
+            raise RefreshTokenReused(existing["family_id"], existing["user_id"])
+        REFRESH_TOKEN_EVENTS.inc(result="invalid")
+        raise RefreshTokenError("Invalid refresh token")
+
+    async def lookup(self, db, token):
+        family_of(token)
+        return await db.refresh_tokens.find_one(
+            {"token_hash": _digest(token)}, {"_id": 0, "family_id": 1, "user_id": 1}
+        )
+
+    async def revoke_family(self, db, family_id):
+        """Revoke every token in the family; returns when the deny-list entry can lapse."""
+        expires_at = time.time() + self.ttl.total_seconds()
+        self.revoked.add(family_id, expires_at)
+        await db.refresh_tokens.update_many({"family_id": family_id}, {"$set": {"revoked": True}})
+        return expires_at
+
+    async def load_revoked(self, db):
+        now = datetime.now(timezone.utc)
+        cursor = db.refresh_tokens.find(
+            {"revoked": True, "expires_at": {"$gt": now}}, {"_id": 0, "family_id": 1, "expires_at": 1}
+        )
+        async for record in cursor:
+            expires_at = record["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+            self.revoked.add(record["family_id"], expires_at)
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+
+from metrics import Counter
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Response cache lookups", ["namespace", "result"]
+)
+
+
+class CachedResponse:
+    __slots__ = ("version", "expires_at", "body", "etag", "headers")
+
+    def __init__(self, version, expires_at, body, headers):
+        self.version = version
+        self.expires_at = expires_at
+        self.body = body
+        self.headers = headers
+        # Strong validator over the exact bytes served, so it means the same
+        # thing on every worker.
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses, invalidated by per-namespace versions.
+
+    Writers call :meth:`bump` for a namespace; every entry built under an older
+    version is stale from then on. Concurrent misses for the same key share a
+    single load (single-flight), so an expiry under load costs one query.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._versions = defaultdict(int)
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def version(self, namespace):
+        return self._versions[namespace]
+
+    def bump(self, namespace):
+        self._versions[namespace] += 1
+
+    def invalidate(self, namespace, key):
+        """Drop this process's entry for one key; other workers keep theirs until it expires."""
+        self._entries.pop((namespace, key), None)
+
+    def peek(self, namespace, key):
+        entry = self._entries.get((namespace, key))
+        if entry is None or entry.version != self._versions[namespace] or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def stale(self, namespace, key):
+        """The retained entry for ``key`` however old, for when it cannot be reloaded."""
+        entry = self._entries.get((namespace, key))
+        if entry is not None:
+            RESPONSE_CACHE_REQUESTS.inc(namespace=namespace, result="stale")
+        return entry
+
+    async def get_or_load(self, namespace, key, loader, ttl_seconds=None):
+        """Return a fresh :class:`CachedResponse`, calling ``loader()`` on a miss.
+
+        ``loader`` returns ``(body_bytes, headers_dict)``. ``ttl_seconds``
+        overrides the cache's default for an entry built on this miss.
+        """
+        cache_key = (namespace, key)
+        entry = self.peek(namespace, key)
+        if entry is not None:
+            self._entries.move_to_end(cache_key)
+            RESPONSE_CACHE_REQUESTS.inc(namespace=namespace, result="hit")
+            return entry
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            RESPONSE_CACHE_REQUESTS.inc(namespace=namespace, result="coalesced")
+            return await asyncio.shield(inflight)
+
+        RESPONSE_CACHE_REQUESTS.inc(namespace=namespace, result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        version = self._versions[namespace]
+        try:
+            body, headers = await loader()
+            ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            entry = CachedResponse(version, time.monotonic() + ttl, body, headers)
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a miss with no waiters does not log a warning.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[cache_key]
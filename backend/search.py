@@ -0,0 +1,125 @@
+import re
+
+from pymongo import UpdateOne
+
+# Profile fields whose words can be matched by prefix (type-ahead).
+PREFIX_FIELDS = ("full_name", "current_company", "current_position")
+FACET_LIMIT = 20
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Aggregation test for a profile whose search fields were never computed.
+_NOT_BACKFILLED = {"$eq": [{"$ifNull": ["$search_tokens", None]}, None]}
+
+
+def tokenize(text):
+    return [word.lower() for word in _WORD.findall(text or "")]
+
+
+def search_fields(profile):
+    """Per-field tokens plus their union, the indexed ``search_terms``."""
+    tokens = {field: tokenize(profile.get(field)) for field in PREFIX_FIELDS}
+    return {"search_tokens": tokens, "search_terms": sorted(set().union(*tokens.values()))}
+
+
+def search_update_pipeline(update_data):
+    """Update pipeline that applies ``update_data`` and refreshes search_terms.
+
+    Only the tokens of the fields being changed are known here; Mongo unions
+    them with the stored tokens of the other fields in the same write. A
+    profile not backfilled yet has no stored tokens to union with, so it is
+    left without search fields for :func:`backfill_search_terms` to fill in
+    whole, rather than given partial ones.
+    """
+    values = {field: {"$literal": value} for field, value in update_data.items()}
+    tokens = {
+        field: {"$literal": tokenize(update_data[field])}
+        if field in update_data
+        else {"$ifNull": [f"$search_tokens.{field}", []]}
+        for field in PREFIX_FIELDS
+    }
+    union = [{"$ifNull": [f"$search_tokens.{field}", []]} for field in PREFIX_FIELDS]
+    return [
+        {"$set": values},
+        {"$set": {"search_tokens": {"$cond": [_NOT_BACKFILLED, "$$REMOVE", tokens]}}},
+        {"$set": {"search_terms": {"$cond": [_NOT_BACKFILLED, "$$REMOVE", {"$setUnion": union}]}}},
+    ]
+
+
+def build_match(q=None, mode="prefix", department=None, graduation_year=None, degree=None, company=None):
+    match = {}
+    if q:
+        if mode == "text":
+            match["$text"] = {"$search": q}
+        else:
+            # Anchored, case-sensitive regexes over lower-cased terms stay
+            # index range scans on the multikey search_terms index.
+            prefixes = [{"search_terms": {"$regex": "^" + re.escape(token)}} for token in tokenize(q)]
+            if prefixes:
+                match["$and"] = prefixes
+    if department is not None:
+        match["department"] = department
+    if graduation_year is not None:
+        match["graduation_year"] = graduation_year
+    if degree is not None:
+        match["degree"] = degree
+    if company is not None:
+        match["current_company"] = company
+    return match
+
+
+def _facet(field):
+    return [
+        {"$match": {field: {"$nin": [None, ""]}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": FACET_LIMIT},
+    ]
+
+
+def build_pipeline(match, text_search, offset, limit, projection):
+    if text_search:
+        sort = {"score": {"$meta": "textScore"}, "id": 1}
+    else:
+        sort = {"full_name": 1, "id": 1}
+    return [
+        {"$match": match},
+        {"$facet": {
+            "results": [{"$sort": sort}, {"$skip": offset}, {"$limit": limit}, {"$project": projection}],
+            "total": [{"$count": "count"}],
+            "department": _facet("department"),
+            "graduation_year": _facet("graduation_year"),
+            "company": _facet("current_company"),
+        }},
+    ]
+
+
+async def search_alumni(collection, match, text_search=False, offset=0, limit=20, projection=None):
+    """Run the search and all facet counts in a single aggregation round trip."""
+    pipeline = build_pipeline(match, text_search, offset, limit, projection or {"_id": 0})
+    docs = await collection.aggregate(pipeline).to_list(1)
+    result = docs[0] if docs else {}
+    total = result.get("total") or [{"count": 0}]
+    return {
+        "total": total[0]["count"],
+        "results": result.get("results", []),
+        "facets": {
+            name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in result.get(name, [])]
+            for name in ("department", "graduation_year", "company")
+        },
+    }
+
+
+async def backfill_search_terms(collection, batch_size=1000):
+    """Populate search fields on profiles written before search existed.
+
+    Selects on ``search_terms``, whose index also holds the profiles lacking
+    it, so a boot with nothing left to backfill does not scan the collection.
+    """
+    projection = {"_id": 1, **{field: 1 for field in PREFIX_FIELDS}}
+    batch = []
+    async for doc in collection.find({"search_terms": {"$exists": False}}, projection):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": search_fields(doc)}))
+        if len(batch) >= batch_size:
+            await collection.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
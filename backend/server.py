@@ -1,29 +1,115 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
+import asyncio
+import contextvars
 from pathlib import Path
+from contextlib import asynccontextmanager
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 import uuid
 from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-import bcrypt
+
+from account_claims import AccountClaims, ClaimInvitations
+from breaker import CircuitBreaker
+from bus import create_bus
+from calendar_feed import (
+    CALENDAR_MEDIA_TYPE,
+    calendar_fingerprint,
+    event_window,
+    feed_token_digest,
+    new_feed_token,
+    stream_calendar,
+)
+from compression import CompressionMiddleware
+from database import create_client, read_database
+from deadlines import DeadlineMiddleware, parse_route_deadlines
+from dedupe import DEDUPE_FIELDS, DedupeScan, blocking_keys, check_profile, dedupe_fields, forget_profile
+from exports import MEDIA_TYPES, stream_alumni
+from fastjson import FastJSONResponse, construct, construct_many, dumps, projection, select, sparse_projection
+from hashing import HashPool, HashPoolSaturated
+from hub import Hub, HubFull
+from importer import import_alumni
+from instrumentation import JWT_SECONDS, InstrumentationMiddleware
+from jobs import JobRunner
+from loader import BatchLoader, find_by_ids
+from messaging import create_conversation, forget_user, mark_read, send_message, unread_total
+from indexes import ensure_indexes, explain_query_shapes, verify_query_plans
+from metrics import REGISTRY
+from outreach import EventCampaign, TokenBucket, create_transport
+from pagination import InvalidCursor, fetch_page
+from recommend import INDEX_FIELDS, Recommender
+from principal_cache import PrincipalCache
+from refresh_tokens import RefreshTokenError, RefreshTokenReused, RefreshTokenStore
+from response_cache import ResponseCache, etag_matches
+from search import backfill_search_terms, build_match, search_alumni, search_fields, search_update_pipeline
+from stats import (
+    apply_changes,
+    event_changes,
+    load_dashboard,
+    profile_changes,
+    profile_update_changes,
+    reconcile,
+    reconcile_periodically,
+    user_changes,
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened by the lifespan. `db` serves auth and writes from
+# the primary; `db_reads` lets read-heavy admin routes use secondaries.
+client = None
+db = None
+db_reads = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, db, db_reads
+    if client is None:
+        client = create_client()
+    if db is None:
+        db = client[os.environ['DB_NAME']]
+    db_reads = read_database(client, db.name)
+
+    await ensure_indexes(db)
+    await refresh_tokens.load_revoked(db)
+    if os.environ.get("VERIFY_QUERY_PLANS", "").lower() in ("1", "true"):
+        await verify_query_plans(db)
+    await bus.start(db)
+    hub.start()
+    job_runner.register("event_notification", EventCampaign(
+        db, outreach_transport, outreach_limiter, batch_size=OUTREACH_BATCH_SIZE,
+    ))
+    job_runner.register("account_claims", ClaimInvitations(
+        db, account_claims, outreach_transport, outreach_limiter, ACCOUNT_CLAIM_URL, batch_size=OUTREACH_BATCH_SIZE,
+    ))
+    job_runner.register("dedupe_scan", DedupeScan(db, batch_size=DEDUPE_BATCH_SIZE))
+    job_runner.start(db.jobs)
+    background = [
+        asyncio.create_task(backfill_search_terms(db.alumni_profiles)),
+        asyncio.create_task(reconcile_periodically(db, STATS_RECONCILE_SECONDS)),
+        asyncio.create_task(recommender.rebuild(db.alumni_profiles)),
+    ]
+    yield
+    for task in background:
+        task.cancel()
+    await job_runner.stop()
+    await hub.stop()
+    await bus.stop()
+    client.close()
+    client = db = db_reads = None
+    hash_pool.shutdown()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -32,11 +118,135 @@ api_router = APIRouter(prefix="/api")
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Keyset pagination for list endpoints
+DEFAULT_PAGE_SIZE = int(os.environ.get("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "1000"))
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+
+# Dashboard counters are maintained on writes and fully recomputed periodically
+STATS_RECONCILE_SECONDS = int(os.environ.get("STATS_RECONCILE_SECONDS", "3600"))
+
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+
+# Imported alumni are mailed a one-time link ({token} is filled in) to set their password
+ACCOUNT_CLAIM_URL = os.environ.get("ACCOUNT_CLAIM_URL", "http://localhost:3000/claim?token={token}")
+account_claims = AccountClaims(ttl_days=int(os.environ.get("ACCOUNT_CLAIM_TTL_DAYS", "14")))
+
+# Duplicate profile detection; the full scan runs as a background job
+DEDUPE_BATCH_SIZE = int(os.environ.get("DEDUPE_BATCH_SIZE", "1000"))
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Direct and group messaging
+MAX_CONVERSATION_MEMBERS = int(os.environ.get("MAX_CONVERSATION_MEMBERS", "50"))
+
+# Per-request deadlines, enforced down to Mongo as maxTimeMS and pool waits.
+# REQUEST_DEADLINES overrides per route ("/api/route=seconds,..."; 0 is none).
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_SECONDS", "10"))
+REQUEST_DEADLINES = {
+    # Streamed bodies and the push channel run as long as they need to
+    "/api/admin/alumni/export": None,
+    "/api/admin/alumni/import": None,
+    "/api/stream": None,
+    "/api/events/calendar.ics": 60,
+    **parse_route_deadlines(os.environ.get("REQUEST_DEADLINES", "")),
+}
+
+# Sustained database failures or deadline misses open the circuit: requests then
+# fail fast with 503, and the events and stats routes answer from cached data
+db_breaker = CircuitBreaker(
+    "mongo",
+    failure_threshold=int(os.environ.get("DB_BREAKER_FAILURES", "5")),
+    reset_seconds=int(os.environ.get("DB_BREAKER_RESET_SECONDS", "30")),
+)
+DB_FALLBACK_ROUTES = ("/api/events", "/api/events/{event_id}", "/api/admin/stats")
+# Long-lived responses stay out of the breaker, so they never hold its probe
+DB_BREAKER_EXEMPT_ROUTES = (
+    "/api/stream",
+    "/api/events/calendar.ics",
+    "/api/admin/alumni/export",
+    "/api/admin/alumni/import",
+)
+# The last dashboard served, kept for while the circuit is open
+last_dashboard = None
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+background_tasks = set()
+
+def spawn(coro):
+    # A fresh context: the task outlives the request, so it must not inherit
+    # the request's deadline or have its commands attributed to the request
+    task = asyncio.create_task(coro, context=contextvars.Context())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# Password hashing runs on a bounded worker pool off the event loop
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+hash_pool = HashPool(
+    workers=int(os.environ.get("HASH_WORKERS", "4")),
+    max_queue=int(os.environ.get("HASH_QUEUE_SIZE", "64")),
+    rounds=BCRYPT_ROUNDS,
+    executor=os.environ.get("HASH_EXECUTOR", "thread"),
+)
 security = HTTPBearer()
 
+# Resolved users per bearer token, kept coherent across workers through the bus
+principal_cache = PrincipalCache(
+    max_size=int(os.environ.get("PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl_seconds=int(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+)
+bus = create_bus(os.environ.get("BUS_BACKEND", "local"))
+bus.subscribe("principal.invalidate", lambda payload: principal_cache.invalidate_email(payload["email"]))
+
+# Rotating refresh tokens; revoked families are denied from memory on every worker.
+# Within REFRESH_REUSE_GRACE_SECONDS, tabs refreshing together get the same successor.
+refresh_tokens = RefreshTokenStore(
+    ttl_days=REFRESH_TOKEN_EXPIRE_DAYS,
+    secret=SECRET_KEY.encode(),
+    reuse_grace_seconds=int(os.environ.get("REFRESH_REUSE_GRACE_SECONDS", "30")),
+)
+bus.subscribe("refresh.revoke", lambda payload: refresh_tokens.revoked.add(payload["family_id"], payload["expires_at"]))
+
+# Serialized read responses (events), revalidated with ETags
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "512")),
+    ttl_seconds=int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "30")),
+)
+bus.subscribe("cache.bump", lambda payload: response_cache.bump(payload["namespace"]))
+# RSVPs change attendee counts too often to invalidate every worker's events cache
+# on each seat: cached event pages show counts at most this old instead
+EVENT_COUNTS_MAX_AGE_SECONDS = int(os.environ.get("EVENT_COUNTS_MAX_AGE_SECONDS", "5"))
+
+# Server-sent event push; the bus carries broadcasts to the hub on every worker
+hub = Hub(
+    queue_size=int(os.environ.get("SSE_QUEUE_SIZE", "64")),
+    heartbeat_seconds=int(os.environ.get("SSE_HEARTBEAT_SECONDS", "15")),
+    max_subscribers=int(os.environ.get("SSE_MAX_SUBSCRIBERS", "10000")),
+)
+bus.subscribe("hub.broadcast", lambda payload: hub.publish(payload["event"], payload["data"]))
+
+# Durable background jobs, claimed from Mongo by workers in every process
+job_runner = JobRunner(
+    workers=int(os.environ.get("JOB_WORKERS", "2")),
+    poll_seconds=float(os.environ.get("JOB_POLL_SECONDS", "5")),
+)
+
+# Event notification emails (OUTREACH_TRANSPORT=local|smtp), rate limited per process.
+# The local transport sends nothing and keeps only the last few messages.
+OUTREACH_BATCH_SIZE = int(os.environ.get("OUTREACH_BATCH_SIZE", "100"))
+outreach_transport = create_transport()
+outreach_limiter = TokenBucket(
+    rate=float(os.environ.get("OUTREACH_RATE_PER_SECOND", "10")),
+    burst=int(os.environ.get("OUTREACH_BURST", "100")),
+)
+
+# Connection and mentor suggestions, served from an in-memory index on every worker
+recommender = Recommender()
+bus.subscribe("recommend.upsert", lambda payload: recommender.upsert(payload["profile"]))
+bus.subscribe("recommend.remove", lambda payload: recommender.remove(payload["id"]))
+bus.subscribe("recommend.rebuild", lambda payload: spawn(recommender.rebuild(db.alumni_profiles)))
+
 # Models
 class UserRole(str):
     ADMIN = "admin"
@@ -54,6 +264,10 @@ class UserCreate(BaseModel):
     password: str
     role: str = UserRole.ALUMNI
 
+class UserUpdate(BaseModel):
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -84,6 +298,9 @@ class AlumniProfileCreate(BaseModel):
     linkedin_url: Optional[str] = None
     bio: Optional[str] = None
 
+class AlumniImportRow(AlumniProfileCreate):
+    email: EmailStr
+
 class AlumniProfileUpdate(BaseModel):
     full_name: Optional[str] = None
     phone: Optional[str] = None
@@ -92,6 +309,19 @@ class AlumniProfileUpdate(BaseModel):
     linkedin_url: Optional[str] = None
     bio: Optional[str] = None
 
+class FacetCount(BaseModel):
+    value: Union[str, int]
+    count: int
+
+class AlumniBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_PAGE_SIZE)
+    fields: Optional[str] = Field(None, max_length=500)
+
+class AlumniSearchResults(BaseModel):
+    total: int
+    results: List[AlumniProfile]
+    facets: Dict[str, List[FacetCount]]
+
 class Event(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -100,27 +330,177 @@ class Event(BaseModel):
     location: str
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    capacity: Optional[int] = None
+    attendee_count: int = 0
 
 class EventCreate(BaseModel):
     title: str
     description: str
     date: datetime
     location: str
+    capacity: Optional[int] = Field(None, ge=1)
+    notify_alumni: bool = True
+
+class Announcement(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    message: str
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class AnnouncementCreate(BaseModel):
+    title: str = Field(..., max_length=200)
+    message: str = Field(..., max_length=5000)
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str
+    payload: dict
+    progress: dict
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+class RSVP(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    event_id: str
+    user_id: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Attendee(BaseModel):
+    user_id: str
+    full_name: Optional[str] = None
+    rsvp_at: datetime
+
+class AlumniPublicProfile(BaseModel):
+    """What any signed-in alumnus may see of another; no contact details."""
+    id: str
+    full_name: str
+    graduation_year: int
+    degree: str
+    department: str
+    current_position: Optional[str] = None
+    current_company: Optional[str] = None
+    linkedin_url: Optional[str] = None
+
+class Recommendation(BaseModel):
+    profile: AlumniPublicProfile
+    score: float
+    reasons: List[str]
+
+class MessagePreview(BaseModel):
+    sender_id: str
+    body: str
+    created_at: datetime
+
+class Conversation(BaseModel):
+    id: str
+    kind: str
+    title: Optional[str] = None
+    member_ids: List[str]
+    created_by: str
+    created_at: datetime
+    last_message_at: datetime
+    last_message: Optional[MessagePreview] = None
+
+class ConversationCreate(BaseModel):
+    member_ids: List[str] = Field(..., min_length=1, max_length=MAX_CONVERSATION_MEMBERS - 1)
+    title: Optional[str] = Field(None, max_length=200)
+
+class InboxEntry(BaseModel):
+    conversation: Conversation
+    unread: int
+    last_read_at: Optional[datetime] = None
+
+class UnreadCount(BaseModel):
+    unread: int
+
+class Message(BaseModel):
+    id: str
+    conversation_id: str
+    sender_id: str
+    body: str
+    created_at: datetime
+
+class MessageCreate(BaseModel):
+    body: str = Field(..., min_length=1, max_length=5000)
+
+class DuplicateCandidate(BaseModel):
+    id: str
+    profile_ids: List[str]
+    score: float
+    reasons: List[str]
+    status: str
+    detected_by: str
+    created_at: datetime
+    updated_at: datetime
+
+class DuplicateCandidateReport(DuplicateCandidate):
+    profiles: List[AlumniProfile]
 
 class Token(BaseModel):
     access_token: str
     token_type: str
     user: User
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class CalendarFeed(BaseModel):
+    url: str
+
+class AccountClaimRequest(BaseModel):
+    token: str
+    password: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+# Projections returning exactly the response fields (never _id or password)
+USER_PROJECTION = projection(User)
+ALUMNI_PROJECTION = projection(AlumniProfile)
+PUBLIC_PROFILE_PROJECTION = projection(AlumniPublicProfile)
+EVENT_PROJECTION = projection(Event)
+JOB_PROJECTION = projection(Job)
+CONVERSATION_PROJECTION = projection(Conversation)
+MESSAGE_PROJECTION = projection(Message)
+DUPLICATE_PROJECTION = projection(DuplicateCandidate)
+
+# Concurrent lookups by id are coalesced into one $in query per loop tick
+alumni_loader = BatchLoader("alumni_profiles", lambda ids: find_by_ids(db.alumni_profiles, ids, ALUMNI_PROJECTION))
+event_loader = BatchLoader("events", lambda ids: find_by_ids(db.events, ids, EVENT_PROJECTION))
+
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def auth_overloaded(retry_after: int):
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+def database_unavailable():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Database unavailable, please retry shortly",
+        headers={"Retry-After": str(db_breaker.retry_after)},
+    )
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def verify_password(plain_password, hashed_password):
+    try:
+        return await hash_pool.verify(plain_password, hashed_password)
+    except HashPoolSaturated as exc:
+        raise auth_overloaded(exc.retry_after)
+
+async def get_password_hash(password):
+    try:
+        return await hash_pool.hash(password)
+    except HashPoolSaturated as exc:
+        raise auth_overloaded(exc.retry_after)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -129,7 +509,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    with JWT_SECONDS.time(operation="encode"):
+        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -138,20 +519,104 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    token = credentials.credentials
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with JWT_SECONDS.time(operation="decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("fid") in refresh_tokens.revoked:
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    
-    user = await db.users.find_one({"email": token_data.email})
+    # Cached principals keep working while the circuit is open; new ones cannot be resolved
+    if db_breaker.is_open:
+        raise database_unavailable()
+
+    # An invalidation arriving during the read must not be undone by the put below
+    generation = principal_cache.generation
+    user = await db.users.find_one({"email": token_data.email}, USER_PROJECTION)
     if user is None:
         raise credentials_exception
-    return User(**user)
+    user_obj = construct(User, user)
+    if not user_obj.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    principal_cache.put(token, user_obj, payload["exp"], generation)
+    return user_obj
+
+async def fetch_page_or_400(collection, sort_field: str, limit: int, cursor: Optional[str], query: Optional[dict] = None, projection: Optional[dict] = None, direction: int = ASCENDING):
+    try:
+        return await fetch_page(collection, query or {}, sort_field, limit, cursor, direction=direction, projection=projection)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def sparse_projection_or_400(model, fields: Optional[str]):
+    if fields is None:
+        return None
+    try:
+        return sparse_projection(model, fields)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+def next_cursor_headers(next_cursor: Optional[str]):
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+def cached_response(request: Request, entry):
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache", **entry.headers}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+async def cached_or_stale(namespace: str, key, loader, ttl_seconds: Optional[int] = None):
+    # While the circuit is open, the last response built for the key is served instead
+    if db_breaker.is_open:
+        entry = response_cache.stale(namespace, key)
+        if entry is None:
+            raise database_unavailable()
+        return entry
+    return await response_cache.get_or_load(namespace, key, loader, ttl_seconds)
+
+async def bump_cache(namespace: str):
+    await bus.publish("cache.bump", {"namespace": namespace})
+
+async def invalidate_principal(email: str):
+    await bus.publish("principal.invalidate", {"email": email})
+
+async def broadcast(event: str, data):
+    # Serialized here so every worker pushes byte-identical JSON
+    await bus.publish("hub.broadcast", {"event": event, "data": dumps(data).decode()})
+
+async def reindex_profile(profile: dict):
+    await bus.publish("recommend.upsert", {"profile": {field: profile.get(field) for field in INDEX_FIELDS}})
+
+async def issue_tokens(user_obj: User, family_id: Optional[str] = None, predecessor: Optional[str] = None):
+    refresh_token, family_id = await refresh_tokens.issue(db, user_obj.id, family_id, predecessor)
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user_obj.email, "fid": family_id}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer", "user": user_obj, "refresh_token": refresh_token}
+
+async def revoke_refresh_family(family_id: str, user_id: str):
+    expires_at = await refresh_tokens.revoke_family(db, family_id)
+    await bus.publish("refresh.revoke", {"family_id": family_id, "expires_at": expires_at})
+    # Drop cached principals so access tokens of the family are re-checked
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "email": 1})
+    if user:
+        await invalidate_principal(user["email"])
 
 async def get_current_admin(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
@@ -164,49 +629,94 @@ async def get_current_admin(current_user: User = Depends(get_current_user)):
 # Auth Routes
 @api_router.post("/auth/register", response_model=Token)
 async def register(user: UserCreate):
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     # Hash password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     
     # Create user
     user_dict = user.dict()
     user_dict["password"] = hashed_password
     user_obj = User(**{k: v for k, v in user_dict.items() if k != "password"})
     
-    await db.users.insert_one({**user_obj.dict(), "password": hashed_password})
-    
-    # Create access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    # The unique email index rejects existing users in the same round trip
+    try:
+        await db.users.insert_one({**user_obj.dict(), "password": hashed_password})
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    await apply_changes(db, user_changes(1))
     
-    return {"access_token": access_token, "token_type": "bearer", "user": user_obj}
+    return await issue_tokens(user_obj)
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(user: UserLogin):
     db_user = await db.users.find_one({"email": user.email})
-    if not db_user or not verify_password(user.password, db_user["password"]):
+    # Bulk-imported alumni have no password until they claim their account
+    if not db_user or not db_user.get("password") or not await verify_password(user.password, db_user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+    user_obj = construct(User, {k: v for k, v in db_user.items() if k not in ("_id", "password")})
+    return await issue_tokens(user_obj)
+
+@api_router.post("/auth/claim", response_model=Token)
+async def claim_account(body: AccountClaimRequest):
+    # Sets the first password of a bulk-imported alumnus, given the token mailed to them
+    invalid_claim = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid or expired claim link"
     )
-    
-    user_obj = User(**{k: v for k, v in db_user.items() if k != "password"})
-    return {"access_token": access_token, "token_type": "bearer", "user": user_obj}
+    # Checked before hashing so guessed tokens cost no bcrypt work
+    if await account_claims.lookup(db, body.token) is None:
+        raise invalid_claim
+    hashed_password = await get_password_hash(body.password)
+    record = await account_claims.consume(db, body.token)
+    if record is None:
+        raise invalid_claim
+    claimed = await db.users.find_one_and_update(
+        {"id": record["user_id"], "password": {"$exists": False}},
+        {"$set": {"password": hashed_password}},
+        projection=USER_PROJECTION,
+    )
+    if claimed is None:
+        raise invalid_claim
+    return await issue_tokens(construct(User, claimed))
+
+@api_router.post("/auth/refresh", response_model=Token)
+async def refresh_access_token(body: RefreshRequest):
+    # Exchanges a refresh token for a new pair without another bcrypt verify
+    invalid_refresh = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        record = await refresh_tokens.consume(db, body.refresh_token)
+    except RefreshTokenReused as exc:
+        # A rotated-out token was replayed: end every session of that login
+        await revoke_refresh_family(exc.family_id, exc.user_id)
+        raise invalid_refresh
+    except RefreshTokenError:
+        raise invalid_refresh
+
+    user = await db.users.find_one({"id": record["user_id"]}, USER_PROJECTION)
+    if user is None or not user.get("is_active", True):
+        raise invalid_refresh
+    return await issue_tokens(construct(User, user), predecessor=body.refresh_token)
+
+@api_router.post("/auth/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshRequest):
+    try:
+        record = await refresh_tokens.lookup(db, body.refresh_token)
+    except RefreshTokenError:
+        record = None
+    if record is not None:
+        await revoke_refresh_family(record["family_id"], record["user_id"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @api_router.get("/auth/me", response_model=User)
 async def read_users_me(current_user: User = Depends(get_current_user)):
@@ -215,124 +725,716 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 # Alumni Profile Routes
 @api_router.post("/alumni/profile", response_model=AlumniProfile)
 async def create_alumni_profile(profile: AlumniProfileCreate, current_user: User = Depends(get_current_user)):
-    # Check if profile already exists
-    existing_profile = await db.alumni_profiles.find_one({"user_id": current_user.id})
-    if existing_profile:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Profile already exists"
-        )
-    
     profile_dict = profile.dict()
     profile_dict["user_id"] = current_user.id
     profile_obj = AlumniProfile(**profile_dict)
+    profile_doc = profile_obj.dict()
+    profile_doc.update(search_fields(profile_doc))
+    profile_doc.update(dedupe_fields(profile_doc))
     
-    await db.alumni_profiles.insert_one(profile_obj.dict())
+    # The unique user_id index rejects a second profile in the same round trip
+    try:
+        await db.alumni_profiles.insert_one(profile_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Profile already exists"
+        )
+    await apply_changes(db, profile_changes(profile_doc, 1))
+    await reindex_profile(profile_doc)
+    await check_profile(db, profile_doc)
     return profile_obj
 
 @api_router.get("/alumni/profile", response_model=AlumniProfile)
 async def get_my_profile(current_user: User = Depends(get_current_user)):
-    profile = await db.alumni_profiles.find_one({"user_id": current_user.id})
+    profile = await db.alumni_profiles.find_one({"user_id": current_user.id}, ALUMNI_PROJECTION)
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
-    return AlumniProfile(**profile)
+    return FastJSONResponse(construct(AlumniProfile, profile))
 
 @api_router.put("/alumni/profile", response_model=AlumniProfile)
 async def update_my_profile(profile_update: AlumniProfileUpdate, current_user: User = Depends(get_current_user)):
-    existing_profile = await db.alumni_profiles.find_one({"user_id": current_user.id})
-    if not existing_profile:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profile not found"
-        )
-    
     update_data = {k: v for k, v in profile_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc)
     
-    await db.alumni_profiles.update_one(
+    # Single atomic round trip. The previous version is returned so stats can
+    # diff it; the updated profile is exactly that version plus update_data.
+    existing_profile = await db.alumni_profiles.find_one_and_update(
         {"user_id": current_user.id},
-        {"$set": update_data}
+        search_update_pipeline(update_data),
+        projection=ALUMNI_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
     )
+    if not existing_profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
     
-    updated_profile = await db.alumni_profiles.find_one({"user_id": current_user.id})
-    return AlumniProfile(**updated_profile)
+    updated_profile = {**existing_profile, **update_data}
+    await apply_changes(db, profile_update_changes(existing_profile, updated_profile))
+    await reindex_profile(updated_profile)
+    dedupe_keys = blocking_keys(updated_profile)
+    if dedupe_keys != blocking_keys(existing_profile):
+        # Blocking keys depend on the merged profile, known only after the update.
+        # Written only while the profile still holds the values they came from,
+        # so a concurrent edit's keys are never overwritten by older ones.
+        await db.alumni_profiles.update_one(
+            {"id": updated_profile["id"], **{field: updated_profile.get(field) for field in DEDUPE_FIELDS}},
+            {"$set": {"dedupe_keys": dedupe_keys}},
+        )
+        await check_profile(db, {**updated_profile, "dedupe_keys": dedupe_keys})
+    return FastJSONResponse(construct(AlumniProfile, updated_profile))
+
+@api_router.get("/alumni/recommendations", response_model=List[Recommendation])
+async def get_recommendations(
+    mode: str = Query("connections", pattern="^(connections|mentors)$"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+):
+    if not recommender.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are still being prepared",
+            headers={"Retry-After": "5"},
+        )
+    ranked = recommender.index.recommend(current_user.id, limit, mentors=mode == "mentors")
+    if ranked is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    profiles = await db_reads.alumni_profiles.find(
+        {"id": {"$in": [profile_id for profile_id, _, _ in ranked]}}, PUBLIC_PROFILE_PROJECTION
+    ).to_list(None)
+    by_id = {profile["id"]: profile for profile in profiles}
+    return FastJSONResponse([
+        {"profile": construct(AlumniPublicProfile, by_id[profile_id]), "score": score, "reasons": reasons}
+        for profile_id, score, reasons in ranked
+        if profile_id in by_id
+    ])
 
 # Admin Routes
 @api_router.get("/admin/alumni", response_model=List[AlumniProfile])
-async def get_all_alumni(current_admin: User = Depends(get_current_admin)):
-    alumni = await db.alumni_profiles.find().to_list(1000)
-    return [AlumniProfile(**alumni_profile) for alumni_profile in alumni]
+async def get_all_alumni(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, max_length=500),
+    current_admin: User = Depends(get_current_admin),
+):
+    sparse = sparse_projection_or_400(AlumniProfile, fields)
+    # The cursor is built from created_at, so it is read even when not returned
+    alumni, next_cursor = await fetch_page_or_400(
+        db_reads.alumni_profiles, "created_at", limit, cursor,
+        projection={**sparse, "created_at": 1} if sparse else ALUMNI_PROJECTION,
+    )
+    headers = next_cursor_headers(next_cursor)
+    if sparse:
+        return FastJSONResponse(select(alumni, sparse), headers=headers)
+    return FastJSONResponse(construct_many(AlumniProfile, alumni), headers=headers)
+
+@api_router.get("/admin/alumni/export")
+async def export_alumni(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    department: Optional[str] = None,
+    graduation_year: Optional[int] = None,
+    current_admin: User = Depends(get_current_admin),
+):
+    query = {}
+    if department is not None:
+        query["department"] = department
+    if graduation_year is not None:
+        query["graduation_year"] = graduation_year
+
+    filename = f"alumni.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_alumni(db_reads.alumni_profiles, query, fmt=format, compress=gzip, batch_size=EXPORT_BATCH_SIZE),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@api_router.get("/admin/alumni/search", response_model=AlumniSearchResults)
+async def search_alumni_profiles(
+    q: Optional[str] = Query(None, max_length=200),
+    mode: str = Query("prefix", pattern="^(prefix|text)$"),
+    department: Optional[str] = None,
+    graduation_year: Optional[int] = None,
+    degree: Optional[str] = None,
+    company: Optional[str] = None,
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: User = Depends(get_current_admin),
+):
+    match = build_match(q, mode, department, graduation_year, degree, company)
+    results = await search_alumni(
+        db_reads.alumni_profiles,
+        match,
+        text_search="$text" in match,
+        offset=offset,
+        limit=limit,
+        projection=ALUMNI_PROJECTION,
+    )
+    results["results"] = construct_many(AlumniProfile, results["results"])
+    return FastJSONResponse(results)
+
+@api_router.post("/admin/alumni/import")
+async def import_alumni_profiles(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    current_admin: User = Depends(get_current_admin),
+):
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    report = await import_alumni(db, request.stream(), format, AlumniImportRow, batch_size=IMPORT_BATCH_SIZE)
+    if report["imported"]:
+        spawn(reconcile(db))
+        await bus.publish("recommend.rebuild", {})
+    # New users cannot sign in until they follow the claim link mailed to them
+    if report["users_created"]:
+        job = await job_runner.enqueue("account_claims", {"import_id": report["import_id"]})
+        report["invitation_job_id"] = job["id"]
+    return report
+
+@api_router.post("/admin/alumni/batch", response_model=List[AlumniProfile])
+async def get_alumni_batch(batch: AlumniBatchRequest, current_admin: User = Depends(get_current_admin)):
+    # Requested order; ids that do not exist are left out
+    sparse = sparse_projection_or_400(AlumniProfile, batch.fields)
+    profiles = await find_by_ids(db.alumni_profiles, batch.ids, sparse or ALUMNI_PROJECTION)
+    found = [profiles[alumni_id] for alumni_id in dict.fromkeys(batch.ids) if alumni_id in profiles]
+    return FastJSONResponse(select(found, sparse) if sparse else construct_many(AlumniProfile, found))
 
 @api_router.get("/admin/alumni/{alumni_id}", response_model=AlumniProfile)
-async def get_alumni_by_id(alumni_id: str, current_admin: User = Depends(get_current_admin)):
-    profile = await db.alumni_profiles.find_one({"id": alumni_id})
+async def get_alumni_by_id(
+    alumni_id: str,
+    fields: Optional[str] = Query(None, max_length=500),
+    current_admin: User = Depends(get_current_admin),
+):
+    sparse = sparse_projection_or_400(AlumniProfile, fields)
+    if sparse:
+        profile = await db.alumni_profiles.find_one({"id": alumni_id}, sparse)
+    else:
+        profile = await alumni_loader.load(alumni_id)
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alumni not found"
         )
-    return AlumniProfile(**profile)
+    if sparse:
+        return FastJSONResponse(select([profile], sparse)[0])
+    return FastJSONResponse(construct(AlumniProfile, profile))
 
 @api_router.delete("/admin/alumni/{alumni_id}")
 async def delete_alumni(alumni_id: str, current_admin: User = Depends(get_current_admin)):
-    result = await db.alumni_profiles.delete_one({"id": alumni_id})
-    if result.deleted_count == 0:
+    profile = await db.alumni_profiles.find_one_and_delete({"id": alumni_id})
+    if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alumni not found"
         )
+    await apply_changes(db, profile_changes(profile, -1))
+    await bus.publish("recommend.remove", {"id": profile["id"]})
+    await forget_profile(db, profile["id"])
     return {"message": "Alumni deleted successfully"}
 
+# User management (admin)
+@api_router.patch("/admin/users/{user_id}", response_model=User)
+async def update_user(user_id: str, user_update: UserUpdate, current_admin: User = Depends(get_current_admin)):
+    update_data = {k: v for k, v in user_update.dict().items() if v is not None}
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    user = await db.users.find_one_and_update(
+        {"id": user_id},
+        {"$set": update_data},
+        projection=USER_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    await invalidate_principal(user["email"])
+    return construct(User, user)
+
+@api_router.delete("/admin/users/{user_id}")
+async def delete_user(user_id: str, current_admin: User = Depends(get_current_admin)):
+    user = await db.users.find_one_and_delete({"id": user_id}, projection={"email": 1})
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    profile = await db.alumni_profiles.find_one_and_delete({"user_id": user_id})
+    changes = user_changes(-1)
+    if profile:
+        changes += profile_changes(profile, -1)
+        await bus.publish("recommend.remove", {"id": profile["id"]})
+        await forget_profile(db, profile["id"])
+    await apply_changes(db, changes)
+    await db.refresh_tokens.delete_many({"user_id": user_id})
+    await forget_user(db, user_id)
+    # Hand back the seats the user was holding
+    rsvps = await db.rsvps.find({"user_id": user_id}, {"_id": 0, "event_id": 1}).to_list(None)
+    if rsvps:
+        await db.rsvps.delete_many({"user_id": user_id})
+        for rsvp in rsvps:
+            await db.events.update_one({"id": rsvp["event_id"]}, {"$inc": {"attendee_count": -1}})
+        await bump_cache("events")
+    await invalidate_principal(user["email"])
+    return {"message": "User deleted successfully"}
+
 # Event Routes
 @api_router.post("/events", response_model=Event)
 async def create_event(event: EventCreate, current_admin: User = Depends(get_current_admin)):
     event_dict = event.dict()
+    notify_alumni = event_dict.pop("notify_alumni")
     event_dict["created_by"] = current_admin.id
     event_obj = Event(**event_dict)
     
     await db.events.insert_one(event_obj.dict())
+    await bump_cache("events")
+    await apply_changes(db, event_changes(event_obj.dict(), 1))
+    await broadcast("event.created", event_obj)
+    # Emails go out from a background job; the admin polls its progress
+    if notify_alumni:
+        await job_runner.enqueue("event_notification", {"event_id": event_obj.id})
     return event_obj
 
+def events_window_or_400(when: Optional[str], start: Optional[datetime], end: Optional[datetime]):
+    try:
+        return event_window(when, start, end)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
 @api_router.get("/events", response_model=List[Event])
-async def get_events(current_user: User = Depends(get_current_user)):
-    events = await db.events.find().to_list(1000)
-    return [Event(**event) for event in events]
+async def get_events(
+    request: Request,
+    when: Optional[str] = Query(None, pattern="^(upcoming|past)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+):
+    # Upcoming is soonest first, past is most recent first, both on the date_id index
+    query, direction = events_window_or_400(when, start, end)
+
+    async def load():
+        events, next_cursor = await fetch_page_or_400(
+            db.events, "date", limit, cursor, query=query, projection=EVENT_PROJECTION, direction=direction
+        )
+        return dumps(construct_many(Event, events)), next_cursor_headers(next_cursor)
+
+    entry = await cached_or_stale(
+        "events", ("list", when, start, end, cursor, limit), load, EVENT_COUNTS_MAX_AGE_SECONDS
+    )
+    return cached_response(request, entry)
+
+async def get_calendar_subscriber(token: str = Query(..., max_length=100)):
+    # Calendar apps cannot send a bearer token; the feed URL carries a revocable one
+    user = await db.users.find_one({"calendar_token_hash": feed_token_digest(token)}, USER_PROJECTION)
+    if user is None or not user["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid calendar feed token"
+        )
+    return construct(User, user)
+
+@api_router.post("/events/calendar/token", response_model=CalendarFeed)
+async def create_calendar_feed(request: Request, current_user: User = Depends(get_current_user)):
+    # Replaces the previous token, so older subscription URLs stop working
+    token, token_hash = new_feed_token()
+    await db.users.update_one({"id": current_user.id}, {"$set": {"calendar_token_hash": token_hash}})
+    return {"url": str(request.url_for("get_events_calendar").include_query_params(token=token))}
+
+@api_router.delete("/events/calendar/token", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_calendar_feed(current_user: User = Depends(get_current_user)):
+    await db.users.update_one({"id": current_user.id}, {"$unset": {"calendar_token_hash": ""}})
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# Declared before /events/{event_id} so the path is not taken for an id
+@api_router.get("/events/calendar.ics")
+async def get_events_calendar(
+    request: Request,
+    when: Optional[str] = Query(None, pattern="^(upcoming|past)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    subscriber: User = Depends(get_calendar_subscriber),
+):
+    query, direction = events_window_or_400(when, start, end)
+
+    # Only the index-covered fingerprint is cached; polls that match it get a 304
+    async def load():
+        return (await calendar_fingerprint(db.events, query, direction)).encode(), {}
+
+    entry = await response_cache.get_or_load("events", ("calendar", when, start, end), load)
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return StreamingResponse(
+        stream_calendar(db.events, query, direction),
+        media_type=CALENDAR_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": 'inline; filename="events.ics"'},
+    )
 
 @api_router.get("/events/{event_id}", response_model=Event)
-async def get_event(event_id: str, current_user: User = Depends(get_current_user)):
-    event = await db.events.find_one({"id": event_id})
-    if not event:
+async def get_event(request: Request, event_id: str, current_user: User = Depends(get_current_user)):
+    async def load():
+        event = await event_loader.load(event_id)
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        return dumps(construct(Event, event)), {}
+
+    entry = await cached_or_stale("events", ("detail", event_id), load, EVENT_COUNTS_MAX_AGE_SECONDS)
+    return cached_response(request, entry)
+
+# Push channel
+@api_router.get("/stream")
+async def stream_updates(current_user: User = Depends(get_current_user)):
+    try:
+        subscriber = hub.subscribe(current_user.id)
+    except HubFull:
         raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open streams, retry shortly",
+            headers={"Retry-After": "30"},
+        )
+    return StreamingResponse(
+        hub.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.post("/admin/announcements", response_model=Announcement)
+async def create_announcement(announcement: AnnouncementCreate, current_admin: User = Depends(get_current_admin)):
+    announcement_obj = Announcement(**announcement.dict(), created_by=current_admin.id)
+    await broadcast("announcement", announcement_obj)
+    return announcement_obj
+
+# RSVPs
+def seat_available_filter(event_id: str):
+    # Events without a capacity (including ones created before RSVPs) are unlimited
+    return {
+        "id": event_id,
+        "date": {"$gte": datetime.now(timezone.utc)},
+        "$or": [{"capacity": None}, {"$expr": {"$lt": ["$attendee_count", "$capacity"]}}],
+    }
+
+async def rsvp_rejection(event_id: str, user_id: str):
+    # Only reached when no seat was claimed, so the extra reads stay off the hot path
+    event = await db.events.find_one({"id": event_id}, {"_id": 0, "date": 1})
+    if not event:
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
-    return Event(**event)
+    if await db.rsvps.find_one({"event_id": event_id, "user_id": user_id}, {"_id": 1}):
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already registered for this event"
+        )
+    if event["date"].replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Event has already taken place"
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Event is full"
+    )
+
+@api_router.post("/events/{event_id}/rsvp", response_model=RSVP)
+async def rsvp_event(event_id: str, current_user: User = Depends(get_current_user)):
+    # One conditional $inc claims the seat, so concurrent RSVPs can never oversell
+    result = await db.events.update_one(seat_available_filter(event_id), {"$inc": {"attendee_count": 1}})
+    if result.modified_count == 0:
+        raise await rsvp_rejection(event_id, current_user.id)
+
+    rsvp = RSVP(event_id=event_id, user_id=current_user.id)
+    try:
+        await db.rsvps.insert_one(rsvp.dict())
+    except DuplicateKeyError:
+        # Already attending: give the seat just claimed back
+        await db.events.update_one({"id": event_id}, {"$inc": {"attendee_count": -1}})
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already registered for this event"
+        )
+    # This worker shows the new count at once; other workers within EVENT_COUNTS_MAX_AGE_SECONDS
+    response_cache.invalidate("events", ("detail", event_id))
+    return rsvp
+
+@api_router.delete("/events/{event_id}/rsvp")
+async def cancel_rsvp(event_id: str, current_user: User = Depends(get_current_user)):
+    result = await db.rsvps.delete_one({"event_id": event_id, "user_id": current_user.id})
+    if result.deleted_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="RSVP not found"
+        )
+    await db.events.update_one({"id": event_id}, {"$inc": {"attendee_count": -1}})
+    response_cache.invalidate("events", ("detail", event_id))
+    return {"message": "RSVP cancelled"}
+
+@api_router.get("/events/{event_id}/attendees", response_model=List[Attendee])
+async def get_event_attendees(
+    event_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+):
+    rsvps, next_cursor = await fetch_page_or_400(
+        db.rsvps, "created_at", limit, cursor,
+        query={"event_id": event_id}, projection={"_id": 0, "id": 1, "user_id": 1, "created_at": 1},
+    )
+    # One $in lookup per page for display names
+    names = {}
+    if rsvps:
+        profiles = db.alumni_profiles.find(
+            {"user_id": {"$in": [rsvp["user_id"] for rsvp in rsvps]}}, {"_id": 0, "user_id": 1, "full_name": 1}
+        )
+        async for profile in profiles:
+            names[profile["user_id"]] = profile["full_name"]
+    attendees = [
+        Attendee.model_construct(user_id=rsvp["user_id"], full_name=names.get(rsvp["user_id"]), rsvp_at=rsvp["created_at"])
+        for rsvp in rsvps
+    ]
+    return FastJSONResponse(attendees, headers=next_cursor_headers(next_cursor))
+
+# Messaging
+async def get_conversation_or_404(conversation_id: str, user_id: str):
+    conversation = await db.conversations.find_one(
+        {"id": conversation_id, "member_ids": user_id}, CONVERSATION_PROJECTION
+    )
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    return conversation
+
+@api_router.post("/conversations", response_model=Conversation)
+async def start_conversation(body: ConversationCreate, current_user: User = Depends(get_current_user)):
+    member_ids = [member for member in dict.fromkeys(body.member_ids) if member != current_user.id]
+    if not member_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A conversation needs at least one other member"
+        )
+    if await db.users.count_documents({"id": {"$in": member_ids}, "is_active": True}) != len(member_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown or inactive member"
+        )
+    conversation = await create_conversation(db, current_user.id, member_ids, body.title)
+    return FastJSONResponse(construct(Conversation, conversation))
+
+@api_router.get("/conversations", response_model=List[InboxEntry])
+async def get_inbox(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+):
+    # Most recently active first, straight off the user's inbox entries
+    entries, next_cursor = await fetch_page_or_400(
+        db.inbox, "last_message_at", limit, cursor,
+        query={"user_id": current_user.id},
+        projection={"_id": 0, "id": 1, "conversation_id": 1, "unread": 1, "last_message_at": 1, "last_read_at": 1},
+        direction=DESCENDING,
+    )
+    conversations = await find_by_ids(db.conversations, [entry["conversation_id"] for entry in entries], CONVERSATION_PROJECTION)
+    inbox = [
+        {"conversation": construct(Conversation, conversations[entry["conversation_id"]]), "unread": entry["unread"], "last_read_at": entry["last_read_at"]}
+        for entry in entries
+        if entry["conversation_id"] in conversations
+    ]
+    return FastJSONResponse(inbox, headers=next_cursor_headers(next_cursor))
+
+@api_router.get("/conversations/unread", response_model=UnreadCount)
+async def get_unread_count(current_user: User = Depends(get_current_user)):
+    return FastJSONResponse({"unread": await unread_total(db, current_user.id)})
+
+@api_router.get("/conversations/{conversation_id}/messages", response_model=List[Message])
+async def get_messages(
+    conversation_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+):
+    await get_conversation_or_404(conversation_id, current_user.id)
+    # Newest first; the cursor walks back through history
+    messages, next_cursor = await fetch_page_or_400(
+        db.messages, "created_at", limit, cursor,
+        query={"conversation_id": conversation_id}, projection=MESSAGE_PROJECTION, direction=DESCENDING,
+    )
+    return FastJSONResponse(construct_many(Message, messages), headers=next_cursor_headers(next_cursor))
+
+@api_router.post("/conversations/{conversation_id}/messages", response_model=Message)
+async def post_message(conversation_id: str, body: MessageCreate, current_user: User = Depends(get_current_user)):
+    conversation = await get_conversation_or_404(conversation_id, current_user.id)
+    message = await send_message(db, conversation, current_user.id, body.body)
+    return FastJSONResponse(construct(Message, message))
+
+@api_router.post("/conversations/{conversation_id}/read", response_model=UnreadCount)
+async def read_conversation(conversation_id: str, current_user: User = Depends(get_current_user)):
+    await get_conversation_or_404(conversation_id, current_user.id)
+    await mark_read(db, current_user.id, conversation_id)
+    return FastJSONResponse({"unread": await unread_total(db, current_user.id)})
+
+# Background jobs (admin)
+@api_router.get("/admin/jobs", response_model=List[Job])
+async def get_jobs(
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(queued|running|done|failed|cancelled)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    current_admin: User = Depends(get_current_admin),
+):
+    # Newest first
+    jobs, next_cursor = await fetch_page_or_400(
+        db.jobs, "created_at", limit, cursor,
+        query={"status": status_filter} if status_filter else None, projection=JOB_PROJECTION, direction=DESCENDING,
+    )
+    return FastJSONResponse(construct_many(Job, jobs), headers=next_cursor_headers(next_cursor))
+
+@api_router.get("/admin/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, current_admin: User = Depends(get_current_admin)):
+    job = await db.jobs.find_one({"id": job_id}, JOB_PROJECTION)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return FastJSONResponse(construct(Job, job))
+
+@api_router.post("/admin/jobs/{job_id}/cancel", response_model=Job)
+async def cancel_job(job_id: str, current_admin: User = Depends(get_current_admin)):
+    job = await job_runner.cancel(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Job not found or already finished"
+        )
+    return FastJSONResponse(construct(Job, {k: v for k, v in job.items() if k in JOB_PROJECTION}))
+
+# Duplicate profiles (admin)
+@api_router.post("/admin/dedupe/scan", response_model=Job)
+async def start_dedupe_scan(current_admin: User = Depends(get_current_admin)):
+    job = await job_runner.enqueue("dedupe_scan", {}, max_attempts=3)
+    return FastJSONResponse(construct(Job, {k: v for k, v in job.items() if k in JOB_PROJECTION}))
+
+@api_router.get("/admin/dedupe/candidates", response_model=List[DuplicateCandidateReport])
+async def get_duplicate_candidates(
+    status_filter: str = Query("open", alias="status", pattern="^(open|dismissed)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    current_admin: User = Depends(get_current_admin),
+):
+    # Most likely duplicates first, with both profiles from one $in lookup
+    candidates, next_cursor = await fetch_page_or_400(
+        db.dedupe_candidates, "score", limit, cursor,
+        query={"status": status_filter}, projection=DUPLICATE_PROJECTION, direction=DESCENDING,
+    )
+    profiles = await find_by_ids(
+        db.alumni_profiles, {profile_id for candidate in candidates for profile_id in candidate["profile_ids"]}, ALUMNI_PROJECTION
+    )
+    report = [
+        construct(DuplicateCandidateReport, {
+            **candidate,
+            "profiles": [construct(AlumniProfile, profiles[profile_id]) for profile_id in candidate["profile_ids"] if profile_id in profiles],
+        })
+        for candidate in candidates
+    ]
+    return FastJSONResponse(report, headers=next_cursor_headers(next_cursor))
+
+@api_router.post("/admin/dedupe/candidates/{candidate_id}/dismiss", response_model=DuplicateCandidate)
+async def dismiss_duplicate_candidate(candidate_id: str, current_admin: User = Depends(get_current_admin)):
+    candidate = await db.dedupe_candidates.find_one_and_update(
+        {"id": candidate_id},
+        {"$set": {"status": "dismissed", "updated_at": datetime.now(timezone.utc)}},
+        projection=DUPLICATE_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Duplicate candidate not found"
+        )
+    candidate["status"] = "dismissed"
+    return FastJSONResponse(construct(DuplicateCandidate, candidate))
 
 # Dashboard Stats
 @api_router.get("/admin/stats")
 async def get_admin_stats(current_admin: User = Depends(get_current_admin)):
-    total_alumni = await db.alumni_profiles.count_documents({})
-    total_events = await db.events.count_documents({})
-    total_users = await db.users.count_documents({})
-    
-    return {
-        "total_alumni": total_alumni,
-        "total_events": total_events,
-        "total_users": total_users
-    }
+    global last_dashboard
+    if db_breaker.is_open:
+        if last_dashboard is None:
+            raise database_unavailable()
+        return last_dashboard
+    last_dashboard = await load_dashboard(db_reads)
+    return last_dashboard
+
+# Diagnostics
+@api_router.get("/admin/diagnostics/query-plans")
+async def get_query_plans(current_admin: User = Depends(get_current_admin)):
+    report = await explain_query_shapes(db)
+    ok = not any(entry["collscan"] for entry in report)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ok else status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"ok": ok, "plans": report},
+    )
 
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# Innermost, so request timings include the compression work
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get("COMPRESSION_MINIMUM_SIZE", "1024")),
+    gzip_level=int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6")),
+    brotli_quality=int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4")),
+)
+
+# Inside instrumentation, so its 503 and 504 answers are counted per route
+app.add_middleware(
+    DeadlineMiddleware,
+    routes=app.router.routes,
+    breaker=db_breaker,
+    default_seconds=REQUEST_DEADLINE_SECONDS,
+    route_seconds=REQUEST_DEADLINES,
+    fallback_routes=DB_FALLBACK_ROUTES,
+    exempt_routes=DB_BREAKER_EXEMPT_ROUTES,
+)
+
+app.add_middleware(
+    InstrumentationMiddleware,
+    routes=app.router.routes,
+    slow_request_ms=int(os.environ.get("SLOW_REQUEST_MS", "0")),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After"],
 )
 
 # Configure logging
@@ -341,7 +1443,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
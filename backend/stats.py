@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from datetime import timezone
+
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Breakdown kinds and the document field each one groups by.
+PROFILE_BREAKDOWNS = {
+    "department": "department",
+    "graduation_year": "graduation_year",
+    "company": "current_company",
+}
+MONTH_FORMAT = "%Y-%m"
+
+
+def _stat_id(kind, key):
+    return f"{kind}:{key}"
+
+
+def month_key(date):
+    """The dashboard month of ``date``: its month in UTC, as Mongo stores it."""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc)
+    return date.strftime(MONTH_FORMAT)
+
+
+def month_key_expression(field):
+    # $dateToString formats in UTC, so this groups exactly as month_key keys.
+    return {"$dateToString": {"format": MONTH_FORMAT, "date": f"${field}"}}
+
+
+def profile_changes(profile, delta):
+    changes = [("total", "alumni", delta)]
+    for kind, field in PROFILE_BREAKDOWNS.items():
+        value = profile.get(field)
+        if value not in (None, ""):
+            changes.append((kind, value, delta))
+    return changes
+
+
+def profile_update_changes(before, after):
+    changes = []
+    for kind, field in PROFILE_BREAKDOWNS.items():
+        old, new = before.get(field), after.get(field)
+        if old == new:
+            continue
+        if old not in (None, ""):
+            changes.append((kind, old, -1))
+        if new not in (None, ""):
+            changes.append((kind, new, 1))
+    return changes
+
+
+def event_changes(event, delta):
+    changes = [("total", "events", delta)]
+    if event.get("date"):
+        changes.append(("events_month", month_key(event["date"]), delta))
+    return changes
+
+
+def user_changes(delta):
+    return [("total", "users", delta)]
+
+
+async def apply_changes(db, changes):
+    """Apply counter deltas in one bulk write.
+
+    Best effort: a failure here is logged rather than failing the request that
+    already committed its write; the periodic reconciliation repairs drift.
+    """
+    if not changes:
+        return
+    ops = [
+        UpdateOne(
+            {"_id": _stat_id(kind, key)},
+            {"$inc": {"count": delta}, "$set": {"kind": kind, "key": key}},
+            upsert=True,
+        )
+        for kind, key, delta in changes
+    ]
+    try:
+        await db.stats.bulk_write(ops, ordered=False)
+    except PyMongoError:
+        logger.exception("Failed to update dashboard stats")
+
+
+async def load_dashboard(db):
+    docs = await db.stats.find({}, {"_id": 0, "kind": 1, "key": 1, "count": 1}).to_list(None)
+    totals = {}
+    breakdowns = {"department": {}, "graduation_year": {}, "company": {}, "events_month": {}}
+    for doc in docs:
+        if doc.get("count", 0) <= 0:
+            continue
+        if doc["kind"] == "total":
+            totals[doc["key"]] = doc["count"]
+        elif doc["kind"] in breakdowns:
+            breakdowns[doc["kind"]][str(doc["key"])] = doc["count"]
+    return {
+        "total_alumni": totals.get("alumni", 0),
+        "total_events": totals.get("events", 0),
+        "total_users": totals.get("users", 0),
+        "alumni_by_department": breakdowns["department"],
+        "alumni_by_graduation_year": breakdowns["graduation_year"],
+        "alumni_by_company": breakdowns["company"],
+        "events_by_month": breakdowns["events_month"],
+    }
+
+
+def _group(field):
+    return [
+        {"$match": {field: {"$nin": [None, ""]}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+    ]
+
+
+async def reconcile(db):
+    """Recompute every counter from the source collections.
+
+    Writes racing with a reconciliation may be counted twice or not at all
+    until the next run; the counters are for dashboards, not accounting.
+    """
+    facets = {kind: _group(field) for kind, field in PROFILE_BREAKDOWNS.items()}
+    facets["total"] = [{"$count": "count"}]
+    profile_result = (await db.alumni_profiles.aggregate([{"$facet": facets}]).to_list(1))[0]
+    event_result = (await db.events.aggregate([{"$facet": {
+        "total": [{"$count": "count"}],
+        "events_month": [
+            {"$match": {"date": {"$type": "date"}}},
+            {"$group": {"_id": month_key_expression("date"), "count": {"$sum": 1}}},
+        ],
+    }}]).to_list(1))[0]
+    total_users = await db.users.count_documents({})
+
+    counts = {
+        ("total", "alumni"): (profile_result["total"] or [{"count": 0}])[0]["count"],
+        ("total", "events"): (event_result["total"] or [{"count": 0}])[0]["count"],
+        ("total", "users"): total_users,
+    }
+    for kind in PROFILE_BREAKDOWNS:
+        for bucket in profile_result[kind]:
+            counts[(kind, bucket["_id"])] = bucket["count"]
+    for bucket in event_result["events_month"]:
+        counts[("events_month", bucket["_id"])] = bucket["count"]
+
+    ops = [
+        UpdateOne({"_id": _stat_id(kind, key)}, {"$set": {"kind": kind, "key": key, "count": count}}, upsert=True)
+        for (kind, key), count in counts.items()
+    ]
+    ops.append(DeleteMany({"_id": {"$nin": [_stat_id(kind, key) for kind, key in counts]}}))
+    await db.stats.bulk_write(ops, ordered=True)
+    logger.info("Reconciled %d dashboard counters", len(counts))
+
+
+async def reconcile_periodically(db, interval_seconds):
+    while True:
+        try:
+            await reconcile(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Dashboard stats reconciliation failed")
+        await asyncio.sleep(interval_seconds)
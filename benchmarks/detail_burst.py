@@ -0,0 +1,130 @@
+"""Detail burst: many concurrent single-profile lookups, coalesced into few queries.
+
+Seeds profiles directly, then fires every ``GET /api/admin/alumni/{id}`` at
+once through the ASGI app and reports how many ``$in`` queries the alumni
+loader issued for them, next to one ``POST /api/admin/alumni/batch`` call
+for the same ids.
+
+Usage:
+    python benchmarks/detail_burst.py                  # 200 requests over 50 profiles, mongomock
+    python benchmarks/detail_burst.py --mongo mongodb://localhost:27017
+    python benchmarks/detail_burst.py --requests 1000 --profiles 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+from loader import LOADER_BATCHES  # noqa: E402
+
+
+def _percentile(samples, pct):
+    index = min(len(samples) - 1, round(pct / 100 * (len(samples) - 1)))
+    return round(samples[index] * 1000, 2)
+
+
+async def run(args):
+    if args.mongo == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient()
+    else:
+        from database import create_client
+        os.environ["MONGO_URL"] = args.mongo
+        mongo_client = create_client()
+    db_name = f"detail_burst_{uuid.uuid4().hex[:8]}"
+    server.client = mongo_client
+    server.db = mongo_client[db_name]
+    db = server.db
+
+    now = datetime.now(timezone.utc)
+    admin = {"id": str(uuid.uuid4()), "email": "admin@example.com", "role": "admin", "is_active": True, "created_at": now}
+    await db.users.insert_one(admin)
+    profiles = [
+        {
+            "id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "full_name": f"Alumnus {i}",
+            "phone": "+1 555 0100", "graduation_year": 2000 + i % 20, "degree": "BSc", "department": "CS",
+            "created_at": now, "updated_at": now,
+        }
+        for i in range(args.profiles)
+    ]
+    await db.alumni_profiles.insert_many(profiles)
+    token = server.create_access_token({"sub": admin["email"]}, timedelta(hours=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    requested = [random.choice(profiles)["id"] for _ in range(args.requests)]
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            # Resolves the admin once, so the burst measures the lookups alone
+            await client.get("/api/auth/me", headers=headers)
+            latencies = []
+
+            async def detail(alumni_id):
+                start = time.perf_counter()
+                response = await client.get(f"/api/admin/alumni/{alumni_id}", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                return response.status_code
+
+            batches_before = LOADER_BATCHES.value(loader="alumni_profiles")
+            started = time.perf_counter()
+            statuses = Counter(await asyncio.gather(*[detail(alumni_id) for alumni_id in requested]))
+            elapsed = time.perf_counter() - started
+            batches = LOADER_BATCHES.value(loader="alumni_profiles") - batches_before
+
+            started = time.perf_counter()
+            batch_response = await client.post("/api/admin/alumni/batch", json={"ids": requested}, headers=headers)
+            batch_elapsed = time.perf_counter() - started
+
+        if args.mongo != "mock":
+            await mongo_client.drop_database(db_name)
+
+    latencies.sort()
+    print(f"{args.requests} detail requests over {args.profiles} profiles")
+    print(f"Statuses: {dict(sorted(statuses.items()))}")
+    print(f"Queries issued by the loader: {batches}")
+    print(f"Throughput: {args.requests / elapsed:.0f} req/s over {elapsed:.2f}s")
+    print(
+        f"Latency ms: p50 {_percentile(latencies, 50)}  p95 {_percentile(latencies, 95)}  "
+        f"p99 {_percentile(latencies, 99)}"
+    )
+    print(f"Batch endpoint: {len(batch_response.json())} profiles in {batch_elapsed * 1000:.1f} ms")
+
+    checks = {
+        "every lookup found its profile": statuses == Counter({200: args.requests}),
+        f"at most {args.max_queries} queries": batches <= args.max_queries,
+        "batch returns each distinct id once": len(batch_response.json()) == len(set(requested)),
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo", default="mock", help='"mock" for in-memory mongomock, or a mongodb:// URL')
+    parser.add_argument("--requests", type=int, default=200, help="concurrent detail requests")
+    parser.add_argument("--profiles", type=int, default=50, help="distinct profiles they ask for")
+    parser.add_argument("--max-queries", type=int, default=5, help="queries allowed before the run fails")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
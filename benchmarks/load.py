@@ -0,0 +1,281 @@
+"""Concurrent load test of the FastAPI app against a local Mongo stand-in.
+
+Boots ``server.app`` in-process, seeds realistic data volumes, then drives
+concurrent async clients through the auth, profile, event and admin flows and
+reports per-route throughput and latency percentiles.
+
+Requires the packages in benchmarks/requirements.txt on top of the backend's.
+The in-memory stand-in executes queries in Python on the event loop, so its
+absolute numbers are far below a real mongod; use it for relative comparisons
+at modest volumes and a local mongod for the full 100k/5k data set.
+
+Usage:
+    python benchmarks/load.py                          # in-memory mongomock
+    python benchmarks/load.py --mongo mongodb://localhost:27017
+    python benchmarks/load.py --alumni 10000 --events 500 --users 50 --duration 20
+    python benchmarks/load.py --baseline benchmarks/results/previous.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+# Keep bcrypt cheap unless the run is explicitly about hashing cost.
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+
+DEPARTMENTS = ["Computer Science", "Electrical", "Mechanical", "Physics", "Economics", "History", "Biology"]
+COMPANIES = [f"Company {i}" for i in range(2000)]
+PASSWORD = "benchmark-password"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, route, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    def report(self, elapsed):
+        routes = {}
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies[route])
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": _percentile(samples, 50),
+                "p95_ms": _percentile(samples, 95),
+                "p99_ms": _percentile(samples, 99),
+            }
+        return routes
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, round(pct / 100 * (len(samples) - 1)))
+    return round(samples[index] * 1000, 2)
+
+
+def _alumni_doc(i, user_id, now):
+    created = now - timedelta(minutes=i)
+    name = f"Alumnus {i}"
+    company = random.choice(COMPANIES)
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "full_name": name,
+        "phone": f"+1 555 {i:07d}",
+        "graduation_year": random.randint(1970, 2025),
+        "degree": random.choice(["BSc", "MSc", "PhD", "BA"]),
+        "department": random.choice(DEPARTMENTS),
+        "current_position": "Engineer",
+        "current_company": company,
+        "linkedin_url": None,
+        "bio": "Alumnus working in industry, happy to mentor students.",
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+async def seed(db, alumni, events, batch=5000):
+    from search import search_fields
+    from stats import reconcile
+
+    now = datetime.now(timezone.utc)
+    password = await server.get_password_hash(PASSWORD)
+    admin = {
+        "id": str(uuid.uuid4()), "email": "admin@example.com", "role": "admin",
+        "is_active": True, "created_at": now, "password": password,
+    }
+    await db.users.insert_one(admin)
+    for start in range(0, alumni, batch):
+        users, profiles = [], []
+        for i in range(start, min(start + batch, alumni)):
+            user_id = str(uuid.uuid4())
+            users.append({
+                "id": user_id, "email": f"seed{i}@example.com", "role": "alumni",
+                "is_active": True, "created_at": now, "password": password,
+            })
+            profile = _alumni_doc(i, user_id, now)
+            profile.update(search_fields(profile))
+            profiles.append(profile)
+        await db.users.insert_many(users)
+        await db.alumni_profiles.insert_many(profiles)
+    event_docs = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Event {i}",
+            "description": "Reunion, talks and networking.",
+            "date": now + timedelta(days=i - events // 2),
+            "location": "Main Hall",
+            "created_by": admin["id"],
+            "created_at": now,
+        }
+        for i in range(events)
+    ]
+    for start in range(0, events, batch):
+        await db.events.insert_many(event_docs[start:start + batch])
+    await reconcile(db)
+    return [doc["id"] for doc in event_docs]
+
+
+async def virtual_user(index, client, recorder, deadline, event_ids, admin_headers):
+    email = f"load{index}-{uuid.uuid4().hex[:8]}@example.com"
+    response = await recorder.call(
+        client, "POST /api/auth/register", "POST", "/api/auth/register",
+        json={"email": email, "password": PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await recorder.call(
+        client, "POST /api/alumni/profile", "POST", "/api/alumni/profile", headers=headers,
+        json={
+            "full_name": f"Load User {index}", "phone": "+1 555 0100", "graduation_year": 2015,
+            "degree": "BSc", "department": random.choice(DEPARTMENTS), "current_company": random.choice(COMPANIES),
+        },
+    )
+
+    operations = [
+        (1, "POST /api/auth/login", lambda: ("POST", "/api/auth/login", {"json": {"email": email, "password": PASSWORD}})),
+        (3, "GET /api/auth/me", lambda: ("GET", "/api/auth/me", {"headers": headers})),
+        (3, "GET /api/alumni/profile", lambda: ("GET", "/api/alumni/profile", {"headers": headers})),
+        (1, "PUT /api/alumni/profile", lambda: ("PUT", "/api/alumni/profile", {
+            "headers": headers, "json": {"current_position": random.choice(["Engineer", "Manager", "Founder"])},
+        })),
+        (5, "GET /api/events", lambda: ("GET", "/api/events", {"headers": headers, "params": {"limit": 50}})),
+        (3, "GET /api/events/{event_id}", lambda: ("GET", f"/api/events/{random.choice(event_ids)}", {"headers": headers})),
+        (1, "GET /api/admin/alumni", lambda: ("GET", "/api/admin/alumni", {"headers": admin_headers, "params": {"limit": 100}})),
+        (1, "GET /api/admin/alumni/search", lambda: ("GET", "/api/admin/alumni/search", {
+            "headers": admin_headers, "params": {"q": f"alumnus {random.randint(1, 99)}"},
+        })),
+        (1, "GET /api/admin/stats", lambda: ("GET", "/api/admin/stats", {"headers": admin_headers})),
+    ]
+    weights = [weight for weight, _, _ in operations]
+    while time.monotonic() < deadline:
+        _, route, build = random.choices(operations, weights=weights)[0]
+        method, url, kwargs = build()
+        await recorder.call(client, route, method, url, **kwargs)
+
+
+def compare(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())["routes"]
+    print("\nRoute p95 vs baseline:")
+    for route, stats in current.items():
+        before = baseline.get(route, {}).get("p95_ms")
+        if before and stats["p95_ms"]:
+            change = (stats["p95_ms"] - before) / before * 100
+            flag = "  REGRESSION" if change > 20 else ""
+            print(f"  {route:<36} {before:>9.2f} -> {stats['p95_ms']:>9.2f} ms ({change:+.0f}%){flag}")
+
+
+async def run(args):
+    if args.mongo == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient()
+    else:
+        # Same pool options and listeners as production, from the MONGO_* env vars.
+        from database import create_client
+        os.environ["MONGO_URL"] = args.mongo
+        mongo_client = create_client()
+    db_name = f"benchmark_{uuid.uuid4().hex[:8]}"
+    server.client = mongo_client
+    server.db = mongo_client[db_name]
+
+    # Seed before startup so indexes are built once over the loaded data.
+    print(f"Seeding {args.alumni} alumni and {args.events} events...", flush=True)
+    seed_start = time.perf_counter()
+    event_ids = await seed(server.db, args.alumni, args.events)
+    print(f"Seeded in {time.perf_counter() - seed_start:.1f}s", flush=True)
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            login = await client.post("/api/auth/login", json={"email": "admin@example.com", "password": PASSWORD})
+            admin_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            recorder = Recorder()
+            started = time.monotonic()
+            deadline = started + args.duration
+            await asyncio.gather(*[
+                virtual_user(i, client, recorder, deadline, event_ids, admin_headers) for i in range(args.users)
+            ])
+            elapsed = time.monotonic() - started
+
+        if args.mongo != "mock":
+            await mongo_client.drop_database(db_name)
+
+    routes = recorder.report(elapsed)
+    result = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "mongo": "mock" if args.mongo == "mock" else "mongod",
+            "alumni": args.alumni,
+            "events": args.events,
+            "users": args.users,
+            "duration_s": args.duration,
+            "bcrypt_rounds": server.BCRYPT_ROUNDS,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "total_rps": round(sum(len(v) for v in recorder.latencies.values()) / elapsed, 1),
+        "routes": routes,
+    }
+
+    print(f"\n{'route':<36} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, stats in routes.items():
+        print(
+            f"{route:<36} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8} "
+            f"{stats['p50_ms'] or '-':>8} {stats['p95_ms'] or '-':>8} {stats['p99_ms'] or '-':>8}"
+        )
+    print(f"\nTotal: {result['total_rps']} req/s over {result['elapsed_s']}s")
+
+    output = Path(args.output or Path(__file__).parent / "results" / f"load-{int(time.time())}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Saved {output}")
+    if args.baseline:
+        compare(routes, args.baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo", default="mock", help='"mock" for in-memory mongomock, or a mongodb:// URL')
+    parser.add_argument("--alumni", type=int, default=100000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load after seeding")
+    parser.add_argument("--output", help="where to write the JSON result")
+    parser.add_argument("--baseline", help="previous JSON result to compare p95 latencies against")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Messaging: send and inbox latency as conversation history grows.
+
+Seeds one busy conversation with history in bulk, stepping up by a factor of
+ten, and at every step times sending a message, reading the unread badge,
+listing the inbox and fetching the newest page of history. With the indexes
+in place none of these should grow with the size of the history.
+
+mongomock scans collections for every query, so its history page timing
+grows with the seeded history; run against a real server to see it flat.
+
+Usage:
+    python benchmarks/messaging.py                     # up to 10k messages, mongomock
+    python benchmarks/messaging.py --mongo mongodb://localhost:27017 --messages 5000000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+
+SEED_BATCH = 10000
+
+
+async def seed_history(db, conversation, senders, start, count):
+    base = datetime.now(timezone.utc) - timedelta(days=365)
+    for offset in range(start, start + count, SEED_BATCH):
+        await db.messages.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "conversation_id": conversation,
+                "sender_id": senders[i % len(senders)],
+                "body": f"Seeded message {i}",
+                "created_at": base + timedelta(milliseconds=i),
+            }
+            for i in range(offset, min(offset + SEED_BATCH, start + count))
+        ])
+
+
+async def run(args):
+    if args.mongo == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient()
+    else:
+        from database import create_client
+        os.environ["MONGO_URL"] = args.mongo
+        mongo_client = create_client()
+    db_name = f"messaging_{uuid.uuid4().hex[:8]}"
+    server.client = mongo_client
+    server.db = mongo_client[db_name]
+    db = server.db
+
+    now = datetime.now(timezone.utc)
+    users = [
+        {"id": str(uuid.uuid4()), "email": f"member{i}@example.com", "role": "alumni", "is_active": True, "created_at": now}
+        for i in range(args.members)
+    ]
+    await db.users.insert_many(users)
+    headers = [
+        {"Authorization": f"Bearer {server.create_access_token({'sub': user['email']}, timedelta(hours=1))}"}
+        for user in users
+    ]
+    sizes = []
+    size = 1000
+    while size <= args.messages:
+        sizes.append(size)
+        size *= 10
+
+    rows = []
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+            response = await client.post(
+                "/api/conversations",
+                json={"member_ids": [user["id"] for user in users[1:]], "title": "Benchmark"},
+                headers=headers[0],
+            )
+            conversation = response.json()["id"]
+
+            async def timed(method, url, **kwargs):
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+                return (time.perf_counter() - start) * 1000
+
+            seeded = 0
+            for size in sizes:
+                await seed_history(db, conversation, [user["id"] for user in users], seeded, size - seeded)
+                seeded = size
+                samples = {"send": [], "unread": [], "inbox": [], "history": []}
+                for i in range(args.samples):
+                    sender = headers[i % len(headers)]
+                    reader = headers[(i + 1) % len(headers)]
+                    samples["send"].append(await timed(
+                        "POST", f"/api/conversations/{conversation}/messages", json={"body": f"hello {i}"}, headers=sender
+                    ))
+                    samples["unread"].append(await timed("GET", "/api/conversations/unread", headers=reader))
+                    samples["inbox"].append(await timed("GET", "/api/conversations", headers=reader))
+                    samples["history"].append(await timed(
+                        "GET", f"/api/conversations/{conversation}/messages", params={"limit": 50}, headers=reader
+                    ))
+                rows.append((size, {name: statistics.median(values) for name, values in samples.items()}))
+                print(f"  {size:>10,} messages seeded", flush=True)
+
+        if args.mongo != "mock":
+            await mongo_client.drop_database(db_name)
+
+    print(f"Median ms over {args.samples} samples, {args.members} members")
+    print(f"{'history':>12} {'send':>8} {'unread':>8} {'inbox':>8} {'page':>8}")
+    for size, medians in rows:
+        print(
+            f"{size:>12,} {medians['send']:>8.2f} {medians['unread']:>8.2f} "
+            f"{medians['inbox']:>8.2f} {medians['history']:>8.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo", default="mock", help='"mock" for in-memory mongomock, or a mongodb:// URL')
+    parser.add_argument("--messages", type=int, default=10000, help="history size to grow to (in steps of 10x)")
+    parser.add_argument("--members", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=50, help="timed operations per step")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
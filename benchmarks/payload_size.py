@@ -0,0 +1,103 @@
+"""Payload size and CPU cost of alumni list pages: sparse fieldsets and compression.
+
+For each page size, serializes the full profile and the admin table's sparse
+fieldset, then compresses both with every gzip level and brotli quality
+asked for (brotli only when the package is installed). A second table
+compresses single small bodies to show where compression stops paying off,
+which is what COMPRESSION_MINIMUM_SIZE should be set from.
+
+Usage:
+    python benchmarks/payload_size.py
+    python benchmarks/payload_size.py --rows 10 100 1000 --gzip 1 6 9 --brotli 1 4 11 --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+import compression  # noqa: E402
+from fastjson import construct_many, dumps, select, sparse_projection  # noqa: E402
+from serialization import alumni_docs  # noqa: E402
+from server import AlumniProfile  # noqa: E402
+
+# The columns the admin alumni table requests.
+TABLE_FIELDS = "full_name,user_id,graduation_year,degree,current_position"
+
+
+def compress(encoding, level, body):
+    compressor = compression.create_compressor(encoding, level)
+    return compressor.compress(body) + compressor.finish()
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def codecs(args):
+    yield "identity", None
+    for level in args.gzip:
+        yield "gzip", level
+    if compression.brotli is not None:
+        for quality in args.brotli:
+            yield "br", quality
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000], help="page sizes")
+    parser.add_argument("--gzip", type=int, nargs="+", default=[1, 6, 9], help="gzip levels")
+    parser.add_argument("--brotli", type=int, nargs="+", default=[1, 4, 11], help="brotli qualities")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    if compression.brotli is None:
+        print("brotli is not installed; measuring gzip only")
+
+    sparse = sparse_projection(AlumniProfile, TABLE_FIELDS)
+    print(f"{'rows':>6} {'shape':>7} {'codec':>10} {'bytes':>10} {'ratio':>7} {'serialize ms':>13} {'compress ms':>12}")
+    for rows in args.rows:
+        docs = alumni_docs(rows)
+        shapes = {
+            "full": lambda: dumps(construct_many(AlumniProfile, docs)),
+            "sparse": lambda: dumps(select(docs, sparse)),
+        }
+        for shape, serialize in shapes.items():
+            body, serialize_ms = best_ms(serialize, args.repeat)
+            for encoding, level in codecs(args):
+                if encoding == "identity":
+                    size, compress_ms = len(body), 0.0
+                else:
+                    compressed, compress_ms = best_ms(lambda: compress(encoding, level, body), args.repeat)
+                    size = len(compressed)
+                codec = encoding if level is None else f"{encoding}-{level}"
+                print(
+                    f"{rows:>6} {shape:>7} {codec:>10} {size:>10,} {len(body) / size:>7.1f} "
+                    f"{serialize_ms:>13.3f} {compress_ms:>12.3f}"
+                )
+
+    print()
+    print("Small bodies (one sparse row repeated), default levels:")
+    print(f"{'bytes':>7} {'gzip':>7} {'saved':>7} {'ms':>8}" + (f" {'br':>7} {'saved':>7} {'ms':>8}" if compression.brotli else ""))
+    row = dumps(select(alumni_docs(1), sparse))
+    for target in (128, 256, 512, 1024, 2048, 4096):
+        body = (row * (target // len(row) + 1))[:target]
+        line = f"{len(body):>7}"
+        for encoding, level in (("gzip", 6), ("br", 4)):
+            if encoding == "br" and compression.brotli is None:
+                continue
+            compressed, ms = best_ms(lambda: compress(encoding, level, body), args.repeat)
+            line += f" {len(compressed):>7} {len(body) - len(compressed):>7} {ms:>8.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Registration rush: many concurrent RSVPs against one limited-capacity event.
+
+Seeds users directly (tokens are minted without bcrypt), then fires every RSVP
+at once through the ASGI app and checks that exactly ``capacity`` seats were
+taken, that the event counter matches the rsvps collection, and that repeated
+RSVPs from the same user never double-book.
+
+Usage:
+    python benchmarks/rsvp_rush.py                     # 1000 RSVPs, 100 seats, mongomock
+    python benchmarks/rsvp_rush.py --mongo mongodb://localhost:27017
+    python benchmarks/rsvp_rush.py --users 5000 --capacity 500 --duplicates 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+
+
+def _percentile(samples, pct):
+    index = min(len(samples) - 1, round(pct / 100 * (len(samples) - 1)))
+    return round(samples[index] * 1000, 2)
+
+
+async def run(args):
+    if args.mongo == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient()
+    else:
+        from database import create_client
+        os.environ["MONGO_URL"] = args.mongo
+        mongo_client = create_client()
+    db_name = f"rsvp_rush_{uuid.uuid4().hex[:8]}"
+    server.client = mongo_client
+    server.db = mongo_client[db_name]
+    db = server.db
+
+    now = datetime.now(timezone.utc)
+    users = [
+        {"id": str(uuid.uuid4()), "email": f"rush{i}@example.com", "role": "alumni", "is_active": True, "created_at": now}
+        for i in range(args.users)
+    ]
+    await db.users.insert_many(users)
+    event_id = str(uuid.uuid4())
+    await db.events.insert_one({
+        "id": event_id, "title": "Reunion", "description": "Rush", "date": now + timedelta(days=30),
+        "location": "Main Hall", "created_by": users[0]["id"], "created_at": now,
+        "capacity": args.capacity, "attendee_count": 0,
+    })
+    tokens = [server.create_access_token({"sub": user["email"]}, timedelta(hours=1)) for user in users]
+    # Some users double-click: the same user fires a second RSVP concurrently.
+    attempts = list(range(args.users)) + random.sample(range(args.users), int(args.users * args.duplicates))
+    random.shuffle(attempts)
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            latencies = []
+
+            async def rsvp(index):
+                start = time.perf_counter()
+                response = await client.post(
+                    f"/api/events/{event_id}/rsvp", headers={"Authorization": f"Bearer {tokens[index]}"}
+                )
+                latencies.append(time.perf_counter() - start)
+                return index, response.status_code
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*[rsvp(index) for index in attempts])
+            elapsed = time.perf_counter() - started
+
+            event = await db.events.find_one({"id": event_id})
+            rsvp_count = await db.rsvps.count_documents({"event_id": event_id})
+            per_user = Counter(index for index, code in results if code == 200)
+            attendees = 0
+            cursor = None
+            while True:
+                response = await client.get(
+                    f"/api/events/{event_id}/attendees",
+                    params={"limit": 37, **({"cursor": cursor} if cursor else {})},
+                    headers={"Authorization": f"Bearer {tokens[0]}"},
+                )
+                attendees += len(response.json())
+                cursor = response.headers.get("x-next-cursor")
+                if not cursor:
+                    break
+
+        if args.mongo != "mock":
+            await mongo_client.drop_database(db_name)
+
+    statuses = Counter(code for _, code in results)
+    latencies.sort()
+    print(f"{len(attempts)} RSVPs ({len(attempts) - args.users} duplicates) against {args.capacity} seats")
+    print(f"Statuses: {dict(sorted(statuses.items()))}")
+    print(f"Throughput: {len(attempts) / elapsed:.0f} RSVP/s over {elapsed:.2f}s")
+    print(
+        f"Latency ms: p50 {_percentile(latencies, 50)}  p95 {_percentile(latencies, 95)}  "
+        f"p99 {_percentile(latencies, 99)}"
+    )
+    print(f"attendee_count={event['attendee_count']} rsvps={rsvp_count} attendees listed={attendees}")
+
+    expected = min(args.capacity, args.users)
+    checks = {
+        "seats taken == capacity": statuses[200] == expected,
+        "counter matches rsvps": event["attendee_count"] == rsvp_count == expected,
+        "attendee pages cover every rsvp": attendees == rsvp_count,
+        "no user booked twice": all(count == 1 for count in per_user.values()),
+        "no server errors": not any(code >= 500 for code in statuses),
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo", default="mock", help='"mock" for in-memory mongomock, or a mongodb:// URL')
+    parser.add_argument("--users", type=int, default=1000, help="distinct users RSVPing at once")
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--duplicates", type=float, default=0.05, help="fraction of users that RSVP twice")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Per-row cost of serializing list responses: validated models vs. the fast path.
+
+Usage: python benchmarks/serialization.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from fastjson import construct_many, dumps  # noqa: E402
+from server import AlumniProfile, Event  # noqa: E402
+
+
+def alumni_docs(rows):
+    base = datetime(2015, 1, 1)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+            "full_name": f"Alumni {i}",
+            "phone": "+1 555 0100",
+            "graduation_year": 1990 + i % 35,
+            "degree": "Bachelor of Science",
+            "department": ["Computer Science", "Physics", "History", "Economics"][i % 4],
+            "current_position": "Engineer",
+            "current_company": f"Company {i % 500}",
+            "linkedin_url": f"https://linkedin.com/in/alumni{i}",
+            "bio": "Graduate working in industry. " * 8,
+            "created_at": base + timedelta(minutes=i),
+            "updated_at": base + timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+def event_docs(rows):
+    base = datetime(2024, 1, 1)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Event {i}",
+            "description": "Reunion and networking evening. " * 4,
+            "date": base + timedelta(days=i),
+            "location": "Main Hall",
+            "created_by": str(uuid.uuid4()),
+            "created_at": base,
+        }
+        for i in range(rows)
+    ]
+
+
+def validated_path(model, docs):
+    # What the handlers did before: build models from documents, then FastAPI
+    # re-validates them against response_model and json-encodes the result.
+    adapter = TypeAdapter(List[model])
+    objects = [model(**doc) for doc in docs]
+    content = adapter.validate_python([obj.model_dump() for obj in objects])
+    return json.dumps(jsonable_encoder(adapter.dump_python(content, mode="json"))).encode()
+
+
+def fast_path(model, docs):
+    return dumps(construct_many(model, docs))
+
+
+def timed(fn, model, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(model, docs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for name, model, docs in (
+        ("alumni", AlumniProfile, alumni_docs(args.rows)),
+        ("events", Event, event_docs(args.rows)),
+    ):
+        assert json.loads(validated_path(model, docs)) == json.loads(fast_path(model, docs))
+        before = timed(validated_path, model, docs, args.repeat)
+        after = timed(fast_path, model, docs, args.repeat)
+        results[name] = {
+            "rows": args.rows,
+            "validated_us_per_row": round(before / args.rows * 1e6, 2),
+            "fast_us_per_row": round(after / args.rows * 1e6, 2),
+            "speedup": round(before / after, 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
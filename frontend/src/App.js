@@ -8,6 +8,7 @@ import {
 import axios from "axios";
 import "./App.css";
 import AuthPage from "./components/AuthPage";
+import ClaimAccountPage from "./components/ClaimAccountPage";
 import AdminDashboard from "./components/AdminDashboard";
 import AlumniDashboard from "./components/AlumniDashboard";
 import Homepage from "./Homepage";
@@ -29,11 +30,50 @@ axios.interceptors.request.use(
   }
 );
 
+// Concurrent 401s share one refresh call; each refresh token works only once
+let refreshing = null;
+
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    refreshing = axios
+      .post(`${API_BASE}/api/auth/refresh`, {
+        refresh_token: localStorage.getItem("refreshToken"),
+      })
+      .then((response) => {
+        localStorage.setItem("token", response.data.access_token);
+        localStorage.setItem("refreshToken", response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
 axios.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const request = error.config;
+    if (
+      error.response?.status === 401 &&
+      request &&
+      !request._retried &&
+      !request.url.includes("/api/auth/") &&
+      localStorage.getItem("refreshToken")
+    ) {
+      request._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        request.headers.Authorization = `Bearer ${token}`;
+        return axios(request);
+      } catch (refreshError) {
+        // Fall through to a fresh login
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem("token");
+      localStorage.removeItem("refreshToken");
       localStorage.removeItem("user");
       window.location.href = "/auth";
     }
@@ -55,14 +95,24 @@ function App() {
     setLoading(false);
   }, []);
 
-  const login = (token, userData) => {
+  const login = (token, userData, refreshToken) => {
     localStorage.setItem("token", token);
     localStorage.setItem("user", JSON.stringify(userData));
+    if (refreshToken) {
+      localStorage.setItem("refreshToken", refreshToken);
+    }
     setUser(userData);
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem("refreshToken");
+    if (refreshToken) {
+      axios
+        .post(`${API_BASE}/api/auth/logout`, { refresh_token: refreshToken })
+        .catch(() => {});
+    }
     localStorage.removeItem("token");
+    localStorage.removeItem("refreshToken");
     localStorage.removeItem("user");
     setUser(null);
   };
@@ -96,6 +146,16 @@ function App() {
               ))
             }
           />
+          <Route
+            path="/claim"
+            element={
+              user ? (
+                <Navigate to={user.role === "admin" ? "/admin" : "/alumni"} />
+              ) : (
+                <ClaimAccountPage onLogin={login} />
+              )
+            }
+          />
           <Route
             path="/admin/*"
             element={
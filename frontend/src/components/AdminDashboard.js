@@ -138,22 +138,39 @@ const AdminDashboard = ({ user, onLogout }) => {
   const AlumniManagement = () => {
     const [alumni, setAlumni] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
       fetchAlumni();
     }, []);
 
-    const fetchAlumni = async () => {
+    const fetchAlumni = async (cursor = null) => {
       try {
-        const response = await axios.get(`${API_BASE}/api/admin/alumni`);
-        setAlumni(response.data);
+        // Only the columns the table shows, one page at a time
+        const response = await axios.get(`${API_BASE}/api/admin/alumni`, {
+          params: {
+            fields: "full_name,user_id,graduation_year,degree,current_position",
+            ...(cursor && { cursor }),
+          },
+        });
+        setAlumni((current) =>
+          cursor ? [...current, ...response.data] : response.data
+        );
+        setNextCursor(response.headers["x-next-cursor"] || null);
       } catch (error) {
         console.error("Error fetching alumni:", error);
       } finally {
         setLoading(false);
+        setLoadingMore(false);
       }
     };
 
+    const loadMoreAlumni = () => {
+      setLoadingMore(true);
+      fetchAlumni(nextCursor);
+    };
+
     const deleteAlumni = async (alumniId) => {
       if (
         window.confirm("Are you sure you want to delete this alumni profile?")
@@ -222,6 +239,17 @@ const AdminDashboard = ({ user, onLogout }) => {
               No alumni profiles found.
             </div>
           )}
+          {nextCursor && (
+            <div className="text-center pt-4">
+              <button
+                onClick={loadMoreAlumni}
+                disabled={loadingMore}
+                className="btn-secondary"
+              >
+                {loadingMore ? "Loading..." : "Load more"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     );
@@ -230,39 +258,60 @@ const AdminDashboard = ({ user, onLogout }) => {
   const EventManagement = () => {
     const [events, setEvents] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [showCreateForm, setShowCreateForm] = useState(false);
     const [formData, setFormData] = useState({
       title: "",
       description: "",
       date: "",
       location: "",
+      capacity: "",
     });
 
     useEffect(() => {
       fetchEvents();
     }, []);
 
-    const fetchEvents = async () => {
+    const fetchEvents = async (cursor = null) => {
       try {
-        const response = await axios.get(`${API_BASE}/api/events`);
-        setEvents(response.data);
+        const response = await axios.get(`${API_BASE}/api/events`, {
+          params: cursor ? { cursor } : {},
+        });
+        setEvents((current) =>
+          cursor ? [...current, ...response.data] : response.data
+        );
+        setNextCursor(response.headers["x-next-cursor"] || null);
       } catch (error) {
         console.error("Error fetching events:", error);
       } finally {
         setLoading(false);
+        setLoadingMore(false);
       }
     };
 
+    const loadMoreEvents = () => {
+      setLoadingMore(true);
+      fetchEvents(nextCursor);
+    };
+
     const handleSubmit = async (e) => {
       e.preventDefault();
       try {
         const eventData = {
           ...formData,
           date: new Date(formData.date).toISOString(),
+          capacity: formData.capacity ? parseInt(formData.capacity, 10) : null,
         };
         const response = await axios.post(`${API_BASE}/api/events`, eventData);
         setEvents([...events, response.data]);
-        setFormData({ title: "", description: "", date: "", location: "" });
+        setFormData({
+          title: "",
+          description: "",
+          date: "",
+          location: "",
+          capacity: "",
+        });
         setShowCreateForm(false);
       } catch (error) {
         console.error("Error creating event:", error);
@@ -352,6 +401,19 @@ const AdminDashboard = ({ user, onLogout }) => {
                     required
                   />
                 </div>
+                <div>
+                  <label className="form-label">Capacity</label>
+                  <input
+                    type="number"
+                    min="1"
+                    placeholder="Unlimited"
+                    value={formData.capacity}
+                    onChange={(e) =>
+                      setFormData({ ...formData, capacity: e.target.value })
+                    }
+                    className="form-input"
+                  />
+                </div>
               </div>
               <div className="flex space-x-4">
                 <button type="submit" className="btn-primary">
@@ -383,11 +445,28 @@ const AdminDashboard = ({ user, onLogout }) => {
                   <MapPin className="w-4 h-4 mr-2" />
                   {event.location}
                 </div>
+                <div className="flex items-center">
+                  <Users className="w-4 h-4 mr-2" />
+                  {event.attendee_count || 0}
+                  {event.capacity ? ` / ${event.capacity}` : ""} attending
+                </div>
               </div>
             </div>
           ))}
         </div>
 
+        {nextCursor && (
+          <div className="text-center">
+            <button
+              onClick={loadMoreEvents}
+              disabled={loadingMore}
+              className="btn-secondary"
+            >
+              {loadingMore ? "Loading..." : "Load more events"}
+            </button>
+          </div>
+        )}
+
         {events.length === 0 && !showCreateForm && (
           <div className="text-center py-8 text-gray-500">
             No events found. Create your first event!
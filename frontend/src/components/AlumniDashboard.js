@@ -15,6 +15,7 @@ import {
   Save,
   X,
 } from "lucide-react";
+import { useEventStream } from "../hooks/use-event-stream";
 
 const API_BASE = process.env.REACT_APP_BACKEND_URL;
 
@@ -327,17 +328,32 @@ const AlumniDashboard = ({ user, onLogout }) => {
   };
 
   const EventsView = () => {
-    const [events, setEvents] = useState([]);
+    const [upcomingEvents, setUpcomingEvents] = useState([]);
+    const [pastEvents, setPastEvents] = useState([]);
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
       fetchEvents();
     }, []);
 
+    // New events are pushed by the server instead of polled
+    useEventStream((event) => {
+      if (event === "event.created") {
+        fetchEvents();
+      }
+    });
+
     const fetchEvents = async () => {
       try {
-        const response = await axios.get(`${API_BASE}/api/events`);
-        setEvents(response.data);
+        // Sorted and filtered server-side: soonest upcoming, most recent past
+        const [upcoming, past] = await Promise.all([
+          axios.get(`${API_BASE}/api/events`, { params: { when: "upcoming" } }),
+          axios.get(`${API_BASE}/api/events`, {
+            params: { when: "past", limit: 20 },
+          }),
+        ]);
+        setUpcomingEvents(upcoming.data);
+        setPastEvents(past.data);
       } catch (error) {
         console.error("Error fetching events:", error);
       } finally {
@@ -345,6 +361,40 @@ const AlumniDashboard = ({ user, onLogout }) => {
       }
     };
 
+    const [attending, setAttending] = useState({});
+    const [feedUrl, setFeedUrl] = useState("");
+
+    // Calendar apps poll this URL; creating a new one revokes the previous URL
+    const createFeedUrl = async () => {
+      try {
+        const response = await axios.post(
+          `${API_BASE}/api/events/calendar/token`
+        );
+        setFeedUrl(response.data.url);
+      } catch (error) {
+        alert(error.response?.data?.detail || "Could not create a calendar link");
+      }
+    };
+
+    const toggleRsvp = async (event) => {
+      const url = `${API_BASE}/api/events/${event.id}/rsvp`;
+      try {
+        if (attending[event.id]) {
+          await axios.delete(url);
+        } else {
+          await axios.post(url);
+        }
+        setAttending({ ...attending, [event.id]: !attending[event.id] });
+        fetchEvents();
+      } catch (error) {
+        if (error.response?.data?.detail === "Already registered for this event") {
+          setAttending({ ...attending, [event.id]: true });
+          return;
+        }
+        alert(error.response?.data?.detail || "Could not update RSVP");
+      }
+    };
+
     const formatDate = (dateString) => {
       return new Date(dateString).toLocaleDateString("en-US", {
         year: "numeric",
@@ -355,10 +405,6 @@ const AlumniDashboard = ({ user, onLogout }) => {
       });
     };
 
-    const isUpcoming = (dateString) => {
-      return new Date(dateString) > new Date();
-    };
-
     if (loading) {
       return (
         <div className="flex items-center justify-center h-64">
@@ -367,12 +413,29 @@ const AlumniDashboard = ({ user, onLogout }) => {
       );
     }
 
-    const upcomingEvents = events.filter((event) => isUpcoming(event.date));
-    const pastEvents = events.filter((event) => !isUpcoming(event.date));
-
     return (
       <div className="space-y-8">
-        <h1 className="text-3xl font-bold text-gray-900">Events</h1>
+        <div className="flex items-center justify-between">
+          <h1 className="text-3xl font-bold text-gray-900">Events</h1>
+          <button onClick={createFeedUrl} className="btn-secondary">
+            Subscribe in calendar app
+          </button>
+        </div>
+
+        {feedUrl && (
+          <div className="card">
+            <p className="text-gray-600 mb-2">
+              Add this URL to Google Calendar, Apple Calendar or Outlook. Keep
+              it private: anyone with it can read the events feed.
+            </p>
+            <input
+              readOnly
+              value={feedUrl}
+              onFocus={(e) => e.target.select()}
+              className="form-input"
+            />
+          </div>
+        )}
 
         {upcomingEvents.length > 0 && (
           <div>
@@ -396,7 +459,19 @@ const AlumniDashboard = ({ user, onLogout }) => {
                       <MapPin className="w-4 h-4 mr-2" />
                       {event.location}
                     </div>
+                    <div className="flex items-center">
+                      <Users className="w-4 h-4 mr-2" />
+                      {event.capacity
+                        ? `${event.capacity - event.attendee_count} of ${event.capacity} seats left`
+                        : `${event.attendee_count || 0} attending`}
+                    </div>
                   </div>
+                  <button
+                    onClick={() => toggleRsvp(event)}
+                    className={`mt-4 ${attending[event.id] ? "btn-secondary" : "btn-primary"}`}
+                  >
+                    {attending[event.id] ? "Cancel RSVP" : "RSVP"}
+                  </button>
                 </div>
               ))}
             </div>
@@ -429,7 +504,7 @@ const AlumniDashboard = ({ user, onLogout }) => {
           </div>
         )}
 
-        {events.length === 0 && (
+        {upcomingEvents.length === 0 && pastEvents.length === 0 && (
           <div className="text-center py-8 text-gray-500">
             No events available at the moment.
           </div>
@@ -439,32 +514,101 @@ const AlumniDashboard = ({ user, onLogout }) => {
   };
 
   const NetworkView = () => {
-    const [alumni, setAlumni] = useState([]);
+    const [mode, setMode] = useState("connections");
+    const [suggestions, setSuggestions] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [message, setMessage] = useState("");
 
     useEffect(() => {
-      // For now, we'll use a placeholder since alumni network endpoint needs to be public
-      // In a real implementation, you'd create a separate endpoint for alumni networking
-      setLoading(false);
-    }, []);
+      fetchSuggestions(mode);
+    }, [mode]);
+
+    const fetchSuggestions = async (selectedMode) => {
+      setLoading(true);
+      setMessage("");
+      try {
+        const response = await axios.get(
+          `${API_BASE}/api/alumni/recommendations`,
+          { params: { mode: selectedMode, limit: 12 } }
+        );
+        setSuggestions(response.data);
+      } catch (error) {
+        setSuggestions([]);
+        if (error.response?.status === 404) {
+          setMessage("Create your profile to get suggestions.");
+        } else if (error.response?.status === 503) {
+          setMessage("Suggestions are being prepared, please check back shortly.");
+        } else {
+          console.error("Error fetching suggestions:", error);
+        }
+      } finally {
+        setLoading(false);
+      }
+    };
 
     return (
       <div className="space-y-6">
-        <h1 className="text-3xl font-bold text-gray-900">Alumni Network</h1>
-
-        <div className="card">
-          <div className="text-center py-12">
-            <Users className="w-16 h-16 text-gray-400 mx-auto mb-4" />
-            <h3 className="text-lg font-semibold text-gray-900 mb-2">
-              Coming Soon
-            </h3>
-            <p className="text-gray-600">
-              The alumni networking feature is being developed. You'll soon be
-              able to connect with fellow alumni, find mentors, and expand your
-              professional network.
-            </p>
+        <div className="flex justify-between items-center">
+          <h1 className="text-3xl font-bold text-gray-900">Alumni Network</h1>
+          <div className="flex space-x-2">
+            <button
+              onClick={() => setMode("connections")}
+              className={mode === "connections" ? "btn-primary" : "btn-secondary"}
+            >
+              Connections
+            </button>
+            <button
+              onClick={() => setMode("mentors")}
+              className={mode === "mentors" ? "btn-primary" : "btn-secondary"}
+            >
+              Mentors
+            </button>
           </div>
         </div>
+
+        {loading ? (
+          <div className="flex items-center justify-center h-64">
+            <div className="loading-spinner"></div>
+          </div>
+        ) : suggestions.length > 0 ? (
+          <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+            {suggestions.map(({ profile, reasons }) => (
+              <div key={profile.id} className="card">
+                <h3 className="text-lg font-semibold mb-2">
+                  {profile.full_name}
+                </h3>
+                <div className="space-y-2 text-sm text-gray-500 mb-4">
+                  <div className="flex items-center">
+                    <GraduationCap className="w-4 h-4 mr-2" />
+                    {profile.degree} in {profile.department}, {profile.graduation_year}
+                  </div>
+                  {profile.current_company && (
+                    <div className="flex items-center">
+                      <Building className="w-4 h-4 mr-2" />
+                      {profile.current_position
+                        ? `${profile.current_position} at ${profile.current_company}`
+                        : profile.current_company}
+                    </div>
+                  )}
+                </div>
+                <ul className="text-sm text-gray-600 list-disc list-inside">
+                  {reasons.map((reason) => (
+                    <li key={reason}>{reason}</li>
+                  ))}
+                </ul>
+              </div>
+            ))}
+          </div>
+        ) : (
+          <div className="card">
+            <div className="text-center py-12">
+              <Users className="w-16 h-16 text-gray-400 mx-auto mb-4" />
+              <p className="text-gray-600">
+                {message || "No suggestions yet. Add more detail to your profile to find alumni like you."}
+              </p>
+            </div>
+          </div>
+        )}
       </div>
     );
   };
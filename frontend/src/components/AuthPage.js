@@ -25,7 +25,11 @@ const AuthPage = ({ onLogin }) => {
       const endpoint = isLogin ? "/api/auth/login" : "/api/auth/register";
       const response = await axios.post(`${API_BASE}${endpoint}`, formData);
 
-      onLogin(response.data.access_token, response.data.user);
+      onLogin(
+        response.data.access_token,
+        response.data.user,
+        response.data.refresh_token
+      );
     } catch (error) {
       console.error("Authentication error:", error);
 
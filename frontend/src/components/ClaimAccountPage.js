@@ -0,0 +1,86 @@
+import React, { useState } from "react";
+import axios from "axios";
+import { Lock, Users } from "lucide-react";
+import { useSearchParams } from "react-router-dom";
+
+const API_BASE = process.env.REACT_APP_BACKEND_URL;
+
+// Landing page of the link mailed to bulk-imported alumni
+const ClaimAccountPage = ({ onLogin }) => {
+  const [searchParams] = useSearchParams();
+  const [password, setPassword] = useState("");
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState("");
+
+  const handleSubmit = async (e) => {
+    e.preventDefault();
+    setLoading(true);
+    setError("");
+
+    try {
+      const response = await axios.post(`${API_BASE}/api/auth/claim`, {
+        token: searchParams.get("token") || "",
+        password,
+      });
+      onLogin(
+        response.data.access_token,
+        response.data.user,
+        response.data.refresh_token
+      );
+    } catch (error) {
+      setError(error.response?.data?.detail || "Could not claim the account");
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div
+      className="min-h-screen flex items-center justify-center px-4 py-12"
+      style={{ backgroundColor: "#fcf6f6" }}
+    >
+      <div className="max-w-md w-full">
+        <div className="glass p-8 slide-in">
+          <div className="text-center mb-8">
+            <div className="inline-flex items-center justify-center w-16 h-16 bg-gradient-to-br from-red-500 to-purple-600 rounded-full mb-4">
+              <Users className="w-8 h-8 text-white" />
+            </div>
+            <h2 className="text-3xl font-bold text-gray-900 mb-2">
+              AlumniSphere
+            </h2>
+            <p className="text-gray-600">Choose a password for your account</p>
+          </div>
+
+          {error && <div className="alert-error fade-in">{error}</div>}
+
+          <form onSubmit={handleSubmit} className="space-y-6">
+            <div>
+              <label className="form-label">
+                <Lock className="w-4 h-4 inline mr-2" />
+                Password
+              </label>
+              <input
+                type="password"
+                value={password}
+                onChange={(e) => setPassword(e.target.value)}
+                className="form-input"
+                placeholder="Enter a password"
+                required
+              />
+            </div>
+
+            <button
+              type="submit"
+              disabled={loading}
+              className="btn-primary w-full flex items-center justify-center"
+            >
+              {loading ? <div className="loading-spinner"></div> : "Claim account"}
+            </button>
+          </form>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default ClaimAccountPage;
@@ -0,0 +1,71 @@
+import * as React from "react";
+
+const API_BASE = process.env.REACT_APP_BACKEND_URL;
+const RECONNECT_DELAY = 5000;
+
+// EventSource cannot send an Authorization header, so the stream is read with fetch.
+async function readStream(signal, onMessage) {
+  const response = await fetch(`${API_BASE}/api/stream`, {
+    headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+    signal,
+  });
+  if (!response.ok) {
+    throw new Error(`Stream failed with ${response.status}`);
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      return;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) {
+          event = line.slice(7);
+        } else if (line.startsWith("data: ")) {
+          data += line.slice(6);
+        }
+      }
+      if (data && event !== "reconnect") {
+        onMessage(event, JSON.parse(data));
+      }
+    }
+  }
+}
+
+// Calls onMessage(event, data) for every pushed message, reconnecting while mounted.
+function useEventStream(onMessage) {
+  const handler = React.useRef(onMessage);
+  handler.current = onMessage;
+
+  React.useEffect(() => {
+    const controller = new AbortController();
+    let timer;
+    const connect = () => {
+      readStream(controller.signal, (event, data) =>
+        handler.current(event, data)
+      )
+        .catch(() => {})
+        .finally(() => {
+          if (!controller.signal.aborted) {
+            timer = setTimeout(connect, RECONNECT_DELAY);
+          }
+        });
+    };
+    connect();
+    return () => {
+      controller.abort();
+      clearTimeout(timer);
+    };
+  }, []);
+}
+
+export { useEventStream };
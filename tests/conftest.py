@@ -0,0 +1,54 @@
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+@pytest.fixture
+def mongo_client():
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient()
+
+
+@pytest.fixture
+def mongo(mongo_client):
+    """A fresh in-memory database."""
+    return mongo_client[f"test_{uuid.uuid4().hex[:8]}"]
+
+
+@pytest.fixture
+def api(mongo_client, mongo):
+    """Runs ``body(client)`` against the app, started on a fresh in-memory database."""
+    import httpx
+    import server
+
+    def run(body):
+        async def main():
+            server.client = mongo_client
+            server.db = mongo
+            async with server.app.router.lifespan_context(server.app):
+                transport = httpx.ASGITransport(app=server.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    await body(client)
+
+        asyncio.run(main())
+
+    return run
+
+
+async def register(client, role="alumni", email=None):
+    """``(user, auth headers)`` for a newly registered user."""
+    email = email or f"{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post("/api/auth/register", json={"email": email, "password": "secret", "role": role})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return body["user"], {"Authorization": f"Bearer {body['access_token']}"}
@@ -0,0 +1,166 @@
+import asyncio
+
+from pymongo.errors import AutoReconnect
+from starlette.routing import Route
+
+import instrumentation
+from breaker import CircuitBreaker
+from deadlines import DeadlineMiddleware, parse_route_deadlines
+from instrumentation import InstrumentationMiddleware
+
+RESET = 0.05
+
+
+def test_breaker_opens_probes_once_and_closes():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=RESET)
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+    assert breaker.retry_after == 1
+
+    async def wait():
+        await asyncio.sleep(RESET * 1.5)
+
+    asyncio.run(wait())
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # only one at a time
+    breaker.record_failure()  # failed probe reopens
+    assert breaker.is_open and not breaker.allow()
+
+    asyncio.run(wait())
+    assert breaker.allow()
+    breaker.release_probe()  # probe ended without a verdict
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open and breaker.allow()
+
+
+def test_route_deadlines_parse():
+    assert parse_route_deadlines("/api/a=2.5, /api/b=0,,") == {"/api/a": 2.5, "/api/b": None}
+
+
+async def _endpoint(request):
+    pass
+
+
+ROUTES = [Route(path, _endpoint) for path in ("/api/data", "/api/cached", "/api/stream", "/api/slow")]
+
+
+class Stack:
+    """The deadline middleware inside instrumentation, over a scripted app."""
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self.mode = "ok"
+        self.hang = asyncio.Event()
+        deadlines = DeadlineMiddleware(
+            self.app, routes=ROUTES, breaker=breaker, default_seconds=5, route_seconds={"/api/stream": None,
+            "/api/slow": 0.05}, exempt_routes=("/api/stream",),
+        )
+        self.asgi = InstrumentationMiddleware(deadlines, routes=ROUTES)
+
+    async def app(self, scope, receive, send):
+        path = scope["path"]
+        if path in ("/api/stream", "/api/slow"):
+            await self.hang.wait()
+        elif self.mode == "fail":
+            raise AutoReconnect("connection refused")
+        elif path == "/api/data":
+            # What the command listener records when Mongo answers
+            instrumentation._request_commands.get().append(("find", "data", 1.0, 1, False))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def get(self, path):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+        await self.asgi(scope, None, send)
+        start = messages[0]
+        return start["status"], dict(start["headers"]).get(b"retry-after")
+
+
+def _open(stack):
+    async def run():
+        stack.mode = "fail"
+        statuses = [(await stack.get("/api/data"))[0] for _ in range(3)]
+        stack.mode = "ok"
+        return statuses
+
+    return run()
+
+
+def test_failures_open_the_circuit_and_a_database_answer_closes_it():
+    async def run():
+        stack = Stack(CircuitBreaker("test", failure_threshold=3, reset_seconds=RESET))
+        assert await _open(stack) == [503, 503, 503]
+        assert await stack.get("/api/data") == (503, b"1")
+        await asyncio.sleep(RESET * 1.5)
+
+        # A probe served from cache never reached Mongo: still open
+        assert (await stack.get("/api/cached"))[0] == 200
+        assert stack.breaker.is_open
+        # The next probe reaches Mongo and closes the circuit
+        assert (await stack.get("/api/data"))[0] == 200
+        assert not stack.breaker.is_open
+
+    asyncio.run(run())
+
+
+def test_cache_hits_do_not_reset_the_failure_count():
+    async def run():
+        stack = Stack(CircuitBreaker("test", failure_threshold=2, reset_seconds=RESET))
+        stack.mode = "fail"
+        await stack.get("/api/data")
+        stack.mode = "ok"
+        await stack.get("/api/cached")
+        stack.mode = "fail"
+        await stack.get("/api/data")
+        assert stack.breaker.is_open
+
+    asyncio.run(run())
+
+
+def test_deadline_miss_is_a_504_and_counts_as_a_failure():
+    async def run():
+        stack = Stack(CircuitBreaker("test", failure_threshold=1, reset_seconds=RESET))
+        assert (await stack.get("/api/slow"))[0] == 504
+        assert stack.breaker.is_open
+
+    asyncio.run(run())
+
+
+def test_cancelled_probe_is_released():
+    async def run():
+        stack = Stack(CircuitBreaker("test", failure_threshold=3, reset_seconds=RESET))
+        await _open(stack)
+        await asyncio.sleep(RESET * 1.5)
+        stack.mode = "hang"
+        probe = asyncio.create_task(stack.get("/api/slow"))
+        await asyncio.sleep(0.01)
+        probe.cancel()  # the client went away
+        await asyncio.gather(probe, return_exceptions=True)
+        stack.mode = "ok"
+        assert (await stack.get("/api/data"))[0] == 200
+        assert not stack.breaker.is_open
+
+    asyncio.run(run())
+
+
+def test_open_streams_never_hold_the_probe():
+    async def run():
+        stack = Stack(CircuitBreaker("test", failure_threshold=3, reset_seconds=RESET))
+        await _open(stack)
+        await asyncio.sleep(RESET * 1.5)
+        stream = asyncio.create_task(stack.get("/api/stream"))
+        await asyncio.sleep(0.01)
+        assert (await stack.get("/api/data"))[0] == 200
+        assert not stack.breaker.is_open
+        stack.hang.set()
+        await stream
+
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo import ASCENDING, DESCENDING
+
+from calendar_feed import event_window
+
+from .conftest import register
+
+NOW = datetime(2030, 6, 1, 12, tzinfo=timezone.utc)
+START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+END = datetime(2031, 1, 1, tzinfo=timezone.utc)
+
+
+def test_window_when():
+    assert event_window(now=NOW) == ({}, ASCENDING)
+    assert event_window("upcoming", now=NOW) == ({"date": {"$gte": NOW}}, ASCENDING)
+    assert event_window("past", now=NOW) == ({"date": {"$lt": NOW}}, DESCENDING)
+
+
+def test_window_range_is_intersected_with_when():
+    assert event_window(start=START, end=END, now=NOW) == ({"date": {"$gte": START, "$lt": END}}, ASCENDING)
+    assert event_window("upcoming", START, END, now=NOW) == ({"date": {"$gte": NOW, "$lt": END}}, ASCENDING)
+    assert event_window("past", START, END, now=NOW) == ({"date": {"$gte": START, "$lt": NOW}}, DESCENDING)
+    # A range entirely in the future keeps its own start
+    later = NOW + timedelta(days=1)
+    assert event_window("upcoming", start=later, now=NOW) == ({"date": {"$gte": later}}, ASCENDING)
+
+
+def test_window_naive_bounds_are_utc_and_empty_ranges_rejected():
+    query, _ = event_window(start=datetime(2030, 1, 1), now=NOW)
+    assert query == {"date": {"$gte": START}}
+    with pytest.raises(ValueError):
+        event_window(start=END, end=START, now=NOW)
+    with pytest.raises(ValueError):
+        event_window(start=START, end=START, now=NOW)
+
+
+EVENT = {"title": "Reunion, 2030", "description": "Drinks; food", "location": "Hall", "notify_alumni": False}
+
+
+def test_feed_token_etag_and_revocation(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        _, alumni = await register(client)
+        await client.post("/api/events", json={**EVENT, "date": "2030-01-01T18:00:00Z"}, headers=admin)
+
+        # Calendar apps cannot send a bearer token
+        response = await client.get("/api/events/calendar.ics")
+        assert response.status_code == 422
+        response = await client.get("/api/events/calendar.ics", params={"token": "guessed"})
+        assert response.status_code == 401
+
+        url = (await client.post("/api/events/calendar/token", headers=alumni)).json()["url"]
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/calendar")
+        assert "SUMMARY:Reunion\\, 2030\r\n" in response.text
+        etag = response.headers["etag"]
+
+        # Polls revalidate with the ETag until the feed changes
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert (response.status_code, response.content) == (304, b"")
+        await client.post("/api/events", json={**EVENT, "date": "2030-02-01T18:00:00Z"}, headers=admin)
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.text.count("BEGIN:VEVENT") == 2
+
+        # A new token replaces the old URL; revoking ends the new one
+        new_url = (await client.post("/api/events/calendar/token", headers=alumni)).json()["url"]
+        assert (await client.get(url)).status_code == 401
+        assert (await client.get(new_url)).status_code == 200
+        response = await client.delete("/api/events/calendar/token", headers=alumni)
+        assert response.status_code == 204
+        assert (await client.get(new_url)).status_code == 401
+
+    api(body)
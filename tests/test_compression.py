@@ -0,0 +1,67 @@
+import asyncio
+import gzip
+
+import brotli
+import pytest
+
+from compression import CompressionMiddleware, parse_accept_encoding
+
+
+def _app(body, content_type=b"application/json", chunks=1, headers=()):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *headers],
+        })
+        size = -(-len(body) // chunks)
+        for i in range(chunks):
+            await send({"type": "http.response.body", "body": body[i * size:(i + 1) * size], "more_body": i < chunks - 1})
+    return app
+
+
+def _call(app, accept_encoding, minimum_size=100):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, None, send))
+    headers = dict(messages[0]["headers"])
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return headers, body
+
+
+BODY = b'{"items": [' + b", ".join(b'{"id": %d, "name": "Alumnus"}' % i for i in range(200)) + b"]}"
+
+
+def test_accept_encoding_parsing():
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0, bogus;q=x") == {
+        "gzip": 0.5, "br": 1.0, "identity": 0.0, "bogus": 0.0,
+    }
+
+
+@pytest.mark.parametrize("accept, encoding, decompress", [
+    ("gzip, br", b"br", brotli.decompress),
+    ("gzip", b"gzip", gzip.decompress),
+    ("br;q=0.5, gzip", b"gzip", gzip.decompress),
+])
+def test_negotiated_encoding_round_trips_streamed_bodies(accept, encoding, decompress):
+    headers, body = _call(_app(BODY, chunks=5, headers=[(b"etag", b'"abc"')]), accept)
+    assert headers[b"content-encoding"] == encoding
+    assert b"content-length" not in headers
+    assert headers[b"etag"] == b'W/"abc"'
+    assert decompress(body) == BODY
+
+
+@pytest.mark.parametrize("app, accept", [
+    (_app(b'{"small": true}'), "gzip"),
+    (_app(BODY, content_type=b"text/event-stream"), "gzip"),
+    (_app(BODY, content_type=b"image/png"), "gzip"),
+    (_app(BODY), "gzip;q=0, br;q=0"),
+])
+def test_small_streaming_binary_or_refused_bodies_pass_through(app, accept):
+    headers, body = _call(app, accept)
+    assert b"content-encoding" not in headers
+    assert body in (BODY, b'{"small": true}')
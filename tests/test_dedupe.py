@@ -0,0 +1,38 @@
+from dedupe import blocking_keys, compare, name_tokens, normalize_phone
+
+from .conftest import register
+
+
+def test_names_normalize_order_accents_and_titles():
+    assert name_tokens("Dr. José Smith Jr.") == ["jose", "smith"]
+    assert name_tokens("Smith, Jose") == ["jose", "smith"]
+    assert normalize_phone("+1 (555) 010-0000") == normalize_phone("5550100000") == "5550100000"
+
+
+def test_variants_share_a_block_and_score_as_duplicates():
+    a = {"full_name": "Jon Smith", "phone": "555-0100", "graduation_year": 2015, "department": "History"}
+    b = {"full_name": "John Smith", "phone": "(555) 0100", "graduation_year": 2015, "department": "history"}
+    assert set(blocking_keys(a)) & set(blocking_keys(b))
+    score, reasons = compare(a, b)
+    assert score >= 0.5
+    assert "Same phone number" in reasons and "Similar name" in reasons
+
+
+PROFILE = {"phone": "555-0199", "graduation_year": 2012, "degree": "BSc", "department": "Physics"}
+
+
+def test_renaming_a_profile_refreshes_its_keys_and_finds_duplicates(api):
+    async def body(client):
+        import server
+        _, first = await register(client)
+        _, second = await register(client)
+        await client.post("/api/alumni/profile", json={**PROFILE, "full_name": "Marie Curie"}, headers=first)
+        await client.post("/api/alumni/profile", json={**PROFILE, "phone": "555-0200", "full_name": "Pierre"}, headers=second)
+
+        response = await client.put("/api/alumni/profile", json={"full_name": "Marie Curie"}, headers=second)
+        assert response.status_code == 200
+        stored = await server.db.alumni_profiles.find_one({"id": response.json()["id"]})
+        assert "name_year:curie marie:2012" in stored["dedupe_keys"]
+        assert await server.db.dedupe_candidates.count_documents({"status": "open"}) == 1
+
+    api(body)
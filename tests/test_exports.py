@@ -0,0 +1,110 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+import exports
+from exports import EXPORT_FIELDS, stream_alumni
+
+from .conftest import register
+
+
+def _profile(i, **fields):
+    return {
+        "id": f"p{i:03d}",
+        "user_id": f"u{i:03d}",
+        "full_name": f"Alum {i}",
+        "phone": "555-0100",
+        "graduation_year": 2010 + i % 3,
+        "degree": "BSc",
+        "department": "CS" if i % 2 else "History",
+        "bio": None,
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        # Internal fields never leave through the export
+        "search_terms": ["alum"],
+        "dedupe_keys": ["phone:5550100"],
+        **fields,
+    }
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def _csv_rows(data):
+    return list(csv.DictReader(io.StringIO(data.decode())))
+
+
+def test_csv_cells_that_look_like_formulas_are_quoted(mongo):
+    async def run():
+        await mongo.alumni_profiles.insert_many([
+            _profile(1, full_name='=HYPERLINK("http://evil","x")', bio="@SUM(A1)", current_company="+cmd"),
+            _profile(2, full_name="-2+3", current_position="\tTab", phone="555 = fine"),
+        ])
+        return b"".join(await _collect(stream_alumni(mongo.alumni_profiles, {}, fmt="csv")))
+
+    first, second = _csv_rows(asyncio.run(run()))
+    assert (first["full_name"], first["bio"], first["current_company"]) == (
+        "'=HYPERLINK(\"http://evil\",\"x\")", "'@SUM(A1)", "'+cmd"
+    )
+    assert (second["full_name"], second["current_position"], second["phone"]) == ("'-2+3", "'\tTab", "555 = fine")
+    # Numbers and dates are not strings a user typed
+    assert (first["graduation_year"], first["created_at"]) == ("2011", "2024-01-01T00:00:00")
+
+
+def test_export_streams_in_chunks_with_only_export_fields(mongo, monkeypatch):
+    monkeypatch.setattr(exports, "CHUNK_BYTES", 1024)
+
+    async def run():
+        await mongo.alumni_profiles.insert_many([_profile(i) for i in range(50)])
+        return await _collect(stream_alumni(mongo.alumni_profiles, {}, batch_size=7))
+
+    chunks = asyncio.run(run())
+    # The first row is flushed on its own, then roughly CHUNK_BYTES at a time
+    assert len(chunks) > 3
+    assert chunks[0].count(b"\n") == 1
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert len(rows) == 50
+    assert all(set(row) <= set(EXPORT_FIELDS) for row in rows)
+
+
+def test_gzip_export_decompresses_to_the_plain_one(mongo):
+    async def run():
+        await mongo.alumni_profiles.insert_many([_profile(i) for i in range(20)])
+        plain = b"".join(await _collect(stream_alumni(mongo.alumni_profiles, {}, fmt="csv")))
+        packed = b"".join(await _collect(stream_alumni(mongo.alumni_profiles, {}, fmt="csv", compress=True)))
+        return plain, packed
+
+    plain, packed = asyncio.run(run())
+    assert gzip.decompress(packed) == plain
+    assert _csv_rows(plain)[0].keys() == set(EXPORT_FIELDS)
+
+
+def test_export_route_filters_and_names_the_download(api):
+    import server
+
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        await server.db.alumni_profiles.insert_many([_profile(i) for i in range(6)])
+
+        response = await client.get(
+            "/api/admin/alumni/export", params={"format": "csv", "department": "CS"}, headers=admin
+        )
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-disposition"] == 'attachment; filename="alumni.csv"'
+        assert [row["id"] for row in _csv_rows(response.content)] == ["p001", "p003", "p005"]
+
+        response = await client.get(
+            "/api/admin/alumni/export", params={"gzip": "true", "graduation_year": 2010}, headers=admin
+        )
+        assert response.headers["content-disposition"] == 'attachment; filename="alumni.ndjson.gz"'
+        rows = [json.loads(line) for line in gzip.decompress(response.content).splitlines()]
+        assert [row["id"] for row in rows] == ["p000", "p003"]
+
+        _, alumni = await register(client)
+        assert (await client.get("/api/admin/alumni/export", headers=alumni)).status_code == 403
+
+    api(body)
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+
+from hashing import HashPool, HashPoolSaturated
+
+from .conftest import register
+
+
+def _blocking(event):
+    event.wait(5)
+    return "done"
+
+
+def test_saturated_pool_rejects_with_a_retry_hint():
+    pool = HashPool(workers=1, max_queue=1, rounds=4)
+    release = threading.Event()
+
+    async def run():
+        running = [asyncio.ensure_future(pool._submit("hash", _blocking, release)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(HashPoolSaturated) as saturated:
+            await pool._submit("hash", _blocking, release)
+        release.set()
+        return saturated.value.retry_after, await asyncio.gather(*running)
+
+    try:
+        retry_after, results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert retry_after >= 1
+    assert results == ["done", "done"]
+    assert pool.pending == 0
+
+
+def test_cancelled_callers_stay_admitted_until_the_work_ends():
+    pool = HashPool(workers=1, max_queue=0, rounds=4)
+    release = threading.Event()
+
+    async def run():
+        caller = asyncio.ensure_future(pool._submit("verify", _blocking, release))
+        await asyncio.sleep(0.01)
+        caller.cancel()  # e.g. the request deadline passed
+        await asyncio.gather(caller, return_exceptions=True)
+        # bcrypt is still running on the only worker
+        assert pool.pending == 1
+        with pytest.raises(HashPoolSaturated):
+            await pool._submit("verify", _blocking, release)
+        release.set()
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.pending == 0
+        return await pool._submit("verify", _blocking, release)
+
+    try:
+        assert asyncio.run(run()) == "done"
+    finally:
+        pool.shutdown()
+
+
+def test_hash_round_trip():
+    pool = HashPool(workers=1, rounds=4)
+
+    async def run():
+        hashed = await pool.hash("secret")
+        return await pool.verify("secret", hashed), await pool.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_auth_answers_429_with_retry_after(api, monkeypatch):
+    import server
+
+    async def body(client):
+        user, _ = await register(client)
+        monkeypatch.setattr(server.hash_pool, "_pending", server.hash_pool.workers + server.hash_pool.max_queue)
+        response = await client.post("/api/auth/login", json={"email": user["email"], "password": "secret"})
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        response = await client.post("/api/auth/register", json={"email": "new@example.com", "password": "secret"})
+        assert response.status_code == 429
+
+    api(body)
@@ -0,0 +1,125 @@
+import asyncio
+import re
+
+from importer import iter_csv_records, iter_lines, iter_ndjson_records
+
+from .conftest import register
+
+
+async def _chunks(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+def _csv(data, size=7):
+    return asyncio.run(_collect(iter_csv_records(iter_lines(_chunks(data, size)))))
+
+
+def _ndjson(data, size=5):
+    return asyncio.run(_collect(iter_ndjson_records(iter_lines(_chunks(data, size)))))
+
+
+def test_lines_survive_chunk_boundaries_inside_characters():
+    data = "﻿José\nZoë\nlast".encode()
+    for size in range(1, len(data) + 1):
+        assert asyncio.run(_collect(iter_lines(_chunks(data, size)))) == ["José", "Zoë", "last"]
+
+
+def test_csv_handles_quoted_newlines_crlf_and_blank_lines():
+    data = (
+        b'email, full_name ,bio\r\n'
+        b'a@x.com,"Smith, Ann","Line one\r\nline ""two"""\r\n'
+        b'\r\n'
+        b'b@x.com,Bob,\r\n'
+    )
+    assert _csv(data) == [
+        {"email": "a@x.com", "full_name": "Smith, Ann", "bio": 'Line one\r\nline "two"'},
+        {"email": "b@x.com", "full_name": "Bob", "bio": ""},
+    ]
+
+
+def test_ndjson_passes_unparseable_lines_through_for_reporting():
+    data = b'{"email": "a@x.com"}\n\nnot json\n[1, 2]\n{"email": "b@x.com"}'
+    assert _ndjson(data) == [{"email": "a@x.com"}, "not json", "[1, 2]", {"email": "b@x.com"}]
+
+
+CSV_IMPORT = (
+    b"email,full_name,phone,graduation_year,degree,department\n"
+    b"claim@example.com,Casey Claim,555-0101,2015,BSc,History\n"
+    b"other@example.com,Olive Other,555-0102,2016,BA,Art\n"
+    b"broken@example.com,Bad Year,555-0103,soon,BA,Art\n"
+)
+
+
+async def _wait_for_job(client, headers, job_id):
+    for _ in range(200):
+        job = (await client.get(f"/api/admin/jobs/{job_id}", headers=headers)).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _claim_token(email):
+    import server
+
+    [message] = [message for message in server.outreach_transport.outbox if message["To"] == email]
+    return re.search(r"token=(\S+)", message.get_content()).group(1)
+
+
+def test_import_reports_rows_and_mails_claim_links(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        response = await client.post(
+            "/api/admin/alumni/import", content=CSV_IMPORT, headers={**admin, "Content-Type": "text/csv"}
+        )
+        report = response.json()
+        assert (report["rows"], report["imported"], report["users_created"], report["failed"]) == (3, 2, 2, 1)
+        assert report["errors"][0]["row"] == 3
+        job = await _wait_for_job(client, admin, report["invitation_job_id"])
+        # The local transport only keeps the messages, so none count as sent
+        assert (job["status"], job["progress"]["sent"], job["progress"]["skipped"]) == ("done", 0, 2)
+
+        # No password yet, and knowing the address is not enough to set one
+        response = await client.post("/api/auth/login", json={"email": "claim@example.com", "password": "secret"})
+        assert response.status_code == 401
+        response = await client.post("/api/auth/register", json={"email": "claim@example.com", "password": "secret"})
+        assert response.status_code == 400
+        response = await client.post("/api/auth/claim", json={"token": "guessed", "password": "secret"})
+        assert response.status_code == 400
+
+        token = _claim_token("claim@example.com")
+        response = await client.post("/api/auth/claim", json={"token": token, "password": "secret"})
+        assert response.status_code == 200, response.text
+        assert response.json()["user"]["role"] == "alumni"
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await client.get("/api/alumni/profile", headers=headers)
+        assert response.json()["full_name"] == "Casey Claim"
+
+        response = await client.post("/api/auth/login", json={"email": "claim@example.com", "password": "secret"})
+        assert response.status_code == 200
+
+        # The token works once
+        response = await client.post("/api/auth/claim", json={"token": token, "password": "other"})
+        assert response.status_code == 400
+
+    api(body)
+
+
+def test_claim_tokens_cannot_take_over_an_account_with_a_password(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        await register(client, email="taken@example.com")
+        data = b"email,full_name,phone,graduation_year,degree,department\ntaken@example.com,T,1,2015,BSc,History\n"
+        report = (await client.post(
+            "/api/admin/alumni/import", content=data, headers={**admin, "Content-Type": "text/csv"}
+        )).json()
+        # The existing user was not created by the import, so nobody is invited
+        assert (report["imported"], report["users_created"]) == (1, 0)
+        assert "invitation_job_id" not in report
+
+    api(body)
@@ -0,0 +1,70 @@
+import asyncio
+import contextvars
+
+import pymongo
+from pymongo import _csot
+
+from loader import BatchLoader
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class Recorder:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.batches = []
+        self.contexts = []
+
+    async def __call__(self, keys):
+        self.batches.append(list(keys))
+        # The request id and pymongo deadline the batch query would run under
+        self.contexts.append((request_id.get(), _csot.get_timeout()))
+        await asyncio.sleep(self.delay)
+        return {key: key.upper() for key in keys if key != "missing"}
+
+
+def test_concurrent_loads_share_one_batch_query():
+    batch_fn = Recorder()
+    loader = BatchLoader("test", batch_fn)
+
+    async def run():
+        return await asyncio.gather(*(loader.load(key) for key in ["a", "b", "a", "missing", "c"]))
+
+    assert asyncio.run(run()) == ["A", "B", "A", None, "C"]
+    assert batch_fn.batches == [["a", "b", "missing", "c"]]
+
+
+def test_batches_are_split_at_the_maximum_size():
+    batch_fn = Recorder()
+    loader = BatchLoader("test", batch_fn, max_batch_size=2)
+
+    async def run():
+        return await asyncio.gather(*(loader.load(key) for key in "abcde"))
+
+    assert asyncio.run(run()) == list("ABCDE")
+    assert batch_fn.batches == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_batch_does_not_run_under_the_first_callers_context():
+    batch_fn = Recorder(delay=0.05)
+    loader = BatchLoader("test", batch_fn)
+
+    async def impatient():
+        request_id.set("first")
+        with pymongo.timeout(0.01):
+            async with asyncio.timeout(0.01):
+                return await loader.load("a")
+
+    async def patient():
+        request_id.set("second")
+        return await loader.load("b")
+
+    async def run():
+        return await asyncio.gather(impatient(), patient(), return_exceptions=True)
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, TimeoutError)
+    # The first caller's deadline ended only its own wait
+    assert second == "B"
+    assert batch_fn.batches == [["a", "b"]]
+    assert batch_fn.contexts == [(None, None)]
@@ -0,0 +1,98 @@
+import asyncio
+
+from indexes import ensure_indexes
+from messaging import create_conversation, forget_user, mark_read, send_message, unread_total
+
+from .conftest import register
+
+
+async def _unread(mongo, user_id, conversation_id):
+    entry = await mongo.inbox.find_one({"user_id": user_id, "conversation_id": conversation_id})
+    return entry["unread"]
+
+
+def test_group_sends_count_for_everyone_but_the_sender(mongo):
+    async def run():
+        group = await create_conversation(mongo, "a", ["b", "c"], title="Class of 2015")
+        direct = await create_conversation(mongo, "a", ["c"])
+        assert (group["kind"], direct["kind"]) == ("group", "direct")
+        await send_message(mongo, group, "a", "hi all")
+        await send_message(mongo, group, "a", "anyone?")
+        await send_message(mongo, group, "b", "me")
+        await send_message(mongo, direct, "a", "psst")
+
+        counts = {user: await _unread(mongo, user, group["id"]) for user in "abc"}
+        assert counts == {"a": 1, "b": 2, "c": 3}
+        assert [await unread_total(mongo, user) for user in "abc"] == [1, 2, 4]
+
+        # Reading one conversation takes only its messages off the total
+        await mark_read(mongo, "c", group["id"])
+        assert await _unread(mongo, "c", group["id"]) == 0
+        assert await unread_total(mongo, "c") == 1
+        await mark_read(mongo, "c", direct["id"])
+        assert await unread_total(mongo, "c") == 0
+
+    asyncio.run(run())
+
+
+def test_concurrent_and_repeated_reads_subtract_once(mongo):
+    async def run():
+        conversation = await create_conversation(mongo, "a", ["b"])
+        for _ in range(3):
+            await send_message(mongo, conversation, "a", "hello")
+        await asyncio.gather(*(mark_read(mongo, "b", conversation["id"]) for _ in range(5)))
+        await mark_read(mongo, "b", conversation["id"])
+        counter = await mongo.user_counters.find_one({"_id": "b"})
+        return counter["unread"], await unread_total(mongo, "b")
+
+    assert asyncio.run(run()) == (0, 0)
+
+
+def test_total_never_shows_below_zero(mongo):
+    async def run():
+        # A read landing between a send's inbox and counter writes leaves a brief negative
+        await mongo.user_counters.insert_one({"_id": "b", "unread": -2})
+        total = await unread_total(mongo, "b")
+        await forget_user(mongo, "b")
+        return total, await unread_total(mongo, "b")
+
+    assert asyncio.run(run()) == (0, 0)
+
+
+def test_direct_conversations_are_reused_in_both_directions(mongo):
+    async def run():
+        first = await create_conversation(mongo, "a", ["b"])
+        second = await create_conversation(mongo, "b", ["a"])
+        return first["id"], second["id"], await mongo.inbox.count_documents({})
+
+    asyncio.run(ensure_indexes(mongo))
+    first, second, entries = asyncio.run(run())
+    assert first == second
+    assert entries == 2
+
+
+def test_inbox_and_unread_through_the_api(api):
+    async def body(client):
+        a, a_headers = await register(client)
+        b, b_headers = await register(client)
+        c, c_headers = await register(client)
+        response = await client.post(
+            "/api/conversations", json={"member_ids": [b["id"], c["id"]], "title": "Trip"}, headers=a_headers
+        )
+        conversation_id = response.json()["id"]
+        for text in ("one", "two"):
+            await client.post(f"/api/conversations/{conversation_id}/messages", json={"body": text}, headers=a_headers)
+        await client.post(f"/api/conversations/{conversation_id}/messages", json={"body": "three"}, headers=b_headers)
+
+        inbox = (await client.get("/api/conversations", headers=c_headers)).json()
+        assert [(entry["unread"], entry["conversation"]["last_message"]["body"]) for entry in inbox] == [(3, "three")]
+        assert (await client.get("/api/conversations/unread", headers=a_headers)).json() == {"unread": 1}
+        assert (await client.get("/api/conversations/unread", headers=b_headers)).json() == {"unread": 2}
+
+        response = await client.post(f"/api/conversations/{conversation_id}/read", headers=c_headers)
+        assert response.json() == {"unread": 0}
+        response = await client.post(f"/api/conversations/{conversation_id}/read", headers=c_headers)
+        assert response.json() == {"unread": 0}
+        assert (await client.get("/api/conversations/unread", headers=b_headers)).json() == {"unread": 2}
+
+    api(body)
@@ -0,0 +1,106 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+
+from jobs import JobCancelled
+from outreach import EventCampaign, LocalTransport, TokenBucket, TransientDeliveryError
+
+
+class FlakyTransport:
+    """Delivers ``fail_after`` messages of a call, then drops the connection, ``failures`` times."""
+
+    sender = "test@example.com"
+    delivers = True
+
+    def __init__(self, fail_after, failures=1):
+        self.fail_after = fail_after
+        self.failures = failures
+        self.delivered = []
+
+    async def send(self, messages):
+        if self.failures:
+            self.failures -= 1
+            sent = [message["To"] for message in messages[:self.fail_after]]
+            self.delivered.extend(sent)
+            raise TransientDeliveryError("connection reset", sent)
+        self.delivered.extend(message["To"] for message in messages)
+        return []
+
+
+class FakeProgress:
+    def __init__(self, state=None, lose_lease_after=None):
+        self.state = dict(state or {})
+        self.updates = 0
+        self.lose_lease_after = lose_lease_after
+
+    async def update(self, **fields):
+        self.updates += 1
+        if self.lose_lease_after is not None and self.updates > self.lose_lease_after:
+            raise JobCancelled()
+        self.state.update(fields)
+
+
+async def _seed(mongo, count):
+    await mongo.events.insert_one({
+        "id": "e1", "title": "Gala", "description": "d", "location": "Hall",
+        "date": datetime(2030, 1, 1, tzinfo=timezone.utc),
+    })
+    await mongo.users.insert_many([
+        {"id": f"u{i:02d}", "email": f"u{i:02d}@example.com", "is_active": True} for i in range(count)
+    ])
+    await mongo.alumni_profiles.insert_many([
+        {"id": f"p{i:02d}", "user_id": f"u{i:02d}", "full_name": f"Alum {i}"} for i in range(count)
+    ])
+
+
+def _campaign(mongo, transport, batch_size=4):
+    return EventCampaign(mongo, transport, TokenBucket(rate=1e6), batch_size=batch_size, retry_base_seconds=0)
+
+
+def test_retry_after_partial_batch_sends_only_the_rest(mongo):
+    transport = FlakyTransport(fail_after=2)
+    progress = FakeProgress()
+
+    async def run():
+        await _seed(mongo, 10)
+        await _campaign(mongo, transport)({"id": "j1", "payload": {"event_id": "e1"}}, progress)
+        return await mongo.outreach_deliveries.count_documents({})
+
+    leftover = asyncio.run(run())
+    assert Counter(transport.delivered) == Counter(f"u{i:02d}@example.com" for i in range(10))
+    assert (progress.state["sent"], progress.state["failed"], progress.state["skipped"]) == (10, 0, 0)
+    assert leftover == 0
+
+
+def test_resumed_attempt_skips_recipients_sent_before_the_lease_lapsed(mongo):
+    transport = FlakyTransport(fail_after=0, failures=0)
+    job = {"id": "j1", "payload": {"event_id": "e1"}}
+
+    async def run():
+        await _seed(mongo, 10)
+        # Sends the first batch, then loses the lease before checkpointing it
+        first = FakeProgress(lose_lease_after=1)
+        with pytest.raises(JobCancelled):
+            await _campaign(mongo, transport)(job, first)
+        resumed = FakeProgress(first.state)
+        await _campaign(mongo, transport)(job, resumed)
+        return resumed
+
+    resumed = asyncio.run(run())
+    assert Counter(transport.delivered) == Counter(f"u{i:02d}@example.com" for i in range(10))
+    assert resumed.state["sent"] == 10
+
+
+def test_local_transport_keeps_a_bounded_outbox_and_counts_nothing_as_sent(mongo):
+    transport = LocalTransport(keep=3)
+    progress = FakeProgress()
+
+    async def run():
+        await _seed(mongo, 10)
+        await _campaign(mongo, transport)({"id": "j1", "payload": {"event_id": "e1"}}, progress)
+
+    asyncio.run(run())
+    assert [message["To"] for message in transport.outbox] == [f"u{i:02d}@example.com" for i in (7, 8, 9)]
+    assert (progress.state["sent"], progress.state["failed"], progress.state["skipped"]) == (0, 0, 10)
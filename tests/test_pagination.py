@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import DESCENDING
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor, fetch_page
+
+from .conftest import register
+
+
+def test_cursor_round_trips_datetimes_and_ids():
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 250000)
+    cursor = encode_cursor({"id": "abc", "created_at": created_at}, "created_at")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "abc")
+
+
+def test_cursor_round_trips_plain_values():
+    assert decode_cursor(encode_cursor({"id": "x", "graduation_year": 2019}, "graduation_year")) == (2019, "x")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "e30", encode_cursor({"id": "x"}, "id")[:-2] + "!!"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("direction", [1, DESCENDING])
+def test_pages_cover_every_document_once_across_ties(mongo, direction):
+    base = datetime(2024, 1, 1)
+    # Three documents share each timestamp, so pages split inside ties
+    docs = [{"id": f"{i:03d}", "created_at": base + timedelta(minutes=i // 3)} for i in range(20)]
+
+    async def walk():
+        await mongo.items.insert_many([dict(doc) for doc in docs])
+        seen, cursor = [], None
+        while True:
+            page, cursor = await fetch_page(mongo.items, {}, "created_at", 4, cursor, direction=direction)
+            seen.extend(doc["id"] for doc in page)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(walk())
+    expected = sorted(docs, key=lambda doc: (doc["created_at"], doc["id"]), reverse=direction == DESCENDING)
+    assert seen == [doc["id"] for doc in expected]
+
+
+def test_alumni_list_follows_next_cursor(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        for i in range(5):
+            _, headers = await register(client)
+            response = await client.post(
+                "/api/alumni/profile",
+                json={"full_name": f"Alum {i}", "phone": "555-0100", "graduation_year": 2020, "degree": "BSc", "department": "CS"},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+        names, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/admin/alumni", params=params, headers=admin)
+            assert response.status_code == 200
+            names.extend(profile["full_name"] for profile in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+        assert sorted(names) == [f"Alum {i}" for i in range(5)]
+
+        response = await client.get("/api/admin/alumni", params={"cursor": "garbage"}, headers=admin)
+        assert response.status_code == 400
+
+    api(body)
@@ -0,0 +1,63 @@
+import time
+from types import SimpleNamespace
+
+from principal_cache import PrincipalCache
+
+from .conftest import register
+
+
+def _user(email="a@example.com"):
+    return SimpleNamespace(email=email)
+
+
+def test_entries_are_dropped_per_email_and_bounded_by_size_and_expiry():
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    later = time.time() + 600
+    cache.put("t1", _user(), later)
+    cache.put("t2", _user(), later)
+    cache.put("t3", _user("b@example.com"), later)
+    # Least recently used is evicted first
+    assert cache.get("t1") is None
+    assert cache.get("t2") is not None
+
+    cache.invalidate_email("a@example.com")
+    assert cache.get("t2") is None
+    assert cache.get("t3") is not None
+
+    # Never kept past the token's own expiry
+    cache.put("t4", _user(), time.time() - 1)
+    assert cache.get("t4") is None
+
+
+def test_put_after_an_invalidation_is_skipped():
+    cache = PrincipalCache()
+    generation = cache.generation
+    # The user is read from Mongo, then invalidated before the lookup stores it
+    cache.invalidate_email("a@example.com")
+    cache.put("t1", _user(), time.time() + 600, generation)
+    assert cache.get("t1") is None
+
+    cache.put("t1", _user(), time.time() + 600, cache.generation)
+    assert cache.get("t1") is not None
+
+
+def test_account_changes_reach_cached_principals(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        user, headers = await register(client)
+        assert (await client.get("/api/auth/me", headers=headers)).json()["role"] == "alumni"
+
+        response = await client.patch(f"/api/admin/users/{user['id']}", json={"role": "admin"}, headers=admin)
+        assert response.status_code == 200
+        assert (await client.get("/api/auth/me", headers=headers)).json()["role"] == "admin"
+
+        await client.patch(f"/api/admin/users/{user['id']}", json={"is_active": False}, headers=admin)
+        response = await client.get("/api/auth/me", headers=headers)
+        assert (response.status_code, response.json()["detail"]) == (400, "Inactive user")
+
+        await client.patch(f"/api/admin/users/{user['id']}", json={"is_active": True}, headers=admin)
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+        assert (await client.delete(f"/api/admin/users/{user['id']}", headers=admin)).status_code == 200
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+    api(body)
@@ -0,0 +1,34 @@
+import asyncio
+
+from .conftest import register
+
+BASE = {"phone": "555-0100", "graduation_year": 2018, "degree": "BSc", "department": "Physics"}
+
+
+def test_recommendations_rank_similar_alumni_and_hide_contact_details(api):
+    async def body(client):
+        import server
+        _, me = await register(client)
+        await client.post("/api/alumni/profile", json={**BASE, "full_name": "Me", "current_company": "CERN"}, headers=me)
+        _, peer = await register(client)
+        await client.post("/api/alumni/profile", json={**BASE, "full_name": "Peer", "current_company": "CERN"}, headers=peer)
+        _, stranger = await register(client)
+        await client.post(
+            "/api/alumni/profile",
+            json={**BASE, "full_name": "Stranger", "graduation_year": 1990, "department": "Art", "degree": "BA"},
+            headers=stranger,
+        )
+        for _ in range(50):
+            if server.recommender.ready:
+                break
+            await asyncio.sleep(0.01)
+
+        response = await client.get("/api/alumni/recommendations", headers=me)
+        assert response.status_code == 200
+        ranked = response.json()
+        assert ranked[0]["profile"]["full_name"] == "Peer"
+        assert "Me" not in [item["profile"]["full_name"] for item in ranked]
+        for item in ranked:
+            assert not {"phone", "user_id", "bio"} & set(item["profile"])
+
+    api(body)
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from indexes import ensure_indexes
+from refresh_tokens import RefreshTokenError, RefreshTokenReused, RefreshTokenStore
+
+from .conftest import register
+
+
+def test_tokens_rotate_once_and_reuse_is_detected(mongo):
+    store = RefreshTokenStore(reuse_grace_seconds=0)
+
+    async def run():
+        token, family_id = await store.issue(mongo, "u1")
+        record = await store.consume(mongo, token)
+        assert record == {"family_id": family_id, "user_id": "u1"}
+        rotated, same_family = await store.issue(mongo, "u1", predecessor=token)
+        assert same_family == family_id
+
+        with pytest.raises(RefreshTokenReused) as reused:
+            await store.consume(mongo, token)
+        assert (reused.value.family_id, reused.value.user_id) == (family_id, "u1")
+
+        await store.revoke_family(mongo, family_id)
+        with pytest.raises(RefreshTokenError):
+            await store.consume(mongo, rotated)
+        # Another worker learns the revocation from Mongo at startup
+        restarted = RefreshTokenStore()
+        await restarted.load_revoked(mongo)
+        assert family_id in restarted.revoked
+
+    asyncio.run(run())
+
+
+def test_token_reused_within_the_grace_window_rotates_to_the_same_successor(mongo):
+    store = RefreshTokenStore(secret=b"k", reuse_grace_seconds=30)
+
+    async def run():
+        await ensure_indexes(mongo)
+        token, family_id = await store.issue(mongo, "u1")
+        await store.consume(mongo, token)
+        first, _ = await store.issue(mongo, "u1", predecessor=token)
+        # A second tab presents the same token a moment later
+        assert await store.consume(mongo, token) == {"family_id": family_id, "user_id": "u1"}
+        second, _ = await store.issue(mongo, "u1", predecessor=token)
+        assert second == first
+        assert await mongo.refresh_tokens.count_documents({"family_id": family_id}) == 2
+        # Another worker with the same secret derives the same successor
+        assert RefreshTokenStore(secret=b"k").successor_of(token) == first
+        await store.consume(mongo, first)
+
+        # Outside the window it is reuse again
+        store.reuse_grace = timedelta(0)
+        with pytest.raises(RefreshTokenReused):
+            await store.consume(mongo, token)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("token", ["", "nodot", ".secret", "family.", "family.unknown"])
+def test_malformed_and_unknown_tokens_are_rejected(mongo, token):
+    with pytest.raises(RefreshTokenError) as error:
+        asyncio.run(RefreshTokenStore().consume(mongo, token))
+    assert not isinstance(error.value, RefreshTokenReused)
+
+
+def test_replayed_refresh_token_ends_the_whole_session(api, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server.refresh_tokens, "reuse_grace", timedelta(0))
+
+    async def body(client):
+        user, _ = await register(client)
+        response = await client.post("/api/auth/login", json={"email": user["email"], "password": "secret"})
+        first = response.json()
+
+        response = await client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]})
+        assert response.status_code == 200
+        second = response.json()
+        headers = {"Authorization": f"Bearer {second['access_token']}"}
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+
+        # The rotated-out token comes back: every token of the login is revoked
+        response = await client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]})
+        assert response.status_code == 401
+        response = await client.post("/api/auth/refresh", json={"refresh_token": second["refresh_token"]})
+        assert response.status_code == 401
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+    api(body)
+
+
+def test_tabs_refreshing_together_keep_the_session(api):
+    async def body(client):
+        user, _ = await register(client)
+        response = await client.post("/api/auth/login", json={"email": user["email"], "password": "secret"})
+        token = response.json()["refresh_token"]
+
+        responses = await asyncio.gather(*(
+            client.post("/api/auth/refresh", json={"refresh_token": token}) for _ in range(2)
+        ))
+        assert [response.status_code for response in responses] == [200, 200]
+        successors = {response.json()["refresh_token"] for response in responses}
+        assert len(successors) == 1
+        for response in responses:
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+        response = await client.post("/api/auth/refresh", json={"refresh_token": successors.pop()})
+        assert response.status_code == 200
+
+    api(body)
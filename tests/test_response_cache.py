@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from response_cache import ResponseCache, etag_matches
+
+from .conftest import register
+
+
+class Loader:
+    def __init__(self, delay=0.01, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("database down")
+        return f"body {self.calls}".encode(), {"X-Calls": str(self.calls)}
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache()
+    loader = Loader()
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("events", "k", loader) for _ in range(10)))
+
+    entries = asyncio.run(run())
+    assert loader.calls == 1
+    assert {entry.body for entry in entries} == {b"body 1"}
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached():
+    cache = ResponseCache()
+    loader = Loader(fail=True)
+
+    async def run():
+        results = await asyncio.gather(
+            *(cache.get_or_load("events", "k", loader) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        loader.fail = False
+        return await cache.get_or_load("events", "k", loader)
+
+    assert asyncio.run(run()).body == b"body 2"
+    assert loader.calls == 2
+
+
+def test_bump_makes_older_entries_stale():
+    cache = ResponseCache()
+    loader = Loader(delay=0)
+
+    async def run():
+        first = await cache.get_or_load("events", "k", loader)
+        assert await cache.get_or_load("events", "k", loader) is first
+        other = await cache.get_or_load("stats", "k", loader)
+        cache.bump("events")
+        assert cache.peek("events", "k") is None
+        refreshed = await cache.get_or_load("events", "k", loader)
+        # Other namespaces are untouched
+        assert await cache.get_or_load("stats", "k", loader) is other
+        return first, refreshed
+
+    first, refreshed = asyncio.run(run())
+    assert (first.body, refreshed.body) == (b"body 1", b"body 3")
+    assert first.etag != refreshed.etag
+
+
+def test_entries_expire_and_the_cache_is_bounded():
+    cache = ResponseCache(max_entries=2, ttl_seconds=0)
+    loader = Loader(delay=0)
+
+    async def run():
+        await cache.get_or_load("events", "a", loader)
+        assert cache.peek("events", "a") is None
+        await cache.get_or_load("events", "b", loader)
+        await cache.get_or_load("events", "c", loader)
+
+    asyncio.run(run())
+    assert cache.stale("events", "a") is None
+    assert cache.stale("events", "c").body == b"body 3"
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"abcd"', False),
+])
+def test_etag_matching(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_unchanged_events_revalidate_with_304(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        event = {"title": "Gala", "description": "d", "location": "Hall", "date": "2099-01-01T18:00:00Z",
+                 "notify_alumni": False}
+        await client.post("/api/events", json=event, headers=admin)
+        response = await client.get("/api/events", headers=admin)
+        etag = response.headers["etag"]
+        assert len(response.json()) == 1
+
+        response = await client.get("/api/events", headers={**admin, "If-None-Match": etag})
+        assert (response.status_code, response.content, response.headers["etag"]) == (304, b"", etag)
+
+        # Creating an event bumps the namespace, so the old ETag no longer matches
+        await client.post("/api/events", json=event, headers=admin)
+        response = await client.get("/api/events", headers={**admin, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+    api(body)
@@ -0,0 +1,89 @@
+import asyncio
+
+from .conftest import register
+
+EVENT = {"title": "Gala", "description": "d", "location": "Hall", "date": "2099-01-01T18:00:00Z", "notify_alumni": False}
+
+
+async def _event(client, admin, **fields):
+    response = await client.post("/api/events", json={**EVENT, **fields}, headers=admin)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_capacity_is_never_oversold(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        event_id = await _event(client, admin, capacity=2)
+        users = [await register(client) for _ in range(5)]
+        responses = await asyncio.gather(*(
+            client.post(f"/api/events/{event_id}/rsvp", headers=headers) for _, headers in users
+        ))
+        assert sorted(response.status_code for response in responses) == [200, 200, 409, 409, 409]
+        event = (await client.get(f"/api/events/{event_id}", headers=admin)).json()
+        assert event["attendee_count"] == 2
+
+    api(body)
+
+
+def test_duplicate_rsvp_keeps_one_seat(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        _, alumni = await register(client)
+        event_id = await _event(client, admin, capacity=5)
+        assert (await client.post(f"/api/events/{event_id}/rsvp", headers=alumni)).status_code == 200
+        response = await client.post(f"/api/events/{event_id}/rsvp", headers=alumni)
+        assert (response.status_code, response.json()["detail"]) == (400, "Already registered for this event")
+        event = (await client.get(f"/api/events/{event_id}", headers=admin)).json()
+        assert event["attendee_count"] == 1
+
+    api(body)
+
+
+def test_cancel_frees_the_seat(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        _, first = await register(client)
+        _, second = await register(client)
+        event_id = await _event(client, admin, capacity=1)
+        assert (await client.post(f"/api/events/{event_id}/rsvp", headers=first)).status_code == 200
+        assert (await client.post(f"/api/events/{event_id}/rsvp", headers=second)).status_code == 409
+
+        assert (await client.delete(f"/api/events/{event_id}/rsvp", headers=first)).status_code == 200
+        assert (await client.delete(f"/api/events/{event_id}/rsvp", headers=first)).status_code == 404
+        assert (await client.post(f"/api/events/{event_id}/rsvp", headers=second)).status_code == 200
+        event = (await client.get(f"/api/events/{event_id}", headers=admin)).json()
+        assert event["attendee_count"] == 1
+
+    api(body)
+
+
+def test_past_and_unknown_events_are_rejected(api):
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        _, alumni = await register(client)
+        event_id = await _event(client, admin, date="2000-01-01T18:00:00Z")
+        response = await client.post(f"/api/events/{event_id}/rsvp", headers=alumni)
+        assert (response.status_code, response.json()["detail"]) == (400, "Event has already taken place")
+        assert (await client.post("/api/events/missing/rsvp", headers=alumni)).status_code == 404
+
+    api(body)
+
+
+def test_rsvp_refreshes_the_event_detail_without_emptying_the_events_cache(api):
+    import server
+
+    async def body(client):
+        _, admin = await register(client, role="admin")
+        _, alumni = await register(client)
+        event_id = await _event(client, admin)
+        assert (await client.get(f"/api/events/{event_id}", headers=alumni)).json()["attendee_count"] == 0
+        await client.get("/api/events", headers=alumni)
+        version = server.response_cache.version("events")
+        assert server.response_cache.peek("events", ("detail", event_id)) is not None
+
+        assert (await client.post(f"/api/events/{event_id}/rsvp", headers=alumni)).status_code == 200
+        assert server.response_cache.version("events") == version
+        assert (await client.get(f"/api/events/{event_id}", headers=alumni)).json()["attendee_count"] == 1
+
+    api(body)
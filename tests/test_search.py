@@ -0,0 +1,30 @@
+import asyncio
+
+from search import backfill_search_terms, search_fields, search_update_pipeline
+
+
+def test_update_refreshes_only_changed_tokens(mongo):
+    async def run():
+        profile = {"id": "p1", "full_name": "Ada Lovelace", "current_company": "Analytical Engines"}
+        await mongo.alumni_profiles.insert_one({**profile, **search_fields(profile)})
+        await mongo.alumni_profiles.update_one({"id": "p1"}, search_update_pipeline({"full_name": "Ada King"}))
+        return await mongo.alumni_profiles.find_one({"id": "p1"})
+
+    doc = asyncio.run(run())
+    assert doc["search_tokens"]["full_name"] == ["ada", "king"]
+    assert sorted(doc["search_terms"]) == ["ada", "analytical", "engines", "king"]
+
+
+def test_profile_edited_before_backfill_is_backfilled_whole(mongo):
+    async def run():
+        # Written before search existed: no search fields at all
+        await mongo.alumni_profiles.insert_one({"id": "p1", "full_name": "Grace Hopper", "current_company": "Navy"})
+        await mongo.alumni_profiles.update_one({"id": "p1"}, search_update_pipeline({"full_name": "Grace Murray Hopper"}))
+        edited = await mongo.alumni_profiles.find_one({"id": "p1"})
+        await backfill_search_terms(mongo.alumni_profiles)
+        return edited, await mongo.alumni_profiles.find_one({"id": "p1"})
+
+    edited, backfilled = asyncio.run(run())
+    assert edited["full_name"] == "Grace Murray Hopper"
+    assert "search_terms" not in edited
+    assert sorted(backfilled["search_terms"]) == ["grace", "hopper", "murray", "navy"]
@@ -0,0 +1,32 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from stats import apply_changes, event_changes, load_dashboard, month_key, reconcile
+
+
+def test_month_key_is_the_utc_month():
+    plus_five = timezone(timedelta(hours=5))
+    assert month_key(datetime(2030, 1, 1, 1, 0, tzinfo=plus_five)) == "2029-12"
+    assert month_key(datetime(2030, 1, 31, 23, 0, tzinfo=timezone(timedelta(hours=-5)))) == "2030-02"
+    assert month_key(datetime(2030, 1, 1, 0, 0)) == "2030-01"
+
+
+def test_reconcile_agrees_with_incremental_counts_at_month_boundaries(mongo):
+    dates = [
+        datetime(2030, 1, 1, 1, 0, tzinfo=timezone(timedelta(hours=5))),
+        datetime(2030, 1, 31, 23, 30, tzinfo=timezone(timedelta(hours=-3))),
+        datetime(2030, 1, 15, tzinfo=timezone.utc),
+    ]
+
+    async def run():
+        for i, date in enumerate(dates):
+            event = {"id": f"e{i}", "date": date}
+            await mongo.events.insert_one(dict(event))
+            await apply_changes(mongo, event_changes(event, 1))
+        incremental = await load_dashboard(mongo)
+        await reconcile(mongo)
+        return incremental, await load_dashboard(mongo)
+
+    incremental, reconciled = asyncio.run(run())
+    assert incremental["events_by_month"] == {"2029-12": 1, "2030-01": 1, "2030-02": 1}
+    assert reconciled["events_by_month"] == incremental["events_by_month"]